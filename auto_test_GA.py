@@ -1,3 +1,5 @@
+import argparse
+import copy
 import csv
 import json
 import os
@@ -7,7 +9,8 @@ from datetime import datetime
 from typing import Dict, List, Tuple
 
 from solution_methods.GA.run_GA import run_GA
-from solution_methods.GA.src.initialization import initialize_run
+from solution_methods.GA.src.initialization import initialize_run, uses_worker_pool
+from solution_methods.GA.src.worker_pool import WorkerPool
 from solution_methods.helper_functions import load_job_shop_env, load_parameters
 from visualization import gantt_chart
 
@@ -19,20 +22,34 @@ def ensure_directory_exists(filepath: str) -> None:
         os.makedirs(directory)
 
 
-def run_single_instance(instance_path: str, parameters: Dict, result_dir: str) -> Tuple[str, float, float, List, int, int, int]:
-    """运行单个实例的GA算法"""
+def run_single_instance(instance_path: str, parameters: Dict, result_dir: str, pool: WorkerPool = None,
+                        resume: bool = False) -> Tuple[str, float, float, List, int, int, int, Dict]:
+    """运行单个实例的GA算法（pool为可在多个实例间复用的进程池），返回值包含停止原因和找到最优解的时间
+    resume为True且该实例的状态文件存在时，从中断处继续运行"""
     try:
         # 加载作业车间环境
         jobShopEnv = load_job_shop_env(instance_path)
 
+        # 每个实例的运行状态保存在结果目录中各自的文件里
+        instance_name = os.path.splitext(os.path.basename(instance_path))[0]
+        parameters = copy.deepcopy(parameters)
+        state_file = os.path.join(result_dir, f"{instance_name}_{parameters['output'].get('state_file', 'GA_state.bin')}")
+        parameters['output']['state_file'] = state_file
+        resume_from = state_file if resume and os.path.exists(state_file) else None
+        if resume_from:
+            print(f"从状态文件继续运行: {state_file}")
+
         # 初始化GA运行环境
-        population, toolbox, stats, hof = initialize_run(jobShopEnv, **parameters)
+        population, toolbox, stats, hof = initialize_run(jobShopEnv, pool=pool, resume=resume_from is not None,
+                                                         **parameters)
 
         # 开始计时
         start_time = time.time()
 
-        # 运行GA算法
-        makespan, jobShopEnv = run_GA(jobShopEnv, population, toolbox, stats, hof, **parameters)
+        # 运行GA算法（满足时间预算、目标值、下界或停滞条件时提前停止）
+        run_info = {}
+        makespan, jobShopEnv = run_GA(jobShopEnv, population, toolbox, stats, hof, run_info, resume_from,
+                                      **parameters)
 
         # 计算耗时
         computation_time = time.time() - start_time
@@ -55,16 +72,17 @@ def run_single_instance(instance_path: str, parameters: Dict, result_dir: str) -
         machines= jobShopEnv.nr_of_machines
         operations= jobShopEnv.nr_of_operations
 
-        return title, makespan, computation_time, result, jobs, machines, operations
+        return title, makespan, computation_time, result, jobs, machines, operations, run_info
     except Exception as e:
         print(f"处理实例 {instance_path} 时发生错误: {str(e)}")
-        return instance_path, -1, -1, [], -1, -1, -1  # 修复：返回7个值
+        return instance_path, -1, -1, [], -1, -1, -1, {}  # 修复：返回8个值
 
 def save_results_to_csv(results: List[Dict], filename: str) -> None:
     """保存结果到CSV文件"""
     try:
         ensure_directory_exists(filename)
-        fieldnames = ['Instance', 'Makespan', 'Computation Time',"Jobs","Machines","Operations"]
+        fieldnames = ['Instance', 'Makespan', 'Computation Time', 'Time to Best', 'Generations', 'Stopping Reason',
+                      "Jobs", "Machines", "Operations"]
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
@@ -87,7 +105,7 @@ def save_scheduling_info(scheduling_info: List, instance_name: str, result_dir:
         print(f"保存调度信息时发生错误: {str(e)}")
 
 
-def main():
+def main(resume_dir: str = None):
     try:
         # 加载参数配置
         parameters = load_parameters("configs/GA.toml")
@@ -96,22 +114,37 @@ def main():
 
         # 创建实验结果列表和CSV文件名
         results = []
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_dir = os.path.join("results", f"GA_experiment_{current_time}")
+        # 继续运行时复用中断实验的结果目录（需设置output.state_interval > 0以保存运行状态）
+        if resume_dir:
+            result_dir = resume_dir
+        else:
+            current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+            result_dir = os.path.join("results", f"GA_experiment_{current_time}")
         ensure_directory_exists(os.path.join(result_dir, "placeholder"))  # 确保目录存在
         csv_filename = os.path.join(result_dir, "GA_results.csv")
 
+        # 所有实例共用一个进程池，每个实例只向子进程发送一次。只有评估使用进程池时才创建：批量评估与增量（检查点）评估
+        # 不使用进程池，岛屿模型与稳态模式在各自的进程中进化
+        pool = None
+        if uses_worker_pool(**parameters) and parameters['algorithm'].get('islands', 1) <= 1 \
+                and not parameters['algorithm'].get('steady_state', False):
+            pool = WorkerPool(processes=parameters['algorithm'].get('processes') or None,
+                              chunksize=parameters['algorithm'].get('chunksize') or None)
+
         # 循环处理MFJS1到MFJS10
         for i in range(1, 11):
             problem_instance = f"/fjsp/fattahi/MFJS{i}.fjs"
             print(f"\n{'=' * 20}\n正在处理实例 MFJS{i}\n{'=' * 20}")
 
             # 修复：正确解包所有返回值
-            title, makespan, computation_time, scheduling_info, jobs, machines, operations = run_single_instance(problem_instance, parameters, result_dir)
+            title, makespan, computation_time, scheduling_info, jobs, machines, operations, run_info = run_single_instance(problem_instance, parameters, result_dir, pool, resume_dir is not None)
             results.append({
                 'Instance': title,
                 'Makespan': makespan,
                 'Computation Time': computation_time,
+                'Time to Best': run_info.get('time_to_best'),
+                'Generations': run_info.get('generations'),
+                'Stopping Reason': run_info.get('stopping_reason'),
                 'Jobs': jobs,
                 'Machines': machines,
                 'Operations': operations
@@ -119,6 +152,9 @@ def main():
             print(f"实例: {title}")
             print(f"最大完工时间: {makespan}")
             print(f"计算耗时: {computation_time:.2f}秒")
+            if run_info:
+                print(f"找到最优解耗时: {run_info['time_to_best']:.2f}秒 (第{run_info['generation_of_best']}代)")
+                print(f"停止原因: {run_info['stopping_reason']} (共{run_info['generations']}代)")
             print(f"作业数: {jobs}")
             print(f"机器数: {machines}")
             print(f"操作数: {operations}")
@@ -134,7 +170,7 @@ def main():
         #     print(f"\n{'=' * 20}\n正在处理实例 {instance_name}\n{'=' * 20}")
         #
         #     # 修复：正确解包所有返回值
-        #     title, makespan, computation_time, scheduling_info, jobs, machines, operations = run_single_instance(instance_path, parameters, result_dir)
+        #     title, makespan, computation_time, scheduling_info, jobs, machines, operations, run_info = run_single_instance(instance_path, parameters, result_dir, pool)
         #
         #     results.append({
         #         'Instance': title,
@@ -156,6 +192,10 @@ def main():
         #     if scheduling_info:
         #         save_scheduling_info(scheduling_info, title, result_dir)
 
+        # 关闭进程池
+        if pool is not None:
+            pool.close()
+
         # 保存实验结果
         save_results_to_csv(results, csv_filename)
 
@@ -164,4 +204,8 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="批量运行GA算法")
+    parser.add_argument("--resume", type=str, default=None, metavar="RESULT_DIR",
+                        help="从中断实验的结果目录继续运行（各实例从其状态文件继续）")
+    args = parser.parse_args()
+    main(resume_dir=args.resume)
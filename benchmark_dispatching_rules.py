@@ -0,0 +1,57 @@
+import argparse
+import logging
+import time
+
+from solution_methods.dispatching_rules.run_dispatching_rules import run_dispatching_rules
+from solution_methods.helper_functions import load_job_shop_env
+
+# 所有调度规则与机器分配规则的组合（SPT调度规则只能与SPT机器分配规则组合）
+RULE_COMBINATIONS = [(dispatching_rule, machine_assignment_rule)
+                     for machine_assignment_rule in ['SPT', 'EET']
+                     for dispatching_rule in ['FIFO', 'SPT', 'MOR', 'LOR', 'MWR', 'LWR']
+                     if not (dispatching_rule == 'SPT' and machine_assignment_rule != 'SPT')]
+
+# Fattahi和Brandimarte全部实例
+INSTANCES = [f"/fjsp/fattahi/SFJS{i}.fjs" for i in range(1, 11)] + \
+            [f"/fjsp/fattahi/MFJS{i}.fjs" for i in range(1, 11)] + \
+            [f"/fjsp/brandimarte/Mk{i:02d}.fjs" for i in range(1, 11)]
+
+
+def benchmark(kernel: str, instances=INSTANCES, rule_combinations=RULE_COMBINATIONS):
+    """用指定的模拟内核运行所有实例与规则组合，返回(运行次数, 总耗时, 各次运行的makespan)"""
+    makespans = {}
+    computation_time = 0.0
+    for instance in instances:
+        for dispatching_rule, machine_assignment_rule in rule_combinations:
+            # 实例解析不计入耗时
+            jobShopEnv = load_job_shop_env(instance)
+            parameters = {'instance': {'online_arrivals': False, 'dispatching_rule': dispatching_rule,
+                                       'machine_assignment_rule': machine_assignment_rule,
+                                       'simulation_kernel': kernel}}
+            start_time = time.perf_counter()
+            makespan, _ = run_dispatching_rules(jobShopEnv, **parameters)
+            computation_time += time.perf_counter() - start_time
+            makespans[(instance, dispatching_rule, machine_assignment_rule)] = makespan
+    return len(makespans), computation_time, makespans
+
+
+def main(kernels):
+    logging.disable(logging.INFO)
+    results = {}
+    for kernel in kernels:
+        runs, computation_time, makespans = benchmark(kernel)
+        results[kernel] = makespans
+        print(f"{kernel:>6}: {runs}次规则运行, 耗时{computation_time:.2f}秒, {runs / computation_time:.1f}次/秒")
+    if len(results) > 1:
+        # 不同内核的调度结果必须相同
+        reference = next(iter(results.values()))
+        identical = all(makespans == reference for makespans in results.values())
+        print(f"各内核makespan是否一致: {identical}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="调度规则运行速度基准测试（Fattahi和Brandimarte全部实例）")
+    parser.add_argument("--kernels", nargs="+", default=["simpy", "native"], choices=["simpy", "native"],
+                        help="要比较的模拟内核")
+    args = parser.parse_args()
+    main(args.kernels)
@@ -0,0 +1,231 @@
+import argparse
+import logging
+
+import numpy as np
+
+from scheduling_environment.compiledJobShop import CompiledJobShop, _csr
+
+PROBLEM_TYPES = ['jsp', 'fsp', 'fjsp', 'fjsp_sdst', 'fajsp']
+CHUNK_SIZE = 65536  # number of operations for which machine options are drawn at once (bounds peak memory)
+
+
+def _job_operation_counts(rng, nr_of_jobs, min_nr_operations_per_job, max_nr_operations_per_job):
+    return rng.integers(min_nr_operations_per_job, max_nr_operations_per_job + 1, size=nr_of_jobs)
+
+
+def _chain_precedences(job_operations_ptr, nr_of_operations):
+    """Operation precedences of jobs that are a chain of consecutive operation ids."""
+    first_operation = np.zeros(nr_of_operations, dtype=bool)
+    first_operation[job_operations_ptr[:-1][job_operations_ptr[:-1] < nr_of_operations]] = True
+    has_predecessor = ~first_operation
+    predecessor_ptr = _csr(has_predecessor.astype(np.int64))
+    predecessors = np.flatnonzero(has_predecessor).astype(np.int32) - 1
+    return predecessor_ptr, predecessors
+
+
+def _draw_machine_options(rng, nr_of_operations, nr_of_machines, flexibility, min_duration, max_duration,
+                          duration_deviation):
+    """Draw the eligible machines and processing times of every operation.
+
+    Each operation gets between 1 and max(1, round(flexibility * nr_of_machines)) eligible machines. Processing times
+    on the eligible machines deviate at most duration_deviation (fraction) from a per-operation mean duration.
+    """
+    max_options = max(1, min(nr_of_machines, int(round(flexibility * nr_of_machines))))
+    nr_of_options = rng.integers(1, max_options + 1, size=nr_of_operations)
+    option_ptr = _csr(nr_of_options)
+    option_machine = np.empty(option_ptr[-1], dtype=np.int32)
+
+    for start in range(0, nr_of_operations, CHUNK_SIZE):
+        end = min(start + CHUNK_SIZE, nr_of_operations)
+        # the k eligible machines are the k smallest keys of a random permutation, listed in machine order
+        keys = rng.random((end - start, nr_of_machines))
+        ranks = keys.argsort(axis=1).argsort(axis=1)
+        eligible = ranks < nr_of_options[start:end, None]
+        option_machine[option_ptr[start]:option_ptr[end]] = np.nonzero(eligible)[1]
+
+    mean_duration = rng.integers(min_duration, max_duration + 1, size=nr_of_operations)
+    low = np.maximum(min_duration, np.round(mean_duration * (1 - duration_deviation))).astype(np.int64)
+    high = np.maximum(low, np.round(mean_duration * (1 + duration_deviation))).astype(np.int64)
+    operation_of_option = np.repeat(np.arange(nr_of_operations), nr_of_options)
+    option_duration = rng.integers(low[operation_of_option], high[operation_of_option] + 1)
+    return option_ptr, option_machine, option_duration
+
+
+def _draw_setup_times(rng, nr_of_operations, nr_of_machines, nr_of_setup_classes, min_setup_time, max_setup_time):
+    """Draw setup classes (families) for the operations and class-to-class setup times per machine.
+
+    Consecutive operations of the same setup class require no setup."""
+    setup_class = rng.integers(0, nr_of_setup_classes, size=nr_of_operations)
+    setup_times = rng.integers(min_setup_time, max_setup_time + 1,
+                               size=(nr_of_machines, nr_of_setup_classes, nr_of_setup_classes))
+    setup_times[:, np.arange(nr_of_setup_classes), np.arange(nr_of_setup_classes)] = 0
+    return setup_class, setup_times
+
+
+def generate_jsp(nr_of_jobs, nr_of_machines, min_duration=1, max_duration=99, seed=None, instance_name=None):
+    """Generate a JSP instance: every job visits every machine exactly once, in random order."""
+    rng = np.random.default_rng(seed)
+    nr_of_operations = nr_of_jobs * nr_of_machines
+    job_operations_ptr = np.arange(nr_of_jobs + 1, dtype=np.int64) * nr_of_machines
+    option_machine = rng.random((nr_of_jobs, nr_of_machines)).argsort(axis=1).ravel()
+    option_duration = rng.integers(min_duration, max_duration + 1, size=nr_of_operations)
+    predecessor_ptr, predecessors = _chain_precedences(job_operations_ptr, nr_of_operations)
+    return CompiledJobShop(
+        instance_name or f"/jsp/generated/jsp_{nr_of_jobs}_{nr_of_machines}_seed{seed}", nr_of_machines,
+        np.repeat(np.arange(nr_of_jobs), nr_of_machines), job_operations_ptr, np.arange(nr_of_operations),
+        np.arange(nr_of_operations + 1), option_machine, option_duration, predecessor_ptr, predecessors)
+
+
+def generate_fsp(nr_of_jobs, nr_of_machines, min_duration=1, max_duration=99, seed=None, instance_name=None):
+    """Generate a (permutation) FSP instance: every job visits the machines in the same order."""
+    rng = np.random.default_rng(seed)
+    nr_of_operations = nr_of_jobs * nr_of_machines
+    job_operations_ptr = np.arange(nr_of_jobs + 1, dtype=np.int64) * nr_of_machines
+    option_machine = np.tile(np.arange(nr_of_machines), nr_of_jobs)
+    option_duration = rng.integers(min_duration, max_duration + 1, size=nr_of_operations)
+    predecessor_ptr, predecessors = _chain_precedences(job_operations_ptr, nr_of_operations)
+    return CompiledJobShop(
+        instance_name or f"/fsp/generated/fsp_{nr_of_jobs}_{nr_of_machines}_seed{seed}", nr_of_machines,
+        np.repeat(np.arange(nr_of_jobs), nr_of_machines), job_operations_ptr, np.arange(nr_of_operations),
+        np.arange(nr_of_operations + 1), option_machine, option_duration, predecessor_ptr, predecessors)
+
+
+def generate_fjsp(nr_of_jobs, nr_of_machines, min_nr_operations_per_job=None, max_nr_operations_per_job=None,
+                  flexibility=0.5, min_duration=1, max_duration=20, duration_deviation=0.2, nr_of_setup_classes=0,
+                  min_setup_time=1, max_setup_time=10, seed=None, instance_name=None):
+    """Generate an FJSP instance (with sequence dependent setup times if nr_of_setup_classes > 0).
+
+    Args:
+        nr_of_jobs: Number of jobs.
+        nr_of_machines: Number of machines.
+        min_nr_operations_per_job: Minimum number of operations per job (default: nr_of_machines).
+        max_nr_operations_per_job: Maximum number of operations per job (default: min_nr_operations_per_job).
+        flexibility: Maximum fraction of the machines that is eligible for an operation.
+        min_duration: Minimum (mean) processing time of an operation.
+        max_duration: Maximum (mean) processing time of an operation.
+        duration_deviation: Maximum relative deviation of processing times between the eligible machines.
+        nr_of_setup_classes: Number of setup classes (families), 0 for no setup times.
+        min_setup_time: Minimum setup time between two different setup classes.
+        max_setup_time: Maximum setup time between two different setup classes.
+        seed: Seed of the random generator.
+        instance_name: Name of the instance (a descriptive name is generated if not given).
+
+    Returns:
+        The generated CompiledJobShop.
+    """
+    rng = np.random.default_rng(seed)
+    min_nr_operations_per_job = min_nr_operations_per_job or nr_of_machines
+    max_nr_operations_per_job = max_nr_operations_per_job or min_nr_operations_per_job
+
+    job_operations_ptr = _csr(_job_operation_counts(rng, nr_of_jobs, min_nr_operations_per_job,
+                                                    max_nr_operations_per_job))
+    nr_of_operations = int(job_operations_ptr[-1])
+    operation_job = np.repeat(np.arange(nr_of_jobs), np.diff(job_operations_ptr))
+    option_ptr, option_machine, option_duration = _draw_machine_options(
+        rng, nr_of_operations, nr_of_machines, flexibility, min_duration, max_duration, duration_deviation)
+    predecessor_ptr, predecessors = _chain_precedences(job_operations_ptr, nr_of_operations)
+
+    setup_class, setup_times = None, None
+    if nr_of_setup_classes > 0:
+        setup_class, setup_times = _draw_setup_times(rng, nr_of_operations, nr_of_machines, nr_of_setup_classes,
+                                                     min_setup_time, max_setup_time)
+
+    problem = 'fjsp_sdst' if nr_of_setup_classes > 0 else 'fjsp'
+    return CompiledJobShop(
+        instance_name or f"/{problem}/generated/{problem}_{nr_of_jobs}_{nr_of_machines}_seed{seed}", nr_of_machines,
+        operation_job, job_operations_ptr, np.arange(nr_of_operations), option_ptr, option_machine, option_duration,
+        predecessor_ptr, predecessors, setup_class=setup_class, setup_times=setup_times)
+
+
+def generate_fjsp_sdst(nr_of_jobs, nr_of_machines, nr_of_setup_classes=10, **kwargs):
+    """Generate an FJSP instance with sequence dependent setup times (see generate_fjsp for the arguments)."""
+    return generate_fjsp(nr_of_jobs, nr_of_machines, nr_of_setup_classes=nr_of_setup_classes, **kwargs)
+
+
+def generate_fajsp(nr_of_jobs, nr_of_machines, assembly_depth=2, assembly_fan_in=2, min_nr_operations_per_job=1,
+                   max_nr_operations_per_job=5, seed=None, instance_name=None, **kwargs):
+    """Generate an FAJSP instance: jobs form assembly trees, in which a job can only start after all of its child
+    jobs (components) are finished.
+
+    Jobs are grouped into complete trees with assembly_fan_in children per job and at most assembly_depth levels
+    below the root; the last tree may be incomplete. Other keyword arguments are passed to generate_fjsp.
+    """
+    instance = generate_fjsp(nr_of_jobs, nr_of_machines, min_nr_operations_per_job, max_nr_operations_per_job,
+                             seed=seed, **kwargs)
+
+    # assign jobs to trees in breadth first order, children precede their parent
+    if assembly_fan_in > 1:
+        tree_size = (assembly_fan_in ** (assembly_depth + 1) - 1) // (assembly_fan_in - 1)
+    else:
+        tree_size = assembly_depth + 1
+    jobs = np.arange(nr_of_jobs)
+    local_index = jobs % tree_size
+    has_parent = local_index > 0
+    child_jobs = jobs[has_parent]
+    parent_jobs = (jobs - local_index + (local_index - 1) // assembly_fan_in)[has_parent]
+
+    order = np.argsort(parent_jobs, kind='stable')
+    job_predecessor_ptr = _csr(np.bincount(parent_jobs, minlength=nr_of_jobs))
+    job_predecessors = child_jobs[order]
+
+    # the first operation of a parent job succeeds the last operations of its child jobs
+    first_operation = instance.job_operations_ptr[:-1]
+    last_operation = instance.job_operations_ptr[1:] - 1
+    chain_successors = np.flatnonzero(np.diff(instance.predecessor_ptr) > 0)
+    successors = np.concatenate([chain_successors, first_operation[parent_jobs]])
+    predecessors = np.concatenate([instance.predecessors, last_operation[child_jobs]])
+    order = np.argsort(successors, kind='stable')
+    instance.predecessor_ptr = _csr(np.bincount(successors, minlength=instance.nr_of_operations))
+    instance.predecessors = predecessors[order].astype(np.int32)
+    instance.job_predecessor_ptr = job_predecessor_ptr
+    instance.job_predecessors = job_predecessors.astype(np.int32)
+    instance.instance_name = instance_name or \
+        f"/fajsp/generated/fajsp_{nr_of_jobs}_{nr_of_machines}_d{assembly_depth}_f{assembly_fan_in}_seed{seed}"
+    return instance
+
+
+def generate_instance(problem_type: str, **kwargs) -> CompiledJobShop:
+    """Generate a compiled instance of the given problem type ('jsp', 'fsp', 'fjsp', 'fjsp_sdst' or 'fajsp')."""
+    generators = {
+        'jsp': generate_jsp,
+        'fsp': generate_fsp,
+        'fjsp': generate_fjsp,
+        'fjsp_sdst': generate_fjsp_sdst,
+        'fajsp': generate_fajsp,
+    }
+    if problem_type not in generators:
+        raise NotImplementedError(f"Problem type {problem_type} not implemented, choose from {PROBLEM_TYPES}")
+    return generators[problem_type](**kwargs)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generate a (large) synthetic scheduling instance")
+    parser.add_argument("problem_type", choices=PROBLEM_TYPES)
+    parser.add_argument("-j", "--nr_of_jobs", type=int, required=True)
+    parser.add_argument("-m", "--nr_of_machines", type=int, required=True)
+    parser.add_argument("--min_nr_operations_per_job", type=int, default=None)
+    parser.add_argument("--max_nr_operations_per_job", type=int, default=None)
+    parser.add_argument("--flexibility", type=float, default=0.5)
+    parser.add_argument("--nr_of_setup_classes", type=int, default=10)
+    parser.add_argument("--assembly_depth", type=int, default=2)
+    parser.add_argument("--assembly_fan_in", type=int, default=2)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=str, required=True, help="path of the packed (.npz) output file")
+    args = parser.parse_args()
+
+    generator_kwargs = {'nr_of_jobs': args.nr_of_jobs, 'nr_of_machines': args.nr_of_machines, 'seed': args.seed}
+    if args.problem_type in ['fjsp', 'fjsp_sdst', 'fajsp']:
+        generator_kwargs['flexibility'] = args.flexibility
+        for key in ['min_nr_operations_per_job', 'max_nr_operations_per_job']:
+            if getattr(args, key) is not None:
+                generator_kwargs[key] = getattr(args, key)
+    if args.problem_type == 'fjsp_sdst':
+        generator_kwargs['nr_of_setup_classes'] = args.nr_of_setup_classes
+    if args.problem_type == 'fajsp':
+        generator_kwargs['assembly_depth'] = args.assembly_depth
+        generator_kwargs['assembly_fan_in'] = args.assembly_fan_in
+
+    instance = generate_instance(args.problem_type, **generator_kwargs)
+    instance.save(args.output)
+    logging.info(f"Generated {instance} and saved it to {args.output}")
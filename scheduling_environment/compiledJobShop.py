@@ -0,0 +1,299 @@
+from typing import Optional
+
+import numpy as np
+
+from scheduling_environment.job import Job
+from scheduling_environment.jobShop import JobShop
+from scheduling_environment.machine import Machine
+from scheduling_environment.operation import Operation
+
+
+def _csr(counts):
+    """Return the CSR row pointer array for the given row lengths."""
+    ptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=ptr[1:])
+    return ptr
+
+
+class SetupTimeTable:
+    """Nested-list compatible view ``table[machine_id][from_operation_id][to_operation_id]`` on class-based
+    setup times, so materialized environments do not need a dense (machines x operations x operations) list."""
+
+    def __init__(self, setup_class: np.ndarray, setup_times: np.ndarray):
+        self._setup_class = setup_class.tolist()
+        self._setup_times = setup_times.tolist()
+
+    def __getitem__(self, machine_id):
+        return _MachineSetupTimes(self._setup_class, self._setup_times[machine_id])
+
+
+class _MachineSetupTimes:
+    def __init__(self, setup_class, machine_setup_times):
+        self._setup_class = setup_class
+        self._machine_setup_times = machine_setup_times
+
+    def __getitem__(self, from_operation_id):
+        return _SetupTimeRow(self._setup_class, self._machine_setup_times[self._setup_class[from_operation_id]])
+
+
+class _SetupTimeRow:
+    def __init__(self, setup_class, row):
+        self._setup_class = setup_class
+        self._row = row
+
+    def __getitem__(self, to_operation_id):
+        return self._row[self._setup_class[to_operation_id]]
+
+
+class CompiledJobShop:
+    """
+    Array representation of a (static) job shop instance.
+
+    Operations are identified by their operation id (0..N-1), jobs by their job id (0..J-1) and machines by their
+    machine id (0..M-1). Variable length data is stored in CSR form (a pointer array and a flat index array):
+        - job_operations[job_operations_ptr[j]:job_operations_ptr[j + 1]]: operations of job j, in job order
+        - option_machine/option_duration[option_ptr[o]:option_ptr[o + 1]]: machine options of operation o,
+          sorted by machine id (the ordering used for the machine selection of the GA chromosome)
+        - predecessors[predecessor_ptr[o]:predecessor_ptr[o + 1]]: predecessor operations of operation o
+        - job_predecessors[job_predecessor_ptr[j]:job_predecessor_ptr[j + 1]]: predecessor jobs of job j (FAJSP)
+    Sequence dependent setup times are stored per setup class: the setup time on machine m between operation a and
+    operation b is setup_times[m, setup_class[a], setup_class[b]]. Instances without setup times have both set to None.
+    """
+
+    def __init__(self, instance_name: str, nr_of_machines: int, operation_job: np.ndarray,
+                 job_operations_ptr: np.ndarray, job_operations: np.ndarray, option_ptr: np.ndarray,
+                 option_machine: np.ndarray, option_duration: np.ndarray, predecessor_ptr: np.ndarray,
+                 predecessors: np.ndarray, job_predecessor_ptr: Optional[np.ndarray] = None,
+                 job_predecessors: Optional[np.ndarray] = None, setup_class: Optional[np.ndarray] = None,
+                 setup_times: Optional[np.ndarray] = None):
+        self.instance_name = instance_name
+        self.nr_of_machines = int(nr_of_machines)
+        self.operation_job = np.asarray(operation_job, dtype=np.int32)
+        self.job_operations_ptr = np.asarray(job_operations_ptr, dtype=np.int64)
+        self.job_operations = np.asarray(job_operations, dtype=np.int32)
+        self.option_ptr = np.asarray(option_ptr, dtype=np.int64)
+        self.option_machine = np.asarray(option_machine, dtype=np.int32)
+        self.option_duration = np.asarray(option_duration, dtype=np.int32)
+        self.predecessor_ptr = np.asarray(predecessor_ptr, dtype=np.int64)
+        self.predecessors = np.asarray(predecessors, dtype=np.int32)
+
+        nr_of_jobs = len(self.job_operations_ptr) - 1
+        if job_predecessor_ptr is None:
+            job_predecessor_ptr = np.zeros(nr_of_jobs + 1, dtype=np.int64)
+            job_predecessors = np.zeros(0, dtype=np.int32)
+        self.job_predecessor_ptr = np.asarray(job_predecessor_ptr, dtype=np.int64)
+        self.job_predecessors = np.asarray(job_predecessors, dtype=np.int32)
+
+        if (setup_class is None) != (setup_times is None):
+            raise ValueError("setup_class and setup_times must either both be given or both be None")
+        self.setup_class = None if setup_class is None else np.asarray(setup_class, dtype=np.int32)
+        self.setup_times = None if setup_times is None else np.asarray(setup_times, dtype=np.int32)
+
+    def __repr__(self):
+        return (
+            f"<CompiledJobShop(instance={self.instance_name!r}, "
+            f"jobs={self.nr_of_jobs}, operations={self.nr_of_operations}, "
+            f"machines={self.nr_of_machines}, options={len(self.option_machine)})>"
+        )
+
+    @property
+    def nr_of_jobs(self) -> int:
+        """Return the number of jobs."""
+        return len(self.job_operations_ptr) - 1
+
+    @property
+    def nr_of_operations(self) -> int:
+        """Return the number of operations."""
+        return len(self.operation_job)
+
+    @property
+    def has_setup_times(self) -> bool:
+        """Return whether the instance has (non-zero) sequence dependent setup times."""
+        return self.setup_times is not None
+
+    @property
+    def has_job_precedences(self) -> bool:
+        """Return whether there are precedence relations between jobs (assembly scheduling problems)."""
+        return len(self.job_predecessors) > 0
+
+    def setup_time(self, machine_id: int, from_operation_id: int, to_operation_id: int) -> int:
+        """Return the setup time on a machine between two consecutive operations."""
+        if self.setup_times is None:
+            return 0
+        return int(self.setup_times[machine_id, self.setup_class[from_operation_id], self.setup_class[to_operation_id]])
+
+    def makespan_lower_bound(self) -> int:
+        """
+        Return a lower bound on the makespan (setup times are ignored): the maximum of the longest precedence path
+        with the shortest processing time of every operation, the load of every machine from the operations that can
+        only be processed on that machine, and the average machine load with the shortest processing times.
+        """
+        min_duration = np.minimum.reduceat(self.option_duration, self.option_ptr[:-1]).astype(np.int64)
+
+        # longest path over the precedence relations (topological order, operations may precede other jobs)
+        in_degree = np.diff(self.predecessor_ptr).tolist()
+        successors = [[] for _ in range(self.nr_of_operations)]
+        predecessor_operations = np.repeat(np.arange(self.nr_of_operations), np.diff(self.predecessor_ptr))
+        for operation_id, predecessor in zip(predecessor_operations.tolist(), self.predecessors.tolist()):
+            successors[predecessor].append(operation_id)
+        durations = min_duration.tolist()
+        heads = [0] * self.nr_of_operations
+        ready = [operation_id for operation_id in range(self.nr_of_operations) if in_degree[operation_id] == 0]
+        path_bound = 0
+        while ready:
+            operation_id = ready.pop()
+            end = heads[operation_id] + durations[operation_id]
+            path_bound = max(path_bound, end)
+            for successor in successors[operation_id]:
+                heads[successor] = max(heads[successor], end)
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+
+        single_option = np.diff(self.option_ptr) == 1
+        machine_load = np.bincount(self.option_machine[self.option_ptr[:-1][single_option]],
+                                   weights=min_duration[single_option], minlength=self.nr_of_machines)
+        average_load = -(-int(min_duration.sum()) // self.nr_of_machines)
+        return int(max(path_bound, machine_load.max(initial=0), average_load))
+
+    @classmethod
+    def from_job_shop(cls, jobShop: JobShop) -> "CompiledJobShop":
+        """Compile a (parsed) JobShop environment into its array representation."""
+        operations = jobShop.operations
+        nr_of_operations = len(operations)
+        if any(operation.operation_id != index for index, operation in enumerate(operations)):
+            raise ValueError("Operation ids must be equal to their position in JobShop.operations")
+        jobs = sorted(jobShop.jobs, key=lambda job: job.job_id)
+        if any(job.job_id != index for index, job in enumerate(jobs)):
+            raise ValueError("Job ids must be consecutive, starting at 0")
+
+        operation_job = np.array([operation.job_id for operation in operations], dtype=np.int32)
+        job_operations_ptr = _csr([len(job.operations) for job in jobs])
+        job_operations = np.array([operation.operation_id for job in jobs for operation in job.operations],
+                                  dtype=np.int32)
+
+        options = [sorted(operation.processing_times.items()) for operation in operations]
+        option_ptr = _csr([len(option) for option in options])
+        option_machine = np.array([machine_id for option in options for machine_id, _ in option], dtype=np.int32)
+        option_duration = np.array([duration for option in options for _, duration in option], dtype=np.int32)
+
+        predecessor_ptr = _csr([len(operation.predecessors) for operation in operations])
+        predecessors = np.array([predecessor.operation_id for operation in operations
+                                 for predecessor in operation.predecessors], dtype=np.int32)
+
+        precedence_relations_jobs = jobShop.precedence_relations_jobs
+        job_predecessor_ptr = _csr([len(precedence_relations_jobs.get(job.job_id, [])) for job in jobs])
+        job_predecessors = np.array([predecessor for job in jobs
+                                     for predecessor in precedence_relations_jobs.get(job.job_id, [])], dtype=np.int32)
+
+        setup_class, setup_times = None, None
+        sequence_dependent_setup_times = jobShop._sequence_dependent_setup_times
+        if isinstance(sequence_dependent_setup_times, SetupTimeTable):
+            setup_class = np.array(sequence_dependent_setup_times._setup_class, dtype=np.int32)
+            setup_times = np.array(sequence_dependent_setup_times._setup_times, dtype=np.int32)
+        elif len(sequence_dependent_setup_times) != 0:
+            # dense (list or dict based) setup times: every operation is its own setup class
+            setup_times = np.zeros((jobShop.nr_of_machines, nr_of_operations, nr_of_operations), dtype=np.int32)
+            for machine_id in range(jobShop.nr_of_machines):
+                machine_setup_times = sequence_dependent_setup_times[machine_id]
+                rows = machine_setup_times.items() if isinstance(machine_setup_times, dict) \
+                    else enumerate(machine_setup_times)
+                for from_operation_id, row in rows:
+                    if isinstance(row, dict):
+                        for to_operation_id, setup_time in row.items():
+                            setup_times[machine_id, from_operation_id, to_operation_id] = setup_time
+                    else:
+                        setup_times[machine_id, from_operation_id, :len(row)] = row
+            setup_class = np.arange(nr_of_operations, dtype=np.int32)
+        if setup_times is not None and not setup_times.any():
+            setup_class, setup_times = None, None
+
+        return cls(jobShop.instance_name, jobShop.nr_of_machines, operation_job, job_operations_ptr, job_operations,
+                   option_ptr, option_machine, option_duration, predecessor_ptr, predecessors,
+                   job_predecessor_ptr, job_predecessors, setup_class, setup_times)
+
+    def to_job_shop(self) -> JobShop:
+        """Materialize the compiled instance as a JobShop environment."""
+        jobShop = JobShop()
+        jobShop.set_instance_name(self.instance_name)
+        jobShop.set_nr_of_jobs(self.nr_of_jobs)
+        jobShop.set_nr_of_machines(self.nr_of_machines)
+
+        jobs = [Job(job_id) for job_id in range(self.nr_of_jobs)]
+        operation_job = self.operation_job.tolist()
+        operations = [Operation(jobs[job_id], job_id, operation_id) for operation_id, job_id in enumerate(operation_job)]
+
+        option_ptr = self.option_ptr.tolist()
+        option_machine = self.option_machine.tolist()
+        option_duration = self.option_duration.tolist()
+        for operation_id, operation in enumerate(operations):
+            for option in range(option_ptr[operation_id], option_ptr[operation_id + 1]):
+                operation.add_operation_option(option_machine[option], option_duration[option])
+            jobShop.add_operation(operation)
+
+        job_operations_ptr = self.job_operations_ptr.tolist()
+        job_operations = self.job_operations.tolist()
+        for job_id, job in enumerate(jobs):
+            for operation_id in job_operations[job_operations_ptr[job_id]:job_operations_ptr[job_id + 1]]:
+                job.add_operation(operations[operation_id])
+            jobShop.add_job(job)
+
+        precedence_relations = {}
+        predecessor_ptr = self.predecessor_ptr.tolist()
+        predecessors = self.predecessors.tolist()
+        for operation_id, operation in enumerate(operations):
+            precedence_relations[operation_id] = [
+                operations[predecessor] for predecessor in
+                predecessors[predecessor_ptr[operation_id]:predecessor_ptr[operation_id + 1]]]
+            operation.add_predecessors(precedence_relations[operation_id])
+        jobShop.add_precedence_relations_operations(precedence_relations)
+
+        if self.has_job_precedences:
+            job_predecessor_ptr = self.job_predecessor_ptr.tolist()
+            job_predecessors = self.job_predecessors.tolist()
+            jobShop.add_precedence_relations_jobs({
+                job_id: job_predecessors[job_predecessor_ptr[job_id]:job_predecessor_ptr[job_id + 1]]
+                for job_id in range(self.nr_of_jobs)})
+
+        if self.has_setup_times:
+            jobShop.add_sequence_dependent_setup_times(SetupTimeTable(self.setup_class, self.setup_times))
+        else:
+            jobShop.add_sequence_dependent_setup_times(SetupTimeTable(
+                np.zeros(self.nr_of_operations, dtype=np.int32), np.zeros((self.nr_of_machines, 1, 1), dtype=np.int32)))
+
+        for machine_id in range(self.nr_of_machines):
+            jobShop.add_machine(Machine(machine_id))
+
+        return jobShop
+
+    def save(self, path: str) -> None:
+        """Save the compiled instance to a packed (compressed .npz) file."""
+        arrays = {
+            'nr_of_machines': np.int64(self.nr_of_machines),
+            'instance_name': np.array(self.instance_name),
+            'operation_job': self.operation_job,
+            'job_operations_ptr': self.job_operations_ptr,
+            'job_operations': self.job_operations,
+            'option_ptr': self.option_ptr,
+            'option_machine': self.option_machine,
+            'option_duration': self.option_duration,
+            'predecessor_ptr': self.predecessor_ptr,
+            'predecessors': self.predecessors,
+            'job_predecessor_ptr': self.job_predecessor_ptr,
+            'job_predecessors': self.job_predecessors,
+        }
+        if self.has_setup_times:
+            arrays['setup_class'] = self.setup_class
+            arrays['setup_times'] = self.setup_times
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledJobShop":
+        """Load a compiled instance from a packed (.npz) file."""
+        with np.load(path) as data:
+            return cls(str(data['instance_name']), int(data['nr_of_machines']), data['operation_job'],
+                       data['job_operations_ptr'], data['job_operations'], data['option_ptr'],
+                       data['option_machine'], data['option_duration'], data['predecessor_ptr'],
+                       data['predecessors'], data['job_predecessor_ptr'], data['job_predecessors'],
+                       data['setup_class'] if 'setup_class' in data else None,
+                       data['setup_times'] if 'setup_times' in data else None)
@@ -0,0 +1,31 @@
+import json
+
+
+def job_record(job, arrival_time, completion_time) -> dict:
+    """Return the archive record of a completed job: its arrival and completion time and the schedule of its
+    operations."""
+    return {
+        'job_id': job.job_id,
+        'arrival_time': arrival_time,
+        'completion_time': completion_time,
+        'operations': [{'operation_id': operation.operation_id,
+                        'machine_id': operation.scheduled_machine,
+                        'start_time': operation.scheduled_start_time,
+                        'end_time': operation.scheduled_end_time,
+                        'setup_time': operation.scheduling_information.get('setup_time', 0)}
+                       for operation in job.operations],
+    }
+
+
+class JsonLinesArchive:
+    """Archive sink that appends the records of completed jobs to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def __call__(self, record: dict) -> None:
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,53 @@
+class JobProgress:
+    """
+    Per-job counters of the remaining (not yet processed) operations and the remaining work, the sum of the average
+    processing times over the machine options of the remaining operations. The counters of a job are initialized at
+    the first query and updated when an operation of the job completes, so a query takes O(1) time.
+
+    The remaining work is recomputed as a left-to-right float sum over the remaining operations of the job when one of
+    its operations completes (O(job length) per completion), rather than decremented, so it is bit-identical to a fresh
+    sum and dispatching rules break ties exactly as when the work is summed at every query.
+    """
+
+    def __init__(self, processed_operations):
+        self.processed_operations = processed_operations
+        self._operations_remaining = {}
+        self._work_remaining = {}
+
+    @staticmethod
+    def average_processing_time(operation) -> float:
+        """Return the average processing time over the machine options of the operation."""
+        return sum(operation.processing_times.values()) / len(operation.processing_times)
+
+    def _sum_work_remaining(self, job) -> float:
+        return sum([self.average_processing_time(operation) for operation in job.operations
+                    if operation not in self.processed_operations])
+
+    def _add_job(self, job):
+        self._operations_remaining[job] = sum(
+            operation not in self.processed_operations for operation in job.operations)
+        self._work_remaining[job] = self._sum_work_remaining(job)
+
+    def operation_completed(self, operation) -> None:
+        """Update the counters of the job of an operation that has been added to the processed operations."""
+        job = operation.job
+        if job in self._operations_remaining:
+            self._operations_remaining[job] -= 1
+            self._work_remaining[job] = self._sum_work_remaining(job)
+
+    def operations_remaining(self, job) -> int:
+        """Return the number of operations of the job that have not been processed."""
+        if job not in self._operations_remaining:
+            self._add_job(job)
+        return self._operations_remaining[job]
+
+    def work_remaining(self, job) -> float:
+        """Return the sum of the average processing times of the operations of the job that have not been processed."""
+        if job not in self._work_remaining:
+            self._add_job(job)
+        return self._work_remaining[job]
+
+    def remove_job(self, job) -> None:
+        """Forget the counters of a job (e.g. after it has been evicted from the simulation)."""
+        self._operations_remaining.pop(job, None)
+        self._work_remaining.pop(job, None)
@@ -19,6 +19,7 @@ class JobShop:
         self._operations_to_be_scheduled: List[Operation] = []
         self._operations_available_for_scheduling: List[Operation] = []
         self._scheduled_operations: List[Operation] = []
+        self._nr_of_removed_jobs = 0
         self._instance_name: str = ""
 
     def __repr__(self):
@@ -67,6 +68,19 @@ class JobShop:
         """Add a job to the environment."""
         self._jobs.append(job)
 
+    def remove_job(self, job) -> None:
+        """Remove a (completed) job and its operations from the environment (streaming online simulations)."""
+        self._jobs.remove(job)
+        self._nr_of_removed_jobs += 1
+        removed = set(job.operations)
+        self._operations = [operation for operation in self._operations if operation not in removed]
+        self._operations_to_be_scheduled = [operation for operation in self._operations_to_be_scheduled
+                                            if operation not in removed]
+        self._scheduled_operations = [operation for operation in self._scheduled_operations
+                                      if operation not in removed]
+        for operation in job.operations:
+            self._precedence_relations_operations.pop(operation.operation_id, None)
+
     def add_precedence_relations_jobs(self, precedence_relations_jobs: Dict[int, List[int]]) -> None:
         """Add precedence relations between jobs --> applicable for assembly scheduling problems."""
         self._precedence_relations_jobs = precedence_relations_jobs
@@ -110,6 +124,11 @@ class JobShop:
         """Return the number of jobs."""
         return self._nr_of_jobs
 
+    @property
+    def nr_of_removed_jobs(self) -> int:
+        """Return the number of jobs that have been removed from the environment."""
+        return self._nr_of_removed_jobs
+
     @property
     def operations(self) -> List[Operation]:
         """Return all the operations."""
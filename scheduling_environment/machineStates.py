@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class MachineStates:
+    """
+    Per-machine cache of the end time and the id of the last operation scheduled on every machine, updated when an
+    operation starts. The earliest end time (EET) machines of an operation are computed with NumPy over the row of its
+    machine options, without looking up machines and their schedules.
+
+    The machine states only change when an operation starts, so the EET machines of an operation are memoized until
+    the next start or time advance: within a dispatching round every machine that considers the operation reuses them.
+    """
+
+    def __init__(self):
+        self.ready_time = np.zeros(0)
+        self.last_operation = np.zeros(0, dtype=np.int64)
+        self._rows = {}
+        self._earliest_end_time_machines = {}
+        self._stamp = None
+        self._nr_of_starts = 0
+
+    def add_machine(self) -> None:
+        """Add an idle machine without scheduled operations."""
+        self.ready_time = np.append(self.ready_time, 0.0)
+        self.last_operation = np.append(self.last_operation, -1)
+
+    def operation_started(self, operation, machine_id) -> None:
+        """Register the operation that has just been added to the schedule of the machine."""
+        self.ready_time[machine_id] = operation.scheduled_end_time
+        self.last_operation[machine_id] = operation.operation_id
+        self._nr_of_starts += 1
+
+    def _row(self, operation):
+        row = self._rows.get(operation)
+        if row is None:
+            machine_ids = np.fromiter(operation.processing_times.keys(), dtype=np.int64)
+            durations = np.fromiter(operation.processing_times.values(), dtype=np.float64)
+            row = self._rows[operation] = (machine_ids, durations)
+        return row
+
+    def forget(self, operation) -> None:
+        """Drop the cached machine options of an operation (e.g. after it has been evicted from the simulation)."""
+        self._rows.pop(operation, None)
+
+    def end_times(self, operation, now, sequence_dependent_setup_times=()):
+        """
+        Return the machine ids of the options of the operation and the times at which it would end on them: now plus
+        the processing time for a machine without operations, otherwise the end of its last operation plus the
+        (sequence dependent setup and) processing time.
+        """
+        machine_ids, durations = self._row(operation)
+        last_operation = self.last_operation[machine_ids]
+        idle = last_operation < 0
+        end_times = np.where(idle, now, self.ready_time[machine_ids]) + durations
+        if len(sequence_dependent_setup_times):
+            # the (nested list) setup matrix is only read at the options of the operation
+            operation_id = operation.operation_id
+            end_times += [sequence_dependent_setup_times[machine_id][previous_id][operation_id] if previous_id >= 0
+                          else 0 for machine_id, previous_id in zip(machine_ids.tolist(), last_operation.tolist())]
+        return machine_ids, end_times
+
+    def earliest_end_time_machines(self, operation, now, sequence_dependent_setup_times=()):
+        """Return the list of machine ids on which the operation would end the earliest."""
+        if self._stamp != (now, self._nr_of_starts):
+            self._stamp = (now, self._nr_of_starts)
+            self._earliest_end_time_machines.clear()
+        machines = self._earliest_end_time_machines.get(operation)
+        if machines is None:
+            machine_ids, end_times = self.end_times(operation, now, sequence_dependent_setup_times)
+            machines = self._earliest_end_time_machines[operation] = machine_ids[end_times == end_times.min()].tolist()
+        return machines
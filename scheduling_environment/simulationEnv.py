@@ -4,9 +4,13 @@ from typing import Dict, Optional
 import simpy
 
 from scheduling_environment.job import Job
+from scheduling_environment.jobArchive import job_record
+from scheduling_environment.jobProgress import JobProgress
 from scheduling_environment.jobShop import JobShop
 from scheduling_environment.machine import Machine
+from scheduling_environment.machineStates import MachineStates
 from scheduling_environment.operation import Operation
+from scheduling_environment.simulationKPIs import SimulationKPIs
 
 
 class SimulationEnv:
@@ -20,6 +24,23 @@ class SimulationEnv:
         self.online_arrivals = online_arrivals
         self.machine_resources = []
         self.processed_operations = set()
+        self.job_progress = JobProgress(self.processed_operations)
+        self.machine_states = MachineStates()
+        # event triggered when the state relevant for dispatching changes (operation completed, job arrived)
+        self.state_changed = self.simulator.event()
+
+        # streaming mode: completed jobs are evicted to the archive sink, only the work in progress is kept
+        self.streaming = False
+        self.archive = None
+        self.arrival_times = {}
+        self._completed_jobs = []
+        self._evicted_last_operations = {}
+
+        # streaming key performance indicators of an online simulation (None unless enabled)
+        self.kpis = None
+
+        # random stream of the online job arrivals (the global random module unless a replication sets its own stream)
+        self.rng = random
 
         # Parameters related to online job arrivals
         self.inter_arrival_time: Optional[int] = None
@@ -36,9 +57,48 @@ class SimulationEnv:
         self.min_duration_per_operation = parameters['min_duration_per_operation']
         self.max_duration_per_operation = parameters['max_duration_per_operation']
 
+    def enable_streaming(self, archive=None) -> None:
+        """
+        Enable the streaming mode for long online simulations: completed jobs are removed from the environment and
+        passed to the archive, a callable receiving the record of every completed job (e.g. a JsonLinesArchive), or
+        discarded if archive is None. The memory use and the cost per event then depend on the work in progress only.
+        """
+        self.streaming = True
+        self.archive = archive
+
+    def enable_kpis(self, sample_interval=None, quantiles=(0.5, 0.9, 0.95)) -> None:
+        """
+        Accumulate streaming key performance indicators of the online simulation (WIP, queue lengths, utilization,
+        flowtime quantiles and throughput) in self.kpis, sampled into a time series every sample_interval time units
+        (no time series if None). Must be called before the simulation starts.
+        """
+        self.kpis = SimulationKPIs(sample_interval, quantiles)
+
     def add_machine_resources(self) -> None:
         """Add a machine to the environment."""
         self.machine_resources.append(simpy.Resource(self.simulator, capacity=1))
+        self.machine_states.add_machine()
+        if self.kpis is not None:
+            self.kpis.add_machine()
+
+    def machine_available(self, machine_id) -> bool:
+        """Return whether the machine is not processing an operation."""
+        return self.machine_resources[machine_id].count == 0
+
+    def dispatch(self, operation, machine) -> None:
+        """Start a process performing the operation on the machine."""
+        self.simulator.process(self.perform_operation(operation, machine))
+
+    def wait_for_state_change(self):
+        """Return an event that is triggered at the next operation completion or job arrival."""
+        if self.state_changed.triggered:
+            self.state_changed = self.simulator.event()
+        return self.state_changed
+
+    def notify_state_change(self) -> None:
+        """Wake up the processes waiting for a state change (at most once per state_changed event)."""
+        if not self.state_changed.triggered:
+            self.state_changed.succeed()
 
     def perform_operation(self, operation, machine):
         """Perform operation on the machine (block resource for certain amount of time)"""
@@ -56,8 +116,64 @@ class SimulationEnv:
                 start_time = self.simulator.now + setup_time
                 processing_time = operation.processing_times[machine.machine_id]
                 machine.add_operation_to_schedule_at_time(operation, start_time, processing_time, setup_time)
-                yield self.simulator.timeout(processing_time + setup_time - 0.0001)
+                self.machine_states.operation_started(operation, machine.machine_id)
+                if self.kpis is not None:
+                    self.kpis.operation_started(self.simulator.now, machine.machine_id, operation.processing_times)
+                evicted_operation = self._evicted_last_operations.pop(machine.machine_id, None)
+                if evicted_operation is not None:
+                    machine._processed_operations.remove(evicted_operation)
+                yield self.simulator.timeout(processing_time + setup_time)
                 self.processed_operations.add(operation)
+                self.job_progress.operation_completed(operation)
+                if self.kpis is not None:
+                    self._update_kpis(operation, machine.machine_id)
+                if self.streaming and self.job_progress.operations_remaining(operation.job) == 0:
+                    self._completed_jobs.append(operation.job)
+            # the machine is released, wake up the scheduler
+            self.notify_state_change()
+
+    def _update_kpis(self, operation, machine_id) -> None:
+        """Register the completion of the operation: release its successors, and complete its job if it was the last."""
+        now = self.simulator.now
+        self.kpis.operation_completed(now, machine_id)
+        job = operation.job
+        if self.job_progress.operations_remaining(job) == 0:
+            self.kpis.job_completed(now, now - self.arrival_times[job])
+            return
+        for successor in job.operations:
+            if operation in successor.predecessors and all(
+                    predecessor in self.processed_operations for predecessor in successor.predecessors):
+                self.kpis.operation_released(now, successor.processing_times)
+
+    def evict_completed_jobs(self) -> None:
+        """
+        Pass the jobs completed since the last call to the archive and remove them from the environment (streaming
+        mode). The last operation of a machine stays in its schedule until the machine starts its next operation, as
+        the earliest end times and setup times depend on it.
+        """
+        for job in self._completed_jobs:
+            completion_time = max(operation.scheduled_end_time for operation in job.operations)
+            if self.archive is not None:
+                self.archive(job_record(job, self.arrival_times.get(job), completion_time))
+            self.arrival_times.pop(job, None)
+            for operation in job.operations:
+                self.processed_operations.discard(operation)
+                self.machine_states.forget(operation)
+                machine = self.jobShopEnv.machines[operation.scheduled_machine]
+                if machine._processed_operations[-1] is operation:
+                    self._evicted_last_operations[machine.machine_id] = operation
+                else:
+                    machine._processed_operations.remove(operation)
+            self.job_progress.remove_job(job)
+            self.jobShopEnv.remove_job(job)
+        self._completed_jobs = []
+
+    def close_archive(self) -> None:
+        """Archive the remaining completed jobs and close the archive (if it can be closed)."""
+        if self.streaming:
+            self.evict_completed_jobs()
+        if hasattr(self.archive, 'close'):
+            self.archive.close()
 
     def generate_online_job_arrivals(self):
         """generate online arrivals of jobs (online arrivals==True)"""
@@ -69,7 +185,7 @@ class SimulationEnv:
             self.add_machine_resources()
 
         while True:
-            inter_arrival_time = random.expovariate(1.0 / self.inter_arrival_time)
+            inter_arrival_time = self.rng.expovariate(1.0 / self.inter_arrival_time)
             yield self.simulator.timeout(inter_arrival_time)
 
             # Job generation logic
@@ -77,27 +193,35 @@ class SimulationEnv:
             job = Job(job_id)
 
             # Add some logic to generate operations for each job
-            num_operations = random.randint(self.min_nr_operations_per_job,
+            num_operations = self.rng.randint(self.min_nr_operations_per_job,
                                             self.max_nr_operations_per_job)
+            previous_operation = None
             for i in range(num_operations):
                 operation = Operation(job, job_id, operation_id)
                 self.jobShopEnv.add_operation(operation)
                 for machine_id in range(self.jobShopEnv.nr_of_machines):
-                    duration = random.randint(self.min_duration_per_operation,
+                    duration = self.rng.randint(self.min_duration_per_operation,
                                               self.max_duration_per_operation)
                     operation.add_operation_option(machine_id, duration)
                 job.add_operation(operation)
                 if counter != 0:
-                    self.jobShopEnv.precedence_relations_operations[operation_id] = [
-                        self.jobShopEnv.get_operation(operation_id - 1)]
-                    operation.add_predecessors([self.jobShopEnv.get_operation(operation_id - 1)])
+                    self.jobShopEnv.precedence_relations_operations[operation_id] = [previous_operation]
+                    operation.add_predecessors([previous_operation])
                 else:
                     self.jobShopEnv.precedence_relations_operations[operation_id] = []
 
+                previous_operation = operation
                 counter += 1
                 operation_id += 1
 
             self.jobShopEnv.add_job(job)
             self.jobShopEnv.set_nr_of_jobs(self.jobShopEnv.nr_of_jobs + 1)
+            self.arrival_times[job] = self.simulator.now
+            if self.kpis is not None:
+                self.kpis.job_arrived(self.simulator.now)
+                for operation in job.operations:
+                    if not operation.predecessors:
+                        self.kpis.operation_released(self.simulator.now, operation.processing_times)
+            self.notify_state_change()
             # print(f"Job {job_id} generated with {num_operations} operations")  # Debugging print statement
             job_id += 1
\ No newline at end of file
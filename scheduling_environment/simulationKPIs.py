@@ -0,0 +1,200 @@
+import math
+from array import array
+
+import numpy as np
+
+
+class P2Quantile:
+    """
+    Streaming estimate of a quantile with the P-square algorithm (Jain and Chlamtac, 1985): five markers are adjusted
+    with piecewise-parabolic interpolation at every observation, in O(1) time and memory.
+    """
+
+    def __init__(self, probability: float):
+        self.probability = probability
+        self._initial = []
+        self._heights = None
+
+    def add(self, value) -> None:
+        """Add an observation."""
+        if self._heights is None:
+            self._initial.append(value)
+            if len(self._initial) == 5:
+                p = self.probability
+                self._heights = sorted(self._initial)
+                self._positions = [0, 1, 2, 3, 4]
+                self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+                self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+            return
+
+        q, n = self._heights, self._positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # move the middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                        (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                        + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def value(self) -> float:
+        """Return the current estimate (exact for less than five observations, NaN without observations)."""
+        if self._heights is not None:
+            return self._heights[2]
+        if not self._initial:
+            return math.nan
+        values = sorted(self._initial)
+        return values[round(self.probability * (len(values) - 1))]
+
+
+class SimulationKPIs:
+    """
+    Streaming key performance indicators of an online simulation, updated in O(1) per event (O(machine options) for
+    releases and starts of operations) without keeping the history:
+        - WIP: the number of arrived, uncompleted jobs (current and time average)
+        - queue lengths: the number of released operations waiting to be started that can be processed on a machine
+        - utilization: the fraction of time a machine is busy (setup and processing)
+        - flowtime: mean and streaming quantiles (P-square) of the completion time minus the arrival time of the jobs
+        - throughput: the number of completed jobs per time unit
+
+    Time integrals are accumulated lazily per machine when its state changes. If a sample_interval is given, the
+    state is sampled every sample_interval time units into a compact time series (typed arrays of floats); samples
+    are taken at the first event after a sampling time, with the state that held at the sampling time.
+    """
+
+    def __init__(self, sample_interval=None, quantiles=(0.5, 0.9, 0.95)):
+        self.sample_interval = sample_interval
+        self.time = 0.0
+        self.wip = 0
+        self._wip_area = 0.0
+        self.completed_jobs = 0
+        self._flowtime_sum = 0.0
+        self._flowtime_quantiles = {probability: P2Quantile(probability) for probability in quantiles}
+
+        self.queue_lengths = []
+        self._queue_area = []
+        self._queue_changed = []
+        self.busy_machines = 0
+        self._busy_since = []
+        self._busy_time = []
+
+        self._next_sample = sample_interval if sample_interval else math.inf
+        self._samples = {'time': array('d'), 'wip': array('d'), 'busy_machines': array('d'),
+                         'completed_jobs': array('d')}
+        self._queue_samples = array('d')
+
+    def add_machine(self) -> None:
+        """Add an idle machine with an empty queue."""
+        self.queue_lengths.append(0)
+        self._queue_area.append(0.0)
+        self._queue_changed.append(self.time)
+        self._busy_since.append(None)
+        self._busy_time.append(0.0)
+
+    def _advance(self, now) -> None:
+        while self._next_sample <= now:
+            self._sample(self._next_sample)
+            self._next_sample += self.sample_interval
+        self._wip_area += self.wip * (now - self.time)
+        self.time = now
+
+    def _sample(self, time) -> None:
+        self._samples['time'].append(time)
+        self._samples['wip'].append(self.wip)
+        self._samples['busy_machines'].append(self.busy_machines)
+        self._samples['completed_jobs'].append(self.completed_jobs)
+        self._queue_samples.extend(self.queue_lengths)
+
+    def _change_queue(self, machine_id, change) -> None:
+        self._queue_area[machine_id] += self.queue_lengths[machine_id] * (self.time - self._queue_changed[machine_id])
+        self._queue_changed[machine_id] = self.time
+        self.queue_lengths[machine_id] += change
+
+    def job_arrived(self, now) -> None:
+        """Register the arrival of a job."""
+        self._advance(now)
+        self.wip += 1
+
+    def operation_released(self, now, machine_ids) -> None:
+        """Register an operation that can be started (all predecessors completed) on the given machines."""
+        self._advance(now)
+        for machine_id in machine_ids:
+            self._change_queue(machine_id, 1)
+
+    def operation_started(self, now, machine_id, machine_ids) -> None:
+        """Register the start of a released operation (with the given machine options) on a machine."""
+        self._advance(now)
+        for option in machine_ids:
+            self._change_queue(option, -1)
+        self._busy_since[machine_id] = now
+        self.busy_machines += 1
+
+    def operation_completed(self, now, machine_id) -> None:
+        """Register the completion of the operation on a machine."""
+        self._advance(now)
+        self._busy_time[machine_id] += now - self._busy_since[machine_id]
+        self._busy_since[machine_id] = None
+        self.busy_machines -= 1
+
+    def job_completed(self, now, flowtime) -> None:
+        """Register the completion of a job with the given flowtime."""
+        self._advance(now)
+        self.wip -= 1
+        self.completed_jobs += 1
+        self._flowtime_sum += flowtime
+        for quantile in self._flowtime_quantiles.values():
+            quantile.add(flowtime)
+
+    def summary(self, now) -> dict:
+        """Return the indicators over [0, now]."""
+        self._advance(now)
+        machine_utilization = [(busy_time + (now - busy_since if busy_since is not None else 0)) / now if now else 0.0
+                               for busy_time, busy_since in zip(self._busy_time, self._busy_since)]
+        average_queue_lengths = [(area + length * (now - changed)) / now if now else 0.0 for area, length, changed in
+                                 zip(self._queue_area, self.queue_lengths, self._queue_changed)]
+        return {
+            'time': now,
+            'wip': self.wip,
+            'average_wip': self._wip_area / now if now else 0.0,
+            'completed_jobs': self.completed_jobs,
+            'throughput': self.completed_jobs / now if now else 0.0,
+            'utilization': sum(machine_utilization) / len(machine_utilization) if machine_utilization else 0.0,
+            'machine_utilization': machine_utilization,
+            'queue_lengths': list(self.queue_lengths),
+            'average_queue_lengths': average_queue_lengths,
+            'flowtime_mean': self._flowtime_sum / self.completed_jobs if self.completed_jobs else math.nan,
+            'flowtime_quantiles': {probability: quantile.value()
+                                   for probability, quantile in self._flowtime_quantiles.items()},
+        }
+
+    def time_series(self) -> dict:
+        """
+        Return the sampled time series as NumPy arrays: time, wip, busy_machines, completed_jobs (cumulative),
+        throughput (completed jobs per time unit since the previous sample) and queue_lengths (samples x machines).
+        """
+        series = {name: np.frombuffer(values, dtype=np.float64).copy() for name, values in self._samples.items()}
+        previous_time = np.concatenate(([0.0], series['time'][:-1]))
+        previous_completed = np.concatenate(([0.0], series['completed_jobs'][:-1]))
+        series['throughput'] = (series['completed_jobs'] - previous_completed) / (series['time'] - previous_time)
+        series['queue_lengths'] = np.frombuffer(self._queue_samples, dtype=np.float64).reshape(
+            len(series['time']), len(self.queue_lengths)).copy()
+        return series
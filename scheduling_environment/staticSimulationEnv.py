@@ -0,0 +1,83 @@
+import heapq
+import itertools
+
+from scheduling_environment.jobProgress import JobProgress
+from scheduling_environment.jobShop import JobShop
+from scheduling_environment.machineStates import MachineStates
+
+
+class EventLoop:
+    """
+    Minimal discrete-event kernel: a heap of (time, sequence number, callback) entries. Events at the same time are
+    processed in the order in which they were scheduled, as in simpy.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self._queue = []
+        self._sequence = itertools.count()
+
+    def schedule(self, delay, callback, *args) -> None:
+        """Call callback(*args) after delay time units."""
+        heapq.heappush(self._queue, (self.now + delay, next(self._sequence), callback, args))
+
+    def peek(self):
+        """Return the time of the next event, or None if there are no events."""
+        return self._queue[0][0] if self._queue else None
+
+    def run(self, until) -> None:
+        """Process all events up to and including time until, and advance the clock to until."""
+        queue = self._queue
+        while queue and queue[0][0] <= until:
+            time, _, callback, args = heapq.heappop(queue)
+            self.now = time
+            callback(*args)
+        self.now = until
+
+
+class StaticSimulationEnv:
+    """
+    Simulation environment for static instances (all jobs available at time 0) on a native event loop, without simpy
+    resources and processes. It offers the interface of SimulationEnv used by the dispatching rules (jobShopEnv,
+    processed_operations, simulator.now, machine_available() and dispatch()) and produces identical schedules.
+    """
+
+    def __init__(self):
+        self.simulator = EventLoop()
+        self.jobShopEnv = JobShop()
+        self.online_arrivals = False
+        self.processed_operations = set()
+        self.job_progress = JobProgress(self.processed_operations)
+        self.machine_states = MachineStates()
+        self._machine_busy = []
+
+    def add_machine_resources(self) -> None:
+        """Add a machine to the environment."""
+        self._machine_busy.append(False)
+        self.machine_states.add_machine()
+
+    def machine_available(self, machine_id) -> bool:
+        """Return whether the machine is not processing an operation."""
+        return not self._machine_busy[machine_id]
+
+    def dispatch(self, operation, machine) -> None:
+        """Start the operation on the machine at the current time, after the dispatching round (as a simpy process
+        started by the scheduler)."""
+        self._machine_busy[machine.machine_id] = True
+        self.simulator.schedule(0, self._start_operation, operation, machine)
+
+    def _start_operation(self, operation, machine):
+        setup_time = 0
+        if machine.scheduled_operations != [] and self.jobShopEnv._sequence_dependent_setup_times != []:
+            setup_time = self.jobShopEnv._sequence_dependent_setup_times[machine.machine_id][
+                machine.scheduled_operations[-1].operation_id][operation.operation_id]
+        start_time = self.simulator.now + setup_time
+        processing_time = operation.processing_times[machine.machine_id]
+        machine.add_operation_to_schedule_at_time(operation, start_time, processing_time, setup_time)
+        self.machine_states.operation_started(operation, machine.machine_id)
+        self.simulator.schedule(processing_time + setup_time, self._complete_operation, operation, machine)
+
+    def _complete_operation(self, operation, machine):
+        self.processed_operations.add(operation)
+        self.job_progress.operation_completed(operation)
+        self._machine_busy[machine.machine_id] = False
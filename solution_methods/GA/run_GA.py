@@ -2,11 +2,15 @@ import argparse
 import logging
 import os
 
-from deap import tools
+from deap import creator, tools
 
 from visualization import gantt_chart, precedence_chart
 from solution_methods.helper_functions import load_parameters, load_job_shop_env
-from solution_methods.GA.src.operators import (evaluate_individual, evaluate_population, repair_precedence_constraints, variation)
+from solution_methods.GA.src.island_model import run_islands
+from solution_methods.GA.src.operators import evaluate_individual, evolve_generation
+from solution_methods.GA.src.run_state import load_state, restore_state, save_state
+from solution_methods.GA.src.steady_state import evolve_steady_state
+from solution_methods.GA.src.stopping import StoppingCriteria
 from solution_methods.GA.utils import record_stats, output_dir_exp_name, results_saving
 from solution_methods.GA.src.initialization import initialize_run
 
@@ -14,71 +18,148 @@ logging.basicConfig(level=logging.INFO)
 PARAM_FILE = "../../configs/GA.toml"
 
 
-def run_GA(jobShopEnv, population, toolbox, stats, hof, **kwargs):
+def _cache_record(toolbox):
+    """Return the fitness cache and checkpoint statistics for the logbook (empty if neither is used)."""
+    record = toolbox.cache_statistics() if hasattr(toolbox, "cache_statistics") else {}
+    if hasattr(toolbox, "checkpoint_statistics"):
+        record.update(toolbox.checkpoint_statistics())
+    return record
+
+
+def _evaluation_state(toolbox):
+    """Return the state of the fitness cache and the decoder checkpoints (for the state file)."""
+    state = {}
+    if hasattr(toolbox, "cache_state"):
+        state["fitness_cache"] = toolbox.cache_state()
+    if hasattr(toolbox, "checkpoint_state"):
+        state["checkpoint_store"] = toolbox.checkpoint_state()
+    return state
+
+
+def _restore_evaluation_state(toolbox, state):
+    """Restore the fitness cache and the decoder checkpoints saved by _evaluation_state()."""
+    if hasattr(toolbox, "restore_cache") and "fitness_cache" in state:
+        toolbox.restore_cache(state["fitness_cache"])
+    if hasattr(toolbox, "restore_checkpoints") and "checkpoint_store" in state:
+        toolbox.restore_checkpoints(state["checkpoint_store"])
+
+
+def run_GA(jobShopEnv, population, toolbox, stats, hof, run_info=None, resume_from=None, **kwargs):
     """Executes the genetic algorithm and returns the best individual.
 
     Args:
         jobShopEnv: The problem environment.
-        population: The initial population.
+        population: The initial population (ignored when resuming).
         toolbox: DEAP toolbox.
         stats: DEAP statistics.
         hof: Hall of Fame.
+        run_info: Optional dict, filled with the stopping reason, time to best and generations of the run.
+        resume_from: Optional path of a GA state file (see output.state_interval) to resume the run from.
         kwargs: Additional keyword arguments.
 
     Returns:
         The best individual found by the genetic algorithm.
     """
+    stopping_criteria = StoppingCriteria.from_parameters(jobShopEnv, **kwargs)
+    if kwargs['algorithm'].get('islands', 1) > 1:
+        # Island mode: sub-populations evolve in separate processes, with periodic migration
+        if resume_from or kwargs['output'].get('state_interval', 0):
+            raise ValueError("Saving the state (output.state_interval) and resuming are not supported in island mode")
+        run_islands(jobShopEnv, population, hof, stopping_criteria, **kwargs)
+    elif kwargs['algorithm'].get('steady_state', False):
+        # Asynchronous steady-state GA: offspring are evaluated and inserted one at a time by its own process pool
+        if resume_from or kwargs['output'].get('state_interval', 0):
+            raise ValueError("Saving the state (output.state_interval) and resuming are not supported in steady-state "
+                             "mode")
+        if hasattr(toolbox, "close_pool"):
+            toolbox.close_pool()
+        evolve_steady_state(jobShopEnv, population, toolbox, stats, hof, stopping_criteria, **kwargs)
+    else:
+        evolve(jobShopEnv, population, toolbox, stats, hof, stopping_criteria, resume_from, **kwargs)
+
+    # Shut down the worker pool if it was created for this run
+    if hasattr(toolbox, "close_pool"):
+        toolbox.close_pool()
+
+    best = toolbox.schedule_order(hof[0]) if hasattr(toolbox, "schedule_order") else hof[0]
+    makespan, jobShopEnv = evaluate_individual(best, jobShopEnv, reset=False)
+    logging.info(f"Makespan: {makespan}, stopped after {stopping_criteria.generations} generations "
+                 f"({stopping_criteria.stopping_reason}), best found after {stopping_criteria.time_to_best:.2f}s")
+    if run_info is not None:
+        run_info.update(stopping_criteria.results())
+    return makespan, jobShopEnv
 
-    # Initial population setup for Hall of Fame and statistics
-    hof.update(population)
 
-    gen = 0
-    logbook = tools.Logbook()
-    logbook.header = ["gen"] + (stats.fields if stats else [])
-    df_list = []
+def evolve(jobShopEnv, population, toolbox, stats, hof, stopping_criteria=None, resume_from=None, **kwargs):
+    """Evolves a single population for at most ngen generations (or until a stopping criterion is met), updating the
+    population and hall of fame in place.
 
-    # Initial statistics recording
-    record_stats(gen, population, logbook, stats, kwargs['output']['logbook'], df_list, logging)
-    if kwargs['output']['logbook']:
-        logging.info(logbook.stream)
-
-    for gen in range(1, kwargs['algorithm']['ngen'] + 1):
-        # Vary the population
-        offspring = variation(population, toolbox,
-                              pop_size=kwargs['algorithm'].get('population_size'),
-                              cr = kwargs['algorithm'].get('cr'),
-                              indpb = kwargs['algorithm'].get('indpb'))
-
-        # Repair precedence constraints if the environment requires it (only for assembly scheduling (fajsp))
-        if any(keyword in jobShopEnv.instance_name for keyword in ['/dafjs/', '/yfjs/']):
-            try:
-                offspring = repair_precedence_constraints(jobShopEnv, offspring)
-            except Exception as e:
-                logging.error(f"Error repairing precedence constraints: {e}")
-                continue
-
-        # Evaluate offspring fitness
-        try:
-            fitnesses = evaluate_population(toolbox, offspring)
-            for ind, fit in zip(offspring, fitnesses):
-                ind.fitness.values = fit
-        except Exception as e:
-            logging.error(f"Error evaluating offspring fitness: {e}")
-            continue
-
-        # Select the next generation
-        population[:] = toolbox.select(population + offspring)
-
-        # Update Hall of Fame and statistics with the new generation
-        hof.update(population)
-        record_stats(gen, population, logbook, stats, kwargs['output']['logbook'], df_list, logging)
+    Every output.state_interval generations (and at the end of the run) the state of the run is saved to
+    output.state_file, a run resumed from such a file continues exactly as the uninterrupted run.
 
-    makespan, jobShopEnv = evaluate_individual(hof[0], jobShopEnv, reset=False)
-    logging.info(f"Makespan: {makespan}")
-    return makespan, jobShopEnv
+    Returns:
+        The logbook of the run.
+    """
+    verbose = kwargs['output']['logbook']
+    state_interval = kwargs['output'].get('state_interval', 0)
+    state_file = kwargs['output'].get('state_file', 'GA_state.bin')
+    if stopping_criteria is None:
+        stopping_criteria = StoppingCriteria()
+    df_list = []
 
+    if resume_from is not None:
+        # Continue from the saved population, hall of fame, logbook and RNG states
+        state = load_state(resume_from)
+        start_gen, restored_population, logbook = restore_state(state, creator.Individual, hof, stopping_criteria)
+        _restore_evaluation_state(toolbox, state["evaluation_state"])
+        if population is None:
+            population = restored_population
+        else:
+            population[:] = restored_population
+        logging.info(f"Resumed from {resume_from} at generation {start_gen}")
+    else:
+        # Initial population setup for Hall of Fame and statistics
+        hof.update(population)
 
-def main(param_file=PARAM_FILE):
+        start_gen = 0
+        logbook = tools.Logbook()
+        logbook.header = ["gen"] + (stats.fields if stats else [])
+        if hasattr(toolbox, "cache_statistics"):
+            logbook.header += ["cache_hit_rate", "cache_size"]
+        if hasattr(toolbox, "checkpoint_statistics"):
+            logbook.header += ["skipped_gene_rate"]
+
+        # Initial statistics recording
+        record_stats(start_gen, population, logbook, stats, verbose, df_list, logging, _cache_record(toolbox))
+        if verbose:
+            logging.info(logbook.stream)
+        if stopping_criteria.update(start_gen, hof[0].fitness.values[0]):
+            if state_interval:
+                save_state(state_file, start_gen, population, hof, logbook, stopping_criteria,
+                           _evaluation_state(toolbox))
+            return logbook
+
+    gen = start_gen
+    for gen in range(start_gen + 1, kwargs['algorithm']['ngen'] + 1):
+        # Vary, repair, evaluate and select
+        next_population = evolve_generation(jobShopEnv, population, toolbox, **kwargs)
+        if next_population is not None:
+            population[:] = next_population
+
+            # Update Hall of Fame and statistics with the new generation
+            hof.update(population)
+            record_stats(gen, population, logbook, stats, verbose, df_list, logging, _cache_record(toolbox))
+
+        stop = stopping_criteria.update(gen, hof[0].fitness.values[0])
+        if state_interval and (stop or gen % state_interval == 0 or gen == kwargs['algorithm']['ngen']):
+            save_state(state_file, gen, population, hof, logbook, stopping_criteria, _evaluation_state(toolbox))
+        if stop:
+            break
+
+    return logbook
+
+
+def main(param_file=PARAM_FILE, resume=False):
     try:
         parameters = load_parameters(param_file)
         logging.info(f"Parameters loaded from {param_file}.")
@@ -88,8 +169,10 @@ def main(param_file=PARAM_FILE):
 
     # Load the job shop environment, and initialize the genetic algorithm
     jobShopEnv = load_job_shop_env(parameters['instance'].get('problem_instance'))
-    population, toolbox, stats, hof = initialize_run(jobShopEnv, **parameters)
-    makespan, jobShopEnv = run_GA(jobShopEnv, population, toolbox, stats, hof, **parameters)
+    population, toolbox, stats, hof = initialize_run(jobShopEnv, resume=resume, **parameters)
+    resume_from = parameters['output'].get('state_file', 'GA_state.bin') if resume else None
+    run_info = {}
+    makespan, jobShopEnv = run_GA(jobShopEnv, population, toolbox, stats, hof, run_info, resume_from, **parameters)
 
     if makespan is not None:
         # Check output configuration and prepare output paths if needed
@@ -122,7 +205,7 @@ def main(param_file=PARAM_FILE):
 
         # Save results if enabled
         if save_results:
-            results_saving(makespan, output_dir, parameters)
+            results_saving(makespan, output_dir, parameters, run_info)
             logging.info(f"Results saved to {output_dir}")
 
 
@@ -134,5 +217,10 @@ if __name__ == "__main__":
         default=PARAM_FILE,
         help="path to configuration file",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="resume the run from the state file (output.state_file) of an interrupted run",
+    )
     args = parser.parse_args()
-    main(param_file=args.config_file)
+    main(param_file=args.config_file, resume=args.resume)
@@ -0,0 +1,104 @@
+from bisect import bisect_right
+from collections import OrderedDict
+
+from solution_methods.GA.src.decoder import ScheduleDecoder
+
+
+class CheckpointStore:
+    """
+    LRU-bounded store of decoder checkpoints of evaluated individuals, for incremental re-evaluation of their offspring.
+
+    Every evaluated individual gets a `checkpoint_id` attribute referring to its chromosome and the decoder states
+    taken every `checkpoint_interval` genes. Offspring are clones of a parent and inherit its checkpoint_id, so an
+    offspring resumes decoding from the last parent checkpoint before its first differing gene: the first position
+    where the operation sequences differ, or where an operation with a changed machine selection is placed.
+    """
+
+    def __init__(self, decoder: ScheduleDecoder, checkpoint_interval, maxsize=1000):
+        self.decoder = decoder
+        self.checkpoint_interval = checkpoint_interval
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self.decoded_genes = 0
+        self.skipped_genes = 0
+        self._recorded_decoded_genes = 0
+        self._recorded_skipped_genes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def gene_positions(self, operation_sequence):
+        """Return the position in the operation sequence of every operation."""
+        job_operations = self.decoder.job_operations
+        job_cursor = [0] * self.decoder.nr_of_jobs
+        positions = [0] * self.decoder.nr_of_operations
+        for gene, job_id in enumerate(operation_sequence):
+            positions[job_operations[job_id][job_cursor[job_id]]] = gene
+            job_cursor[job_id] += 1
+        return positions
+
+    def first_difference(self, individual, entry) -> int:
+        """Return the first gene from which the individual decodes differently from the stored chromosome."""
+        machine_selection, operation_sequence, positions, _ = entry
+        first_gene = len(operation_sequence)
+        for gene, (job_id, parent_job_id) in enumerate(zip(individual[1], operation_sequence)):
+            if job_id != parent_job_id:
+                first_gene = gene
+                break
+        for operation_id, (selection, parent_selection) in enumerate(zip(individual[0], machine_selection)):
+            if selection != parent_selection and positions[operation_id] < first_gene:
+                first_gene = positions[operation_id]
+        return first_gene
+
+    def evaluate(self, individuals):
+        """Evaluate the individuals, resuming from parent checkpoints where available. Returns a list of fitnesses."""
+        fitnesses = []
+        for individual in individuals:
+            checkpoint_id = getattr(individual, 'checkpoint_id', None)
+            entry = self._entries.get(checkpoint_id)
+            checkpoint, parent_checkpoints = None, []
+            if entry is not None:
+                self._entries.move_to_end(checkpoint_id)
+                first_gene = self.first_difference(individual, entry)
+                parent_checkpoints = entry[3][:bisect_right([c.position for c in entry[3]], first_gene)]
+                if parent_checkpoints:
+                    checkpoint = parent_checkpoints[-1]
+                    self.skipped_genes += checkpoint.position
+            self.decoded_genes += len(individual[1]) - (checkpoint.position if checkpoint else 0)
+
+            makespan, checkpoints = self.decoder.decode_incremental(individual, checkpoint, self.checkpoint_interval)
+            fitnesses.append((makespan,))
+            self._store(individual, parent_checkpoints + checkpoints)
+        return fitnesses
+
+    def _store(self, individual, checkpoints):
+        checkpoint_id = self._next_id
+        self._next_id += 1
+        chromosome = (list(individual[0]), list(individual[1]))
+        self._entries[checkpoint_id] = chromosome + (self.gene_positions(individual[1]), checkpoints)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        individual.checkpoint_id = checkpoint_id
+
+    def state(self) -> dict:
+        """Return the stored checkpoints (in LRU order), the next checkpoint id and the gene counters."""
+        return {"entries": list(self._entries.items()), "next_id": self._next_id,
+                "decoded_genes": self.decoded_genes, "skipped_genes": self.skipped_genes,
+                "recorded_decoded_genes": self._recorded_decoded_genes,
+                "recorded_skipped_genes": self._recorded_skipped_genes}
+
+    def restore(self, state) -> None:
+        """Restore the checkpoints and the counters returned by state()."""
+        self._entries = OrderedDict(state["entries"])
+        self._next_id = state["next_id"]
+        self.decoded_genes, self.skipped_genes = state["decoded_genes"], state["skipped_genes"]
+        self._recorded_decoded_genes = state["recorded_decoded_genes"]
+        self._recorded_skipped_genes = state["recorded_skipped_genes"]
+
+    def statistics(self):
+        """Return the fraction of genes skipped by resuming from checkpoints since the previous call (for the logbook)."""
+        decoded = self.decoded_genes - self._recorded_decoded_genes
+        skipped = self.skipped_genes - self._recorded_skipped_genes
+        self._recorded_decoded_genes, self._recorded_skipped_genes = self.decoded_genes, self.skipped_genes
+        return {"skipped_gene_rate": skipped / (decoded + skipped) if decoded + skipped else 0.0}
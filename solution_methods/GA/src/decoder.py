@@ -0,0 +1,423 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+
+
+class ScheduleDecoder:
+    """
+    Decodes GA chromosomes ([machine_selection, operation_sequence]) on the arrays of a CompiledJobShop, without
+    building or mutating any JobShop, Operation or Machine objects.
+
+    The decoder reproduces the schedule of evaluate_individual exactly: operations are taken from the job cursors in
+    sequence order and placed on the selected machine at the earliest time, using the same backfilling rules as
+    Machine.add_operation_to_schedule_backfilling. The compiled arrays are converted to plain lists once, as indexing
+    lists is considerably cheaper than indexing NumPy arrays element by element.
+    """
+
+    def __init__(self, compiled: CompiledJobShop):
+        self.nr_of_jobs = compiled.nr_of_jobs
+        self.nr_of_machines = compiled.nr_of_machines
+        self.nr_of_operations = compiled.nr_of_operations
+
+        job_operations_ptr = compiled.job_operations_ptr.tolist()
+        job_operations = compiled.job_operations.tolist()
+        self.job_operations = [job_operations[job_operations_ptr[job_id]:job_operations_ptr[job_id + 1]]
+                               for job_id in range(self.nr_of_jobs)]
+
+        predecessor_ptr = compiled.predecessor_ptr.tolist()
+        predecessors = compiled.predecessors.tolist()
+        self.predecessors = [predecessors[predecessor_ptr[operation_id]:predecessor_ptr[operation_id + 1]]
+                             for operation_id in range(self.nr_of_operations)]
+
+        # option tables, sorted by machine id per operation (the order used for the machine selection genes)
+        self.option_ptr = compiled.option_ptr.tolist()
+        self.option_machine = compiled.option_machine.tolist()
+        self.option_duration = compiled.option_duration.tolist()
+
+        self.setup_class = compiled.setup_class.tolist() if compiled.has_setup_times else None
+        self.setup_times = compiled.setup_times.tolist() if compiled.has_setup_times else None
+
+    def decode(self, individual) -> int:
+        """Return the makespan of the schedule encoded by the individual."""
+        return max(self.decode_schedule(individual)[2])
+
+    def decode_schedule(self, individual):
+        """Decode the individual and return the (machine, start_time, end_time) lists, indexed by operation id."""
+        state = self._initial_state()
+        self._decode(individual, state, 0)
+        return state.operation_machine, state.start_times, state.end_times
+
+    def decode_incremental(self, individual, checkpoint=None, checkpoint_interval=0):
+        """Decode the individual, resuming from a checkpoint of a chromosome with the same genes before it.
+
+        Args:
+            individual: Chromosome [machine_selection, operation_sequence].
+            checkpoint: DecoderCheckpoint taken while decoding a chromosome whose first checkpoint.position genes (and
+                the machine selections of their operations) equal those of the individual, or None to start from
+                scratch.
+            checkpoint_interval: Take a checkpoint every checkpoint_interval genes (0: no checkpoints).
+
+        Returns:
+            tuple: (makespan, checkpoints), the checkpoints of this individual (including the ones before the resumed
+                checkpoint, which are shared with the parent).
+        """
+        if checkpoint is None:
+            state, first_gene = self._initial_state(), 0
+        else:
+            state, first_gene = checkpoint.restore(self.nr_of_operations), checkpoint.position
+        checkpoints = []
+        self._decode(individual, state, first_gene, checkpoint_interval, checkpoints)
+        return max(state.end_times), checkpoints
+
+    def _initial_state(self):
+        return _DecoderState([0] * self.nr_of_jobs, [0] * self.nr_of_operations, [0] * self.nr_of_operations,
+                             [0] * self.nr_of_operations, [[] for _ in range(self.nr_of_machines)],
+                             [[] for _ in range(self.nr_of_machines)], [[] for _ in range(self.nr_of_machines)])
+
+    def _decode(self, individual, state, first_gene, checkpoint_interval=0, checkpoints=None):
+        """Place the operations of the genes from first_gene on, optionally appending checkpoints."""
+        machine_selection, operation_sequence = individual[0], individual[1]
+        job_operations, predecessors = self.job_operations, self.predecessors
+        option_ptr, option_machine, option_duration = self.option_ptr, self.option_machine, self.option_duration
+        setup_class, setup_times = self.setup_class, self.setup_times
+
+        job_cursor, operation_machine = state.job_cursor, state.operation_machine
+        start_times, end_times = state.start_times, state.end_times
+        # machine timelines: operations with their start and end times, sorted by start time
+        machine_starts, machine_ends = state.machine_starts, state.machine_ends
+        machine_operations = state.machine_operations
+
+        for gene in range(first_gene, len(operation_sequence)):
+            if checkpoint_interval and gene % checkpoint_interval == 0 and gene > first_gene:
+                checkpoints.append(DecoderCheckpoint(gene, state))
+            job_id = operation_sequence[gene]
+            operation_id = job_operations[job_id][job_cursor[job_id]]
+            job_cursor[job_id] += 1
+            option = option_ptr[operation_id] + machine_selection[operation_id]
+            machine_id = option_machine[option]
+            duration = option_duration[option]
+
+            ready_time = 0
+            for predecessor in predecessors[operation_id]:
+                if end_times[predecessor] > ready_time:
+                    ready_time = end_times[predecessor]
+
+            starts = machine_starts[machine_id]
+            ends = machine_ends[machine_id]
+            if setup_times is None:
+                start_time = _earliest_start(starts, ends, ready_time, duration)
+            else:
+                start_time = _earliest_start_with_setup(
+                    starts, ends, machine_operations[machine_id], ready_time, duration, operation_id,
+                    setup_class, setup_times[machine_id])
+
+            position = bisect_right(starts, start_time)
+            starts.insert(position, start_time)
+            ends.insert(position, start_time + duration)
+            machine_operations[machine_id].insert(position, operation_id)
+            operation_machine[operation_id] = machine_id
+            start_times[operation_id] = start_time
+            end_times[operation_id] = start_time + duration
+
+
+class _DecoderState:
+    """Mutable state of a (partially) decoded chromosome."""
+    __slots__ = ('job_cursor', 'operation_machine', 'start_times', 'end_times', 'machine_starts', 'machine_ends',
+                 'machine_operations')
+
+    def __init__(self, job_cursor, operation_machine, start_times, end_times, machine_starts, machine_ends,
+                 machine_operations):
+        self.job_cursor = job_cursor
+        self.operation_machine = operation_machine
+        self.start_times = start_times
+        self.end_times = end_times
+        self.machine_starts = machine_starts
+        self.machine_ends = machine_ends
+        self.machine_operations = machine_operations
+
+
+class DecoderCheckpoint:
+    """
+    Copy of the decoder state before gene `position`: the job cursors, the end times and the machine timelines. Start
+    times and selected machines are not kept, resumed decodes only yield the makespan.
+    """
+    __slots__ = ('position', 'job_cursor', 'end_times', 'machine_starts', 'machine_ends', 'machine_operations')
+
+    def __init__(self, position, state: _DecoderState):
+        # tuples of integers are untracked by the garbage collector, so stored checkpoints add no collection overhead
+        self.position = position
+        self.job_cursor = tuple(state.job_cursor)
+        self.end_times = tuple(state.end_times)
+        self.machine_starts = tuple(map(tuple, state.machine_starts))
+        self.machine_ends = tuple(map(tuple, state.machine_ends))
+        self.machine_operations = tuple(map(tuple, state.machine_operations))
+
+    def restore(self, nr_of_operations) -> _DecoderState:
+        return _DecoderState(list(self.job_cursor), [0] * nr_of_operations, [0] * nr_of_operations,
+                             list(self.end_times), list(map(list, self.machine_starts)),
+                             list(map(list, self.machine_ends)), list(map(list, self.machine_operations)))
+
+
+def _earliest_start(starts, ends, ready_time, duration):
+    """Earliest start time on a machine timeline without setup times (backfilling if possible)."""
+    if not starts:
+        return ready_time
+    # before the first scheduled operation
+    if ready_time + duration <= starts[0]:
+        return ready_time
+    # gaps between scheduled operations: only gaps ending at or after ready_time + duration can fit the operation
+    for i in range(max(1, bisect_left(starts, ready_time + duration)), len(starts)):
+        if starts[i] - ends[i - 1] >= duration:
+            gap_start_time = ends[i - 1] if ends[i - 1] > ready_time else ready_time
+            if gap_start_time + duration <= starts[i]:
+                return gap_start_time
+    return ends[-1] if ends[-1] > ready_time else ready_time
+
+
+def _earliest_start_with_setup(starts, ends, operations, ready_time, duration, operation_id, setup_class,
+                               machine_setup_times):
+    """Earliest start time on a machine timeline with sequence dependent setup times (backfilling if possible)."""
+    if not starts:
+        return ready_time
+    operation_class = setup_class[operation_id]
+    # before the first scheduled operation
+    setup_to_first = machine_setup_times[operation_class][setup_class[operations[0]]]
+    if duration <= starts[0] - setup_to_first and ready_time <= starts[0] - duration - setup_to_first:
+        return ready_time
+    # gaps between scheduled operations
+    for i in range(max(1, bisect_left(starts, ready_time + duration)), len(starts)):
+        setup_to_previous = machine_setup_times[setup_class[operations[i - 1]]][operation_class]
+        setup_to_next = machine_setup_times[operation_class][setup_class[operations[i]]]
+        if starts[i] - ends[i - 1] >= duration + setup_to_previous + setup_to_next:
+            gap_start_time = max(ready_time, ends[i - 1] + setup_to_previous)
+            if gap_start_time + duration + setup_to_next <= starts[i]:
+                return gap_start_time
+    setup_to_last = machine_setup_times[setup_class[operations[-1]]][operation_class]
+    return max(ready_time, ends[-1] + setup_to_last)
+
+
+class ActiveScheduleDecoder(ScheduleDecoder):
+    """
+    Decodes GA chromosomes into active schedules with the Giffler-Thompson algorithm: among the schedulable operations
+    (all predecessors scheduled) the one with the earliest completion time determines the machine, and of the
+    operations on that machine that can start before this completion time (the conflict set) the one that comes first
+    in the operation sequence is scheduled. The machine selection genes fix the machine of every operation.
+
+    Only the relative order of operations on the same machine matters, so the Foata normal form of the FitnessCache
+    is also canonical for this decoder. Decoder checkpoints (checkpoint_interval) are not supported.
+    """
+
+    def __init__(self, compiled: CompiledJobShop):
+        super().__init__(compiled)
+        self.successors = [[] for _ in range(self.nr_of_operations)]
+        for operation_id, predecessors in enumerate(self.predecessors):
+            for predecessor in predecessors:
+                self.successors[predecessor].append(operation_id)
+
+    def decode_schedule(self, individual):
+        """Decode the individual and return the (machine, start_time, end_time) lists, indexed by operation id."""
+        return self._schedule(individual)[:3]
+
+    def active_sequence(self, individual):
+        """Return a copy of the individual with the operation sequence in the order of the active schedule.
+
+        Decoding it with the sequence decoder (or evaluate_individual) yields a schedule that is at least as good."""
+        order = self._schedule(individual)[3]
+        operation_job = [0] * self.nr_of_operations
+        for job_id, operations in enumerate(self.job_operations):
+            for operation_id in operations:
+                operation_job[operation_id] = job_id
+        return type(individual)([list(individual[0]), [operation_job[operation_id] for operation_id in order]])
+
+    def _schedule(self, individual):
+        machine_selection, operation_sequence = individual[0], individual[1]
+        job_operations, successors = self.job_operations, self.successors
+        option_ptr, option_machine, option_duration = self.option_ptr, self.option_machine, self.option_duration
+        setup_class, setup_times = self.setup_class, self.setup_times
+        nr_of_operations = self.nr_of_operations
+
+        # priority of an operation: the position of its gene in the operation sequence
+        priority = [0] * nr_of_operations
+        job_cursor = [0] * self.nr_of_jobs
+        for gene, job_id in enumerate(operation_sequence):
+            priority[job_operations[job_id][job_cursor[job_id]]] = gene
+            job_cursor[job_id] += 1
+        operation_machine = [0] * nr_of_operations
+        durations = [0] * nr_of_operations
+        for operation_id in range(nr_of_operations):
+            option = option_ptr[operation_id] + machine_selection[operation_id]
+            operation_machine[operation_id] = option_machine[option]
+            durations[operation_id] = option_duration[option]
+
+        remaining_predecessors = [len(predecessors) for predecessors in self.predecessors]
+        ready_times = [0] * nr_of_operations
+        start_times = [0] * nr_of_operations
+        end_times = [0] * nr_of_operations
+        machine_ready = [0] * self.nr_of_machines
+        machine_last = [-1] * self.nr_of_machines
+        schedulable = [operation_id for operation_id in range(nr_of_operations)
+                       if remaining_predecessors[operation_id] == 0]
+        order = []
+        earliest_starts = []
+        while schedulable:
+            # earliest completion time over the schedulable operations
+            earliest_starts.clear()
+            best_end, best_machine = None, -1
+            for operation_id in schedulable:
+                machine_id = operation_machine[operation_id]
+                start_time = machine_ready[machine_id]
+                previous = machine_last[machine_id]
+                if setup_times is not None and previous >= 0:
+                    start_time += setup_times[machine_id][setup_class[previous]][setup_class[operation_id]]
+                if ready_times[operation_id] > start_time:
+                    start_time = ready_times[operation_id]
+                earliest_starts.append(start_time)
+                if best_end is None or start_time + durations[operation_id] < best_end:
+                    best_end, best_machine = start_time + durations[operation_id], machine_id
+
+            # conflict set: operations on that machine starting before best_end, the first in the sequence is chosen
+            chosen = -1
+            for index, operation_id in enumerate(schedulable):
+                if operation_machine[operation_id] == best_machine and earliest_starts[index] < best_end and \
+                        (chosen < 0 or priority[operation_id] < priority[schedulable[chosen]]):
+                    chosen = index
+            operation_id = schedulable[chosen]
+            schedulable[chosen] = schedulable[-1]
+            schedulable.pop()
+
+            start_time = earliest_starts[chosen]
+            end_time = start_time + durations[operation_id]
+            start_times[operation_id] = start_time
+            end_times[operation_id] = end_time
+            machine_ready[best_machine] = end_time
+            machine_last[best_machine] = operation_id
+            order.append(operation_id)
+            for successor in successors[operation_id]:
+                if end_time > ready_times[successor]:
+                    ready_times[successor] = end_time
+                remaining_predecessors[successor] -= 1
+                if remaining_predecessors[successor] == 0:
+                    schedulable.append(successor)
+        return operation_machine, start_times, end_times, order
+
+
+# decoders selectable with the algorithm.decoder parameter (array backend)
+DECODERS = {"sequence": ScheduleDecoder, "active": ActiveScheduleDecoder}
+
+
+class BatchScheduleDecoder:
+    """
+    Decodes a whole population at once: all P chromosomes advance in lockstep over the (P x operations) gene
+    matrices, with job cursors (P x jobs), operation end times (P x operations) and padded machine timelines
+    (P x machines x K, K the maximum number of operations a machine can process). Every step places one operation
+    per chromosome with the same backfilling rules as ScheduleDecoder, as vectorized NumPy expressions.
+    """
+
+    def __init__(self, compiled: CompiledJobShop):
+        self.nr_of_jobs = compiled.nr_of_jobs
+        self.nr_of_machines = compiled.nr_of_machines
+        self.nr_of_operations = compiled.nr_of_operations
+
+        # job operation table, padded with -1
+        job_lengths = np.diff(compiled.job_operations_ptr)
+        self.job_operation_table = np.full((self.nr_of_jobs, job_lengths.max(initial=0) + 1), -1, dtype=np.int64)
+        for job_id in range(self.nr_of_jobs):
+            self.job_operation_table[job_id, :job_lengths[job_id]] = compiled.job_operations[
+                compiled.job_operations_ptr[job_id]:compiled.job_operations_ptr[job_id + 1]]
+
+        # predecessor table, padded with the index of an extra end time column that is always 0
+        nr_of_predecessors = np.diff(compiled.predecessor_ptr)
+        self.predecessor_table = np.full((self.nr_of_operations, max(1, nr_of_predecessors.max(initial=0))),
+                                         self.nr_of_operations, dtype=np.int64)
+        for operation_id in np.flatnonzero(nr_of_predecessors):
+            self.predecessor_table[operation_id, :nr_of_predecessors[operation_id]] = compiled.predecessors[
+                compiled.predecessor_ptr[operation_id]:compiled.predecessor_ptr[operation_id + 1]]
+
+        self.option_ptr = compiled.option_ptr
+        self.option_machine = compiled.option_machine.astype(np.int64)
+        self.option_duration = compiled.option_duration.astype(np.int64)
+        self.timeline_length = max(1, np.bincount(compiled.option_machine, minlength=self.nr_of_machines).max())
+
+        self.setup_class = compiled.setup_class.astype(np.int64) if compiled.has_setup_times else None
+        self.setup_times = compiled.setup_times.astype(np.int64) if compiled.has_setup_times else None
+
+    def decode(self, machine_selections, operation_sequences):
+        """Return the makespans (P,) of the chromosomes given as (P x operations) gene matrices."""
+        machine_selections = np.asarray(machine_selections, dtype=np.int64)
+        operation_sequences = np.asarray(operation_sequences, dtype=np.int64)
+        nr_of_chromosomes = len(operation_sequences)
+        rows = np.arange(nr_of_chromosomes)
+        column = rows[:, None]
+        no_operation = self.nr_of_operations
+
+        job_cursor = np.zeros((nr_of_chromosomes, self.nr_of_jobs), dtype=np.int64)
+        end_times = np.zeros((nr_of_chromosomes, self.nr_of_operations + 1), dtype=np.int64)
+        timeline_size = np.zeros((nr_of_chromosomes, self.nr_of_machines), dtype=np.int64)
+        # machine timelines, row chromosome * nr_of_machines + machine
+        timeline_shape = (nr_of_chromosomes * self.nr_of_machines, self.timeline_length)
+        timeline_starts = np.full(timeline_shape, np.iinfo(np.int64).max // 2, dtype=np.int64)
+        timeline_ends = np.zeros(timeline_shape, dtype=np.int64)
+        timeline_operations = np.full(timeline_shape, no_operation - 1, dtype=np.int64)
+
+        for step in range(operation_sequences.shape[1]):
+            job_ids = operation_sequences[:, step]
+            operation_ids = self.job_operation_table[job_ids, job_cursor[rows, job_ids]]
+            if (operation_ids < 0).any():
+                raise ValueError("Operation sequence contains a job more often than it has operations")
+            job_cursor[rows, job_ids] += 1
+
+            options = self.option_ptr[operation_ids] + machine_selections[rows, operation_ids]
+            machine_ids = self.option_machine[options]
+            durations = self.option_duration[options]
+            ready_times = end_times[column, self.predecessor_table[operation_ids]].max(axis=1)
+
+            # only the occupied part of the selected timelines (plus one free slot) is read and written
+            timelines = rows * self.nr_of_machines + machine_ids
+            sizes = timeline_size[rows, machine_ids]
+            width = min(sizes.max() + 1, self.timeline_length)
+            positions = np.arange(width)
+            starts = timeline_starts[timelines, :width]
+            ends = timeline_ends[timelines, :width]
+            # previous_ends[:, i] is the end of the operation before position i (0 before the first operation)
+            previous_ends = np.empty_like(ends)
+            previous_ends[:, 0] = 0
+            previous_ends[:, 1:] = ends[:, :-1]
+
+            # candidate i: directly before the operation at position i, the last candidate appends the operation
+            if self.setup_times is None:
+                candidate_starts = np.maximum(ready_times[:, None], previous_ends)
+                fits = candidate_starts + durations[:, None] <= starts
+            else:
+                operations = timeline_operations[timelines, :width]
+                machine_setup_times = self.setup_times[machine_ids]
+                operation_classes = self.setup_class[operation_ids][:, None]
+                timeline_classes = self.setup_class[operations]
+                setup_to_previous = np.empty_like(ends)
+                setup_to_previous[:, 0] = 0
+                setup_to_previous[:, 1:] = machine_setup_times[column, timeline_classes[:, :-1], operation_classes]
+                setup_to_next = machine_setup_times[column, operation_classes, timeline_classes]
+                candidate_starts = np.maximum(ready_times[:, None], previous_ends + setup_to_previous)
+                fits = candidate_starts + durations[:, None] + setup_to_next <= starts
+            fits &= positions < sizes[:, None]
+            fits[rows, sizes] = True
+
+            # first fitting gap (or before the first operation), otherwise append after the last operation
+            insert_positions = fits.argmax(axis=1)
+            start_times = candidate_starts[rows, insert_positions]
+
+            # insert the operation in the timelines of the selected machines
+            before = positions < insert_positions[:, None]
+            timeline_starts[timelines, :width] = np.where(before, starts, np.roll(starts, 1, axis=1))
+            timeline_starts[timelines, insert_positions] = start_times
+            timeline_ends[timelines, :width] = np.where(before, ends, previous_ends)
+            timeline_ends[timelines, insert_positions] = start_times + durations
+            if self.setup_times is not None:
+                timeline_operations[timelines, :width] = np.where(
+                    before, operations, np.roll(operations, 1, axis=1))
+                timeline_operations[timelines, insert_positions] = operation_ids
+            timeline_size[rows, machine_ids] += 1
+            end_times[rows, operation_ids] = start_times + durations
+
+        return end_times[:, :self.nr_of_operations].max(axis=1)
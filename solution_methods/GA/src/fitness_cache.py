@@ -0,0 +1,107 @@
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+
+from solution_methods.GA.src.decoder import ScheduleDecoder
+
+
+class FitnessCache:
+    """
+    LRU-bounded cache of fitness values, keyed by a hash of the canonicalized chromosome.
+
+    The operation sequence is canonicalized to its Foata normal form: every gene gets a level one higher than the
+    latest earlier gene it depends on (same job, same selected machine or a predecessor operation), and the genes are
+    sorted by (level, job id). Sequences that only differ by swapping adjacent independent genes decode to the same
+    schedule and map to the same key. Lookups happen in the main process, so cached values are shared by all workers.
+    """
+
+    def __init__(self, decoder: ScheduleDecoder, maxsize=10000):
+        self.decoder = decoder
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._recorded_hits = 0
+        self._recorded_misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def canonical_sequence(self, individual):
+        """Return the Foata normal form of the operation sequence of the individual."""
+        machine_selection, operation_sequence = individual[0], individual[1]
+        decoder = self.decoder
+        job_operations, predecessors = decoder.job_operations, decoder.predecessors
+        option_ptr, option_machine = decoder.option_ptr, decoder.option_machine
+
+        job_cursor = [0] * decoder.nr_of_jobs
+        job_level = [0] * decoder.nr_of_jobs
+        machine_level = [0] * decoder.nr_of_machines
+        operation_level = [0] * decoder.nr_of_operations
+        levels = []
+        for job_id in operation_sequence:
+            operation_id = job_operations[job_id][job_cursor[job_id]]
+            job_cursor[job_id] += 1
+            machine_id = option_machine[option_ptr[operation_id] + machine_selection[operation_id]]
+            level = job_level[job_id] if job_level[job_id] > machine_level[machine_id] else machine_level[machine_id]
+            for predecessor in predecessors[operation_id]:
+                if operation_level[predecessor] > level:
+                    level = operation_level[predecessor]
+            level += 1
+            job_level[job_id] = machine_level[machine_id] = operation_level[operation_id] = level
+            levels.append(level)
+        return [job_id for _, job_id in sorted(zip(levels, operation_sequence))]
+
+    def key(self, individual) -> bytes:
+        """Return the cache key of the individual."""
+        digest = blake2b(array('i', individual[0]).tobytes(), digest_size=16)
+        digest.update(array('i', self.canonical_sequence(individual)).tobytes())
+        return digest.digest()
+
+    def evaluate(self, chromosomes, evaluate_function):
+        """Return the fitnesses of the chromosomes, only evaluating (unique) chromosomes that are not cached.
+
+        Args:
+            chromosomes: List of [machine_selection, operation_sequence] chromosomes.
+            evaluate_function: Function evaluating a list of chromosomes, returns a list of fitness tuples.
+        """
+        keys = [self.key(chromosome) for chromosome in chromosomes]
+        missing = {}
+        for key, chromosome in zip(keys, chromosomes):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            elif key not in missing:
+                missing[key] = chromosome
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if missing:
+            fitnesses = dict(zip(missing.keys(), evaluate_function(list(missing.values()))))
+        else:
+            fitnesses = {}
+        results = [self._cache[key] if key in self._cache else fitnesses[key] for key in keys]
+
+        for key, fitness in fitnesses.items():
+            self._cache[key] = fitness
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return results
+
+    def state(self) -> dict:
+        """Return the cached fitnesses (in LRU order) and the hit/miss counters, e.g. to save the state of a run."""
+        return {"entries": list(self._cache.items()), "hits": self.hits, "misses": self.misses,
+                "recorded_hits": self._recorded_hits, "recorded_misses": self._recorded_misses}
+
+    def restore(self, state) -> None:
+        """Restore the cached fitnesses and the counters returned by state()."""
+        self._cache = OrderedDict(state["entries"])
+        self.hits, self.misses = state["hits"], state["misses"]
+        self._recorded_hits, self._recorded_misses = state["recorded_hits"], state["recorded_misses"]
+
+    def statistics(self):
+        """Return the hit rate since the previous call and the current cache size (for the logbook)."""
+        hits, misses = self.hits - self._recorded_hits, self.misses - self._recorded_misses
+        self._recorded_hits, self._recorded_misses = self.hits, self.misses
+        return {"cache_hit_rate": hits / (hits + misses) if hits + misses else 0.0, "cache_size": len(self._cache)}
@@ -1,6 +1,7 @@
 import random
 import numpy as np
 
+from scheduling_environment.compiledJobShop import CompiledJobShop
 from scheduling_environment.jobShop import JobShop
 
 
@@ -112,3 +113,124 @@ def global_load_balancing_scheduler(jobShop: JobShop) -> JobShop:
         jobs_to_be_scheduled.remove(job.job_id)
 
     return jobShop
+
+
+# Array-based construction heuristics on a CompiledJobShop. They emit GA chromosomes ([machine_selection,
+# operation_sequence], machine selections as index in the machine sorted options of an operation) directly, without
+# scheduling operations on a JobShop. Operations of other jobs that precede an operation (assembly instances) are
+# respected, so the emitted operation sequences need no repair.
+
+class _ConstructionTables:
+    """Python lists of a CompiledJobShop used by the construction heuristics (built once per instance)."""
+
+    def __init__(self, compiled: CompiledJobShop):
+        self.nr_of_jobs = compiled.nr_of_jobs
+        self.nr_of_machines = compiled.nr_of_machines
+        self.nr_of_operations = compiled.nr_of_operations
+        job_operations_ptr = compiled.job_operations_ptr.tolist()
+        job_operations = compiled.job_operations.tolist()
+        self.job_operations = [job_operations[job_operations_ptr[job_id]:job_operations_ptr[job_id + 1]]
+                               for job_id in range(self.nr_of_jobs)]
+        self.operation_job = compiled.operation_job.tolist()
+        option_ptr = compiled.option_ptr.tolist()
+        option_machine = compiled.option_machine.tolist()
+        option_duration = compiled.option_duration.tolist()
+        self.options = [list(zip(option_machine[option_ptr[operation_id]:option_ptr[operation_id + 1]],
+                                 option_duration[option_ptr[operation_id]:option_ptr[operation_id + 1]]))
+                        for operation_id in range(self.nr_of_operations)]
+
+        predecessor_ptr = compiled.predecessor_ptr.tolist()
+        predecessors = compiled.predecessors.tolist()
+        self.nr_of_predecessors = [predecessor_ptr[operation_id + 1] - predecessor_ptr[operation_id]
+                                   for operation_id in range(self.nr_of_operations)]
+        self.successors = [[] for _ in range(self.nr_of_operations)]
+        # number of predecessor operations of other jobs, per job
+        self.nr_of_external_predecessors = [0] * self.nr_of_jobs
+        for operation_id in range(self.nr_of_operations):
+            for predecessor in predecessors[predecessor_ptr[operation_id]:predecessor_ptr[operation_id + 1]]:
+                self.successors[predecessor].append(operation_id)
+                if self.operation_job[predecessor] != self.operation_job[operation_id]:
+                    self.nr_of_external_predecessors[self.operation_job[operation_id]] += 1
+
+
+_tables_cache = {}
+
+
+def _construction_tables(compiled: CompiledJobShop) -> _ConstructionTables:
+    if _tables_cache.get('compiled') is not compiled:
+        _tables_cache['compiled'] = compiled
+        _tables_cache['tables'] = _ConstructionTables(compiled)
+    return _tables_cache['tables']
+
+
+def _load_balancing_chromosome(compiled: CompiledJobShop, rng: random.Random, global_selection):
+    """Schedule randomly chosen available jobs completely, every operation on the machine with the lowest occupation
+    plus processing time. With global selection the occupation is kept over all jobs, otherwise it is per job."""
+    tables = _construction_tables(compiled)
+    machine_selection = [0] * tables.nr_of_operations
+    operation_sequence = []
+    pending = tables.nr_of_external_predecessors[:]
+    available_jobs = [job_id for job_id in range(tables.nr_of_jobs) if pending[job_id] == 0]
+    machine_occupation_times = [0] * tables.nr_of_machines
+
+    while available_jobs:
+        job_id = available_jobs.pop(rng.randrange(len(available_jobs)))
+        if not global_selection:
+            machine_occupation_times = [0] * tables.nr_of_machines
+        for operation_id in tables.job_operations[job_id]:
+            options = tables.options[operation_id]
+            selection = min(range(len(options)),
+                            key=lambda option: machine_occupation_times[options[option][0]] + options[option][1])
+            machine_id, duration = options[selection]
+            machine_occupation_times[machine_id] += duration
+            machine_selection[operation_id] = selection
+            operation_sequence.append(job_id)
+
+            for successor in tables.successors[operation_id]:
+                successor_job = tables.operation_job[successor]
+                if successor_job != job_id:
+                    pending[successor_job] -= 1
+                    if pending[successor_job] == 0:
+                        available_jobs.append(successor_job)
+    return [machine_selection, operation_sequence]
+
+
+def global_load_balancing_chromosome(compiled: CompiledJobShop, rng: random.Random):
+    """Array version of global_load_balancing_scheduler, returns a chromosome."""
+    return _load_balancing_chromosome(compiled, rng, global_selection=True)
+
+
+def local_load_balancing_chromosome(compiled: CompiledJobShop, rng: random.Random):
+    """Array version of local_load_balancing_scheduler, returns a chromosome."""
+    return _load_balancing_chromosome(compiled, rng, global_selection=False)
+
+
+def random_chromosome(compiled: CompiledJobShop, rng: random.Random):
+    """Array version of random_scheduler: random available operations on random machines, returns a chromosome."""
+    tables = _construction_tables(compiled)
+    machine_selection = [rng.randrange(len(options)) for options in tables.options]
+    operation_sequence = []
+    in_degree = tables.nr_of_predecessors[:]
+    available = [operation_id for operation_id in range(tables.nr_of_operations) if in_degree[operation_id] == 0]
+    while available:
+        index = rng.randrange(len(available))
+        available[index], available[-1] = available[-1], available[index]
+        operation_id = available.pop()
+        operation_sequence.append(tables.operation_job[operation_id])
+        for successor in tables.successors[operation_id]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                available.append(successor)
+    return [machine_selection, operation_sequence]
+
+
+def init_chromosome(compiled: CompiledJobShop, seed):
+    """Create a chromosome with the same mix of heuristics as init_individual, from its own random seed."""
+    rng = random.Random(seed)
+    rand = rng.random()
+    if rand <= 0.6:  # 60% initial assignment with global selection
+        return global_load_balancing_chromosome(compiled, rng)
+    elif rand <= 0.9:  # 30% initial assignment with local selection
+        return local_load_balancing_chromosome(compiled, rng)
+    else:  # 10% random assignment
+        return random_chromosome(compiled, rng)
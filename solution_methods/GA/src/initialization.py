@@ -1,22 +1,32 @@
 import logging
-import multiprocessing
 import numpy as np
 
 from deap import base, creator, tools
 
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.GA.src.checkpoints import CheckpointStore
+from solution_methods.GA.src.decoder import DECODERS, BatchScheduleDecoder, ScheduleDecoder
+from solution_methods.GA.src.fitness_cache import FitnessCache
+from solution_methods.GA.src.local_search import CriticalBlockSearch
 from solution_methods.GA.src.operators import (
-    evaluate_individual, evaluate_population, init_individual, init_population,
-    mutate_sequence_exchange, mutate_shortest_proc_time, pox_crossover)
+    evaluate_chromosomes_batched, evaluate_individual, evaluate_individual_compiled, evaluate_population,
+    init_individual, init_individual_compiled, init_population, mutate_sequence_exchange, mutate_shortest_proc_time,
+    pox_crossover)
+from solution_methods.GA.src.repair import PrecedenceRepair
+from solution_methods.GA.src.vectorized_operators import MatrixVariation
+from solution_methods.GA.src.worker_pool import WorkerPool
 from solution_methods.helper_functions import set_seeds
 
 
-def initialize_run(jobShopEnv, **kwargs):
+def initialize_run(jobShopEnv, pool=None, resume=False, **kwargs):
     """
     Initializes the GA run by setting up the DEAP toolbox, statistics, hall of fame, and initial population.
 
     Args:
         jobShopEnv: The job shop environment to be optimized.
-        pool: Multiprocessing pool for parallel processing.
+        pool: Persistent WorkerPool for parallel evaluation (reused across runs, closed by the caller). If None and
+            multiprocessing is enabled, a pool is created for this run and closed at the end of run_GA.
+        resume: If True, no initial population is created (None is returned), the run is resumed from a state file.
         kwargs: Additional keyword arguments for setting algorithm parameters.
 
     Returns:
@@ -33,6 +43,49 @@ def initialize_run(jobShopEnv, **kwargs):
     if not logging.getLogger().hasHandlers():
         logging.basicConfig(level=logging.INFO)
 
+    toolbox, stats, hof = create_toolbox(jobShopEnv, pool, **kwargs)
+    if resume:
+        return None, toolbox, stats, hof
+
+    # try:
+    initial_population = init_population(toolbox, kwargs['algorithm']['population_size'], )
+    fitnesses = evaluate_population(toolbox, initial_population)
+
+    # Assign fitness values to individuals
+    for ind, fit in zip(initial_population, fitnesses):
+        ind.fitness.values = fit
+
+    # except Exception as e:
+    #     logging.error(f"An error occurred during initial population evaluation: {e}")
+    #     return None, None, None, None
+
+    return initial_population, toolbox, stats, hof
+
+
+def uses_worker_pool(**kwargs) -> bool:
+    """
+    Return whether create_toolbox evaluates with a WorkerPool: multiprocessing is enabled and neither the batched nor
+    the incremental (checkpoint) evaluation replaces the pool.
+    """
+    algorithm = kwargs['algorithm']
+    if algorithm.get('backend', 'array') == 'array' and algorithm.get('decoder', 'sequence') == 'sequence' and (
+            algorithm.get('batch_evaluation', False) or algorithm.get('checkpoint_interval', 0) > 0):
+        return False
+    return algorithm['multiprocessing']
+
+
+def create_toolbox(jobShopEnv, pool=None, **kwargs):
+    """
+    Sets up the DEAP toolbox with the registered operators, the statistics and the hall of fame.
+
+    Args:
+        jobShopEnv: The job shop environment to be optimized.
+        pool: Persistent WorkerPool for parallel evaluation (see initialize_run).
+        kwargs: Additional keyword arguments for setting algorithm parameters.
+
+    Returns:
+        tuple: (toolbox, stats, hof)
+    """
     # Set up DEAP creator classes
     if not hasattr(creator, "Fitness"):
         creator.create("Fitness", base.Fitness, weights=(-1.0,))
@@ -42,20 +95,88 @@ def initialize_run(jobShopEnv, **kwargs):
     # Define and register operators and functions in the DEAP toolbox
     toolbox = base.Toolbox()
 
-    # Initialize the multiprocessing pool
-    if kwargs['algorithm']['multiprocessing']:
-        pool = multiprocessing.Pool()
-        toolbox.register("map", pool.map)
+    backend = kwargs['algorithm'].get('backend', 'array')
+    decoder_type = kwargs['algorithm'].get('decoder', 'sequence')
+    if decoder_type not in DECODERS:
+        raise ValueError(f"Unknown decoder: {decoder_type}")
+    if decoder_type != 'sequence' and backend != 'array':
+        raise ValueError(f"The {decoder_type} decoder requires the array backend")
+    if decoder_type != 'sequence' and kwargs['algorithm'].get('checkpoint_interval', 0) > 0:
+        raise ValueError(f"Decoder checkpoints (checkpoint_interval > 0) are not supported by the {decoder_type} "
+                         f"decoder, use the sequence decoder or set checkpoint_interval = 0")
+    compiled = CompiledJobShop.from_job_shop(jobShopEnv)
+    decoder = DECODERS[decoder_type](compiled)
+
+    # the vectorized and incremental evaluations replicate the sequence decoder
+    if kwargs['algorithm'].get('batch_evaluation', False) and backend == 'array' and decoder_type == 'sequence':
+        # decode the whole population in one vectorized pass, no worker pool needed
+        toolbox.register("evaluate_chromosomes", evaluate_chromosomes_batched,
+                         decoder=BatchScheduleDecoder(compiled))
+    elif kwargs['algorithm'].get('checkpoint_interval', 0) > 0 and backend == 'array' and decoder_type == 'sequence':
+        # offspring resume decoding from the checkpoints of their parent, in the main process (no worker pool)
+        checkpoint_store = CheckpointStore(ScheduleDecoder(compiled), kwargs['algorithm']['checkpoint_interval'],
+                                           maxsize=4 * kwargs['algorithm']['population_size'])
+        toolbox.register("evaluate_incremental", checkpoint_store.evaluate)
+        toolbox.register("checkpoint_statistics", checkpoint_store.statistics)
+        toolbox.register("checkpoint_state", checkpoint_store.state)
+        toolbox.register("restore_checkpoints", checkpoint_store.restore)
+    # Initialize the worker pool, the workers receive the instance once and only chromosomes per task
+    elif uses_worker_pool(**kwargs):
+        if pool is None:
+            pool = WorkerPool(processes=kwargs['algorithm'].get('processes') or None,
+                              chunksize=kwargs['algorithm'].get('chunksize') or None)
+            toolbox.register("close_pool", pool.close)
+        pool.set_instance(compiled, backend, decoder_type)
+        toolbox.register("evaluate_chromosomes", pool.evaluate)
+        if backend == 'array':
+            toolbox.register("init_chromosomes", pool.init_chromosomes)
 
     # Register individual and genetic operators
-    toolbox.register("init_individual", init_individual, creator.Individual, jobShopEnv=jobShopEnv)
+    toolbox.register("individual", creator.Individual)
+    if backend == 'array':
+        # construction heuristics on the compiled arrays, emitting chromosomes directly
+        toolbox.register("init_individual", init_individual_compiled, creator.Individual, compiled=compiled)
+    else:
+        toolbox.register("init_individual", init_individual, creator.Individual, jobShopEnv=jobShopEnv)
     toolbox.register("mate_TwoPoint", tools.cxTwoPoint)
     toolbox.register("mate_Uniform", tools.cxUniform, indpb=0.5)
     toolbox.register("mate_POX", pox_crossover, nr_preserving_jobs=1)
     toolbox.register("mutate_machine_selection", mutate_shortest_proc_time, jobShopEnv=jobShopEnv)
     toolbox.register("mutate_operation_sequence", mutate_sequence_exchange)
+    if kwargs['algorithm'].get('vectorized_variation', False) and backend == 'array':
+        # crossover and mutation of the whole offspring at once on (P x L) NumPy matrices
+        toolbox.register("vary", MatrixVariation(compiled), ind_class=creator.Individual)
+    if compiled.has_job_precedences:
+        # assembly scheduling: offspring sequences are repaired to respect the precedence relations between jobs
+        toolbox.register("repair", PrecedenceRepair(compiled))
     toolbox.register("select", tools.selTournament, k=kwargs['algorithm']['population_size'], tournsize=3)
-    toolbox.register("evaluate_individual", evaluate_individual, jobShopEnv=jobShopEnv)
+    if backend == 'array':
+        # decode on the compiled arrays, the JobShop is only materialized for the final (best) individual
+        toolbox.register("evaluate_individual", evaluate_individual_compiled, decoder=decoder)
+    else:
+        toolbox.register("evaluate_individual", evaluate_individual, jobShopEnv=jobShopEnv)
+
+    # Fitness cache, shared by all workers since lookups happen before chromosomes are sent to the pool
+    if kwargs['algorithm'].get('fitness_cache_size', 0) > 0:
+        fitness_cache = FitnessCache(decoder, maxsize=kwargs['algorithm']['fitness_cache_size'])
+        toolbox.register("evaluate_cached", fitness_cache.evaluate)
+        toolbox.register("cache_statistics", fitness_cache.statistics)
+        toolbox.register("cache_state", fitness_cache.state)
+        toolbox.register("restore_cache", fitness_cache.restore)
+
+    if decoder_type == 'active':
+        # the best individual is materialized with evaluate_individual, in the order of its active schedule
+        toolbox.register("schedule_order", decoder.active_sequence)
+
+    # Memetic stage: tabu search on the critical blocks of the best offspring of every generation
+    if kwargs['algorithm'].get('local_search_top_k', 0) > 0 and decoder_type != 'sequence':
+        logging.warning("Local search requires the sequence decoder, running without.")
+    elif kwargs['algorithm'].get('local_search_top_k', 0) > 0:
+        local_search = CriticalBlockSearch(compiled,
+                                           time_limit=kwargs['algorithm'].get('local_search_time', 0.05),
+                                           max_iterations=kwargs['algorithm'].get('local_search_max_iterations', 200),
+                                           tabu_tenure=kwargs['algorithm'].get('tabu_tenure', 8))
+        toolbox.register("local_search", local_search.improve)
 
     # Setup statistics tracking
     stats = tools.Statistics(lambda ind: ind.fitness.values)
@@ -67,16 +188,4 @@ def initialize_run(jobShopEnv, **kwargs):
     # Create Hall of Fame to track the best individuals
     hof = tools.HallOfFame(1)
 
-    # try:
-    initial_population = init_population(toolbox, kwargs['algorithm']['population_size'], )
-    fitnesses = evaluate_population(toolbox, initial_population)
-
-    # Assign fitness values to individuals
-    for ind, fit in zip(initial_population, fitnesses):
-        ind.fitness.values = fit
-
-    # except Exception as e:
-    #     logging.error(f"An error occurred during initial population evaluation: {e}")
-    #     return None, None, None, None
-
-    return initial_population, toolbox, stats, hof
+    return toolbox, stats, hof
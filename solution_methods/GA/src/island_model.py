@@ -0,0 +1,168 @@
+import copy
+import logging
+import multiprocessing
+import queue
+import random
+
+from deap import creator, tools
+
+from solution_methods.GA.src.initialization import create_toolbox
+from solution_methods.GA.src.operators import evaluate_population, evolve_generation, init_population
+from solution_methods.GA.src.stopping import STAGNATION, StoppingCriteria
+from solution_methods.helper_functions import set_seeds
+
+
+def _to_chromosomes(individuals):
+    """Strip individuals to (machine_selection, operation_sequence, fitness) tuples for sending between processes."""
+    return [(ind[0], ind[1], ind.fitness.values) for ind in individuals]
+
+
+def _to_individuals(chromosomes):
+    individuals = []
+    for machine_selection, operation_sequence, fitness in chromosomes:
+        ind = creator.Individual([machine_selection, operation_sequence])
+        ind.fitness.values = fitness
+        individuals.append(ind)
+    return individuals
+
+
+def migration_targets(nr_of_islands, gen, topology, seed=None):
+    """Return the target island of every island for the migration at generation gen.
+
+    The targets form a permutation without fixed points, so every island receives exactly one group of migrants.
+    All islands derive the same permutation from the seed and generation, no coordination is needed.
+    """
+    if topology == 'ring':
+        return [(island_id + 1) % nr_of_islands for island_id in range(nr_of_islands)]
+    elif topology == 'random':
+        rng = random.Random(f"{seed}_{gen}")
+        targets = list(range(nr_of_islands))
+        while any(target == island_id for island_id, target in enumerate(targets)):
+            rng.shuffle(targets)
+        return targets
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def _run_island(island_id, jobShopEnv, initial_population, inboxes, results, stopping_criteria, stop_event, stopped,
+                kwargs):
+    """Evolve one island (in its own process) and send its hall of fame, logbook and stopping information to the
+    results queue."""
+    algorithm = kwargs['algorithm']
+    seed = algorithm.get('seed', None)
+    island_seed = None if seed is None else seed + island_id
+    island_kwargs = copy.deepcopy(kwargs)
+    island_kwargs['algorithm']['multiprocessing'] = False
+    island_kwargs['algorithm']['seed'] = island_seed
+    set_seeds(island_seed)
+    # messages for a stopped island may never be read, do not block the exit of this process on them
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+    toolbox, stats, hof = create_toolbox(jobShopEnv, **island_kwargs)
+    if initial_population is None:
+        population = init_population(toolbox, algorithm['population_size'])
+        for ind, fit in zip(population, evaluate_population(toolbox, population)):
+            ind.fitness.values = fit
+    else:
+        population = _to_individuals(initial_population)
+    hof.update(population)
+
+    logbook = tools.Logbook()
+    logbook.header = ["gen", "island"] + stats.fields
+    logbook.record(gen=0, island=island_id, **stats.compile(population))
+
+    migration_interval = algorithm.get('migration_interval', 10)
+    migration_size = algorithm.get('migration_size', 2)
+    migration_topology = algorithm.get('migration_topology', 'ring')
+    for gen in range(1, algorithm['ngen'] + 1):
+        next_population = evolve_generation(jobShopEnv, population, toolbox, **island_kwargs)
+        if next_population is not None:
+            population[:] = next_population
+            hof.update(population)
+            logbook.record(gen=gen, island=island_id, **stats.compile(population))
+
+        # Time limit, target and lower bound stop all islands, stagnation only stops this island
+        if stopping_criteria.update(gen, hof[0].fitness.values[0]):
+            if stopping_criteria.stopping_reason != STAGNATION:
+                stop_event.set()
+            break
+        if stop_event.is_set():
+            stopping_criteria.stopping_reason = None
+            break
+
+        # Migration: send copies of the best individuals, replace the worst individuals by the received migrants
+        if gen % migration_interval == 0 and gen < algorithm['ngen']:
+            targets = migration_targets(len(inboxes), gen, migration_topology, seed)
+            source = targets.index(island_id)
+            inboxes[targets[island_id]].put(_to_chromosomes(tools.selBest(population, migration_size)))
+            immigrants = _receive_migrants(inboxes[island_id], source, stop_event, stopped)
+            population.sort(key=lambda ind: ind.fitness, reverse=True)
+            population[len(population) - len(immigrants):] = immigrants
+
+    stopped[island_id] = 1
+    results.put((island_id, _to_chromosomes(hof), logbook, stopping_criteria.results()))
+
+
+def _receive_migrants(inbox, source, stop_event, stopped):
+    """Wait for the migrants of the source island, no migrants if the source island or the run has stopped."""
+    while True:
+        try:
+            return _to_individuals(inbox.get(timeout=0.1))
+        except queue.Empty:
+            if stop_event.is_set() or stopped[source]:
+                return []
+
+
+def run_islands(jobShopEnv, population, hof, stopping_criteria=None, **kwargs):
+    """
+    Island model GA: evolves `islands` sub-populations in separate processes. Every migration_interval generations
+    each island sends its migration_size best individuals to another island (ring or random topology), which
+    replace the worst individuals there. Islands only synchronize with their migration source.
+
+    The given (initial) population is used for the first island, the other islands create their own initial
+    population with seed + island id. The best individuals of all islands are collected in the (global) hall of fame.
+    The stopping criteria are evaluated by every island; the stopping information of the islands is merged into the
+    given stopping_criteria.
+
+    Returns:
+        The logbooks of the islands, ordered by island id.
+    """
+    nr_of_islands = kwargs['algorithm']['islands']
+    if stopping_criteria is None:
+        stopping_criteria = StoppingCriteria()
+    inboxes = [multiprocessing.Queue() for _ in range(nr_of_islands)]
+    results = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    stopped = multiprocessing.Array('b', nr_of_islands, lock=False)
+    processes = [
+        multiprocessing.Process(target=_run_island, args=(
+            island_id, jobShopEnv, _to_chromosomes(population) if island_id == 0 else None, inboxes, results,
+            copy.copy(stopping_criteria), stop_event, stopped, kwargs))
+        for island_id in range(nr_of_islands)]
+    for process in processes:
+        process.start()
+
+    logbooks = [None] * nr_of_islands
+    island_results = [None] * nr_of_islands
+    while any(logbook is None for logbook in logbooks):
+        try:
+            island_id, island_hof, logbook, island_result = results.get(timeout=1)
+        except queue.Empty:
+            if any(process.exitcode not in (None, 0) for process in processes):
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError("An island process terminated unexpectedly")
+            continue
+        hof.update(_to_individuals(island_hof))
+        logbooks[island_id] = logbook
+        island_results[island_id] = island_result
+    for process in processes:
+        process.join()
+    stopping_criteria.merge(island_results)
+
+    for island_id, logbook in enumerate(logbooks):
+        if kwargs['output']['logbook']:
+            logging.info(f"Island {island_id}:\n{logbook}")
+        logging.info(f"Island {island_id}: best makespan {logbook[-1]['min']}, "
+                     f"stopped: {island_results[island_id]['stopping_reason'] or 'by another island'}")
+    return logbooks
@@ -0,0 +1,281 @@
+import time
+from collections import deque
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.GA.src.decoder import ScheduleDecoder
+
+
+class CriticalBlockSearch:
+    """
+    Time-bounded tabu search in the N7 critical-block neighbourhood (which contains the N5 swaps), used as the memetic
+    stage of the GA.
+
+    The decoded schedule of an individual is represented as a disjunctive graph: job arcs from the precedence relations
+    and machine arcs between consecutive operations on a machine (including setup times). A move relocates an
+    operation of a critical block to the first or last position of the block, or moves the first or last operation of
+    the block into it. Moves are ranked with a head/tail estimate that only recomputes the heads and tails of the
+    reordered block, only the selected move is evaluated exactly. Machine selections are not changed; the operation
+    sequence of an improved schedule is written back in the order of the start times.
+    """
+
+    def __init__(self, compiled: CompiledJobShop, time_limit=0.05, max_iterations=200, tabu_tenure=8):
+        self.decoder = ScheduleDecoder(compiled)
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.tabu_tenure = tabu_tenure
+        self.operation_job = compiled.operation_job.tolist()
+        self.predecessors = self.decoder.predecessors
+        self.successors = [[] for _ in range(compiled.nr_of_operations)]
+        for operation_id, predecessors in enumerate(self.predecessors):
+            for predecessor in predecessors:
+                self.successors[predecessor].append(operation_id)
+
+    def improve(self, individual) -> int:
+        """Improve the individual in place (operation sequence only), returns the makespan of the individual."""
+        deadline = time.perf_counter() + self.time_limit
+        operation_machine, start_times, end_times = self.decoder.decode_schedule(individual)
+        makespan = max(end_times)
+        self._durations = [end - start for start, end in zip(start_times, end_times)]
+        self._operation_machine = operation_machine
+        sequences = [[] for _ in range(self.decoder.nr_of_machines)]
+        for operation_id in sorted(range(len(start_times)), key=start_times.__getitem__):
+            sequences[operation_machine[operation_id]].append(operation_id)
+
+        heads, order = self._heads(sequences)
+        tails = self._tails(sequences, order)
+        current = max(head + duration for head, duration in zip(heads, self._durations))
+        best, best_sequences = current, [sequence[:] for sequence in sequences]
+
+        tabu = {}
+        iteration = iterations_without_improvement = 0
+        while iterations_without_improvement < self.max_iterations and time.perf_counter() < deadline:
+            iteration += 1
+            candidates = []
+            for machine_id, first, last in self._critical_blocks(sequences, heads, tails, current):
+                for i, j in _block_moves(first, last):
+                    estimate = self._estimate(sequences[machine_id], i, j, heads, tails)
+                    if estimate is not None:
+                        candidates.append((estimate, machine_id, i, j))
+            candidates.sort()
+
+            for estimate, machine_id, i, j in candidates:
+                sequence = sequences[machine_id]
+                if estimate >= best and any(tabu.get(pair, 0) > iteration for pair in _created_pairs(sequence, i, j)):
+                    continue
+                reversed_pairs = _reversed_pairs(sequence, i, j)
+                sequence.insert(j, sequence.pop(i))
+                result = self._heads(sequences)
+                if result is None:
+                    # the move creates a cycle via the job arcs
+                    sequence.insert(i, sequence.pop(j))
+                    continue
+                heads, order = result
+                tails = self._tails(sequences, order)
+                current = max(head + duration for head, duration in zip(heads, self._durations))
+                for pair in reversed_pairs:
+                    tabu[pair] = iteration + self.tabu_tenure
+                break
+            else:
+                break
+
+            if current < best:
+                best, best_sequences = current, [sequence[:] for sequence in sequences]
+                iterations_without_improvement = 0
+            else:
+                iterations_without_improvement += 1
+
+        if best >= makespan:
+            return makespan
+        # write back: operation sequence ordered by the start times of the best schedule
+        heads, order = self._heads(best_sequences)
+        rank = {operation_id: position for position, operation_id in enumerate(order)}
+        operation_sequence = [self.operation_job[operation_id]
+                              for operation_id in sorted(order, key=lambda o: (heads[o], rank[o]))]
+        improved = self.decoder.decode([individual[0], operation_sequence])
+        if improved >= makespan:
+            return makespan
+        individual[1] = operation_sequence
+        return improved
+
+    def _setup_time(self, machine_id, operation_from, operation_to):
+        setup_class = self.decoder.setup_class
+        return self.decoder.setup_times[machine_id][setup_class[operation_from]][setup_class[operation_to]]
+
+    def _heads(self, sequences):
+        """Return the heads (earliest start times) and a topological order, or None if the graph has a cycle."""
+        durations, predecessors = self._durations, self.predecessors
+        nr_of_operations = len(durations)
+        machine_predecessor = [-1] * nr_of_operations
+        machine_successor = [-1] * nr_of_operations
+        for sequence in sequences:
+            for a, b in zip(sequence, sequence[1:]):
+                machine_predecessor[b], machine_successor[a] = a, b
+        self._machine_predecessor, self._machine_successor = machine_predecessor, machine_successor
+
+        in_degree = [len(predecessors[o]) + (machine_predecessor[o] >= 0) for o in range(nr_of_operations)]
+        ready = deque(o for o in range(nr_of_operations) if in_degree[o] == 0)
+        heads = [0] * nr_of_operations
+        order = []
+        setups = self.decoder.setup_times is not None
+        while ready:
+            operation_id = ready.popleft()
+            order.append(operation_id)
+            head = 0
+            for predecessor in predecessors[operation_id]:
+                if heads[predecessor] + durations[predecessor] > head:
+                    head = heads[predecessor] + durations[predecessor]
+            previous = machine_predecessor[operation_id]
+            if previous >= 0:
+                machine_ready = heads[previous] + durations[previous]
+                if setups:
+                    machine_ready += self._setup_time(self._operation_machine[operation_id], previous, operation_id)
+                if machine_ready > head:
+                    head = machine_ready
+            heads[operation_id] = head
+            for successor in self.successors[operation_id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+            successor = machine_successor[operation_id]
+            if successor >= 0:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+        if len(order) < nr_of_operations:
+            return None
+        return heads, order
+
+    def _tails(self, sequences, order):
+        """Return the tails (longest path from the start of an operation to the end, including its duration)."""
+        durations, successors = self._durations, self.successors
+        machine_successor = self._machine_successor
+        setups = self.decoder.setup_times is not None
+        tails = [0] * len(durations)
+        for operation_id in reversed(order):
+            tail = 0
+            for successor in successors[operation_id]:
+                if tails[successor] > tail:
+                    tail = tails[successor]
+            following = machine_successor[operation_id]
+            if following >= 0:
+                machine_tail = tails[following]
+                if setups:
+                    machine_tail += self._setup_time(self._operation_machine[operation_id], operation_id, following)
+                if machine_tail > tail:
+                    tail = machine_tail
+            tails[operation_id] = durations[operation_id] + tail
+        return tails
+
+    def _critical_blocks(self, sequences, heads, tails, makespan):
+        """Return the blocks (machine, first position, last position) of a critical path, with at least 2 operations."""
+        durations = self._durations
+        machine_successor = self._machine_successor
+        setups = self.decoder.setup_times is not None
+        position = {}
+        for sequence in sequences:
+            for index, operation_id in enumerate(sequence):
+                position[operation_id] = index
+
+        operation_id = next(o for o in range(len(heads)) if heads[o] == 0 and tails[o] == makespan)
+        path = [operation_id]
+        while True:
+            end = heads[operation_id] + durations[operation_id]
+            following = machine_successor[operation_id]
+            next_operation = None
+            if following >= 0 and heads[following] + tails[following] == makespan:
+                setup = self._setup_time(self._operation_machine[operation_id], operation_id, following) if setups else 0
+                if heads[following] == end + setup:
+                    next_operation = following
+            if next_operation is None:
+                for successor in self.successors[operation_id]:
+                    if heads[successor] == end and heads[successor] + tails[successor] == makespan:
+                        next_operation = successor
+                        break
+            if next_operation is None:
+                break
+            path.append(next_operation)
+            operation_id = next_operation
+
+        blocks = []
+        first = 0
+        for index in range(1, len(path) + 1):
+            if index == len(path) or machine_successor[path[index - 1]] != path[index]:
+                if index - first >= 2:
+                    blocks.append((self._operation_machine[path[first]], position[path[first]],
+                                   position[path[index - 1]]))
+                first = index
+        return blocks
+
+    def _estimate(self, sequence, i, j, heads, tails):
+        """Head/tail estimate of the makespan after moving the operation at position i to position j, recomputing
+        only the reordered segment. Returns None if the move reverses a job arc within the segment."""
+        durations = self._durations
+        low, high = min(i, j), max(i, j)
+        segment = sequence[low:high + 1]
+        segment.insert(j - low, segment.pop(i - low))
+        setups = self.decoder.setup_times is not None
+        machine_id = self._operation_machine[segment[0]]
+
+        new_heads = {}
+        previous = sequence[low - 1] if low > 0 else -1
+        for operation_id in segment:
+            head = 0
+            for predecessor in self.predecessors[operation_id]:
+                if predecessor in segment and predecessor not in new_heads:
+                    return None
+                end = (new_heads[predecessor] if predecessor in new_heads else heads[predecessor]) + \
+                    durations[predecessor]
+                if end > head:
+                    head = end
+            if previous >= 0:
+                machine_ready = (new_heads[previous] if previous in new_heads else heads[previous]) + durations[previous]
+                if setups:
+                    machine_ready += self._setup_time(machine_id, previous, operation_id)
+                if machine_ready > head:
+                    head = machine_ready
+            new_heads[operation_id] = head
+            previous = operation_id
+
+        estimate = 0
+        new_tails = {}
+        following = sequence[high + 1] if high + 1 < len(sequence) else -1
+        for operation_id in reversed(segment):
+            tail = 0
+            for successor in self.successors[operation_id]:
+                if successor in segment and successor not in new_tails:
+                    return None
+                successor_tail = new_tails[successor] if successor in new_tails else tails[successor]
+                if successor_tail > tail:
+                    tail = successor_tail
+            if following >= 0:
+                machine_tail = new_tails[following] if following in new_tails else tails[following]
+                if setups:
+                    machine_tail += self._setup_time(machine_id, operation_id, following)
+                if machine_tail > tail:
+                    tail = machine_tail
+            new_tails[operation_id] = durations[operation_id] + tail
+            estimate = max(estimate, new_heads[operation_id] + new_tails[operation_id])
+            following = operation_id
+        return estimate
+
+
+def _block_moves(first, last):
+    """N7 moves (i, j) in the block at positions first..last: move the operation at position i to position j."""
+    moves = set()
+    for k in range(first + 1, last):
+        moves.update([(k, first), (k, last), (first, k), (last, k)])
+    moves.update([(first, first + 1), (last, last - 1), (first, last), (last, first)])
+    return sorted(moves)
+
+
+def _created_pairs(sequence, i, j):
+    """The (before, after) operation pairs whose order is created by moving position i to position j."""
+    operation_id = sequence[i]
+    if j > i:
+        return [(other, operation_id) for other in sequence[i + 1:j + 1]]
+    return [(operation_id, other) for other in sequence[j:i]]
+
+
+def _reversed_pairs(sequence, i, j):
+    """The (before, after) operation pairs whose order is reversed by moving position i to position j."""
+    return [(after, before) for before, after in _created_pairs(sequence, i, j)]
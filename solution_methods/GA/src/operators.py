@@ -1,10 +1,15 @@
+import logging
 import random
+from functools import partial
 
 import numpy as np
 
 from scheduling_environment.jobShop import JobShop
 from scheduling_environment.operation import Operation
+from solution_methods.GA.src.decoder import BatchScheduleDecoder, ScheduleDecoder
+from scheduling_environment.compiledJobShop import CompiledJobShop
 from solution_methods.GA.src.heuristics import global_load_balancing_scheduler, local_load_balancing_scheduler, random_scheduler
+from solution_methods.GA.src.heuristics import init_chromosome
 
 
 def select_next_operation_from_job(jobShopEnv: JobShop, job_id) -> Operation:
@@ -72,8 +77,18 @@ def init_individual(ind_class, jobShopEnv):
     return ind_class([machine_selection, operation_sequence])
 
 
+def init_individual_compiled(ind_class, compiled: CompiledJobShop):
+    """create individual with the array-based heuristics, from a seed drawn from the (seeded) random module"""
+    return ind_class(init_chromosome(compiled, random.getrandbits(64)))
+
+
 # Initialize a population
 def init_population(toolbox, population_size):
+    if hasattr(toolbox, "init_chromosomes"):
+        # construct the chromosomes in the worker pool, every chromosome from its own seed (independent of the
+        # number of processes, and the same population as sequential construction)
+        seeds = [random.getrandbits(64) for _ in range(population_size)]
+        return [toolbox.individual(chromosome) for chromosome in toolbox.init_chromosomes(seeds)]
     return [toolbox.init_individual() for _ in range(population_size)]
 
 
@@ -97,6 +112,18 @@ def evaluate_individual(individual, jobShopEnv: JobShop, reset=True):
     return makespan, jobShopEnv
 
 
+def evaluate_individual_compiled(individual, decoder: ScheduleDecoder):
+    """Evaluate an individual on the compiled (array) backend, returns the fitness tuple (makespan,)."""
+    return decoder.decode(individual),
+
+
+def evaluate_chromosomes_batched(chromosomes, decoder: BatchScheduleDecoder):
+    """Evaluate a list of chromosomes at once with the vectorized decoder, returns a list of fitness tuples."""
+    makespans = decoder.decode([chromosome[0] for chromosome in chromosomes],
+                               [chromosome[1] for chromosome in chromosomes])
+    return [(makespan,) for makespan in makespans.tolist()]
+
+
 def evaluate_population(toolbox, population):
     # start_time = time.time()
 
@@ -105,12 +132,25 @@ def evaluate_population(toolbox, population):
     # fitnesses = [toolbox.evaluate_individual(ind) for ind in population]
     # fitnesses = [(fit[0],) for fit in fitnesses]
 
-    # parallel evaluation of population
-    population = [[ind[0], ind[1]] for ind in population]
-    fitnesses = toolbox.map(toolbox.evaluate_individual, population)
-    fitnesses = [(fit[0],) for fit in fitnesses]
+    if hasattr(toolbox, "evaluate_incremental"):
+        # incremental evaluation needs the individuals, they refer to the decoder checkpoints of their parent
+        evaluate_function = toolbox.evaluate_incremental
+    else:
+        # parallel evaluation of population (only the chromosomes are sent to the worker pool)
+        population = [[ind[0], ind[1]] for ind in population]
+        evaluate_function = partial(_evaluate_chromosomes, toolbox)
+    if hasattr(toolbox, "evaluate_cached"):
+        # only chromosomes that are not in the fitness cache are evaluated
+        return toolbox.evaluate_cached(population, evaluate_function)
+    return evaluate_function(population)
+
 
-    return fitnesses
+def _evaluate_chromosomes(toolbox, chromosomes):
+    if hasattr(toolbox, "evaluate_chromosomes"):
+        fitnesses = toolbox.evaluate_chromosomes(chromosomes)
+    else:
+        fitnesses = toolbox.map(toolbox.evaluate_individual, chromosomes)
+    return [(fit[0],) for fit in fitnesses]
 
 
 def variation(population, toolbox, pop_size, cr, indpb):
@@ -145,24 +185,41 @@ def variation(population, toolbox, pop_size, cr, indpb):
     return offspring
 
 
-def repair_precedence_constraints(env, offspring):
-    precedence_relations = env.precedence_relations_jobs
-    for ind in offspring:
-        i = 0
-        lst = ind[1]
-        while i < len(ind[1]):
-            # print(i)
-            if lst[i] in precedence_relations.keys():
-                max_index = 0
-                for j in precedence_relations[lst[i]]:
-                    index = len(lst) - 1 - lst[::-1].index(j)
-                    if index > max_index:
-                        max_index = index
-                if max_index > i:
-                    item = lst[i]
-                    lst.pop(i)  # Remove the item from the source index
-                    lst.insert(max_index, item)
-                    # print(lst)
-                    continue
-            i += 1
-    return offspring
+def evolve_generation(jobShopEnv, population, toolbox, **kwargs):
+    """Create, repair and evaluate the offspring of one generation and select the next population.
+
+    Returns the next population, or None if repairing or evaluating the offspring failed.
+    """
+    # Vary the population (on population matrices if the vectorized operators are registered)
+    vary = toolbox.vary if hasattr(toolbox, "vary") else partial(variation, toolbox=toolbox)
+    offspring = vary(population,
+                     pop_size=kwargs['algorithm'].get('population_size'),
+                     cr=kwargs['algorithm'].get('cr'),
+                     indpb=kwargs['algorithm'].get('indpb'))
+
+    # Repair precedence constraints if the environment requires it (only for assembly scheduling (fajsp))
+    if hasattr(toolbox, "repair"):
+        try:
+            offspring = toolbox.repair(offspring)
+        except Exception as e:
+            logging.error(f"Error repairing precedence constraints: {e}")
+            return None
+
+    # Evaluate offspring fitness
+    try:
+        fitnesses = evaluate_population(toolbox, offspring)
+        for ind, fit in zip(offspring, fitnesses):
+            ind.fitness.values = fit
+    except Exception as e:
+        logging.error(f"Error evaluating offspring fitness: {e}")
+        return None
+
+    # Memetic stage: improve the best offspring with critical-block local search
+    if hasattr(toolbox, "local_search"):
+        top_k = sorted(offspring, key=lambda ind: ind.fitness.values[0])[:kwargs['algorithm']['local_search_top_k']]
+        for ind in top_k:
+            ind.fitness.values = (toolbox.local_search(ind),)
+
+    # Select the next generation
+    return toolbox.select(population + offspring)
+
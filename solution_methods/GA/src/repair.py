@@ -0,0 +1,95 @@
+import numpy as np
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+
+
+def _sort_dtype(size):
+    """Smallest integer type for sort keys below size: NumPy sorts 16 bit integers with a (linear) radix sort."""
+    return np.uint16 if size <= np.iinfo(np.uint16).max + 1 else np.int64
+
+
+class PrecedenceRepair:
+    """
+    Repair of the operation sequences of assembly scheduling (FAJSP) chromosomes, in which all operations of the
+    predecessor jobs of a job have to be sequenced before its operations.
+
+    The genes of a job that appear before its predecessor jobs are complete are deferred to the gene that completes
+    the last of its predecessor jobs (recursively), all other genes keep their relative order. Every gene gets the sort
+    key max(position, release position of its job), ties are broken by the topological rank of the job and the
+    position. The release positions are computed
+    over the job graph in topological order for all sequences at once, and the keys are sorted with two stable
+    (radix) sorts, so repairing a batch of P sequences takes O(P (L + E)) time.
+    """
+
+    def __init__(self, compiled: CompiledJobShop):
+        self.nr_of_jobs = compiled.nr_of_jobs
+        job_predecessor_ptr = compiled.job_predecessor_ptr.tolist()
+        self.job_predecessors = [compiled.job_predecessors[job_predecessor_ptr[job_id]:
+                                                           job_predecessor_ptr[job_id + 1]].tolist()
+                                 for job_id in range(self.nr_of_jobs)]
+        self.job_order = self._topological_order()
+        self.job_rank = np.empty(self.nr_of_jobs, dtype=_sort_dtype(self.nr_of_jobs))
+        self.job_rank[self.job_order] = np.arange(self.nr_of_jobs)
+
+    def _topological_order(self):
+        successors = [[] for _ in range(self.nr_of_jobs)]
+        in_degree = [len(predecessors) for predecessors in self.job_predecessors]
+        for job_id, predecessors in enumerate(self.job_predecessors):
+            for predecessor in predecessors:
+                successors[predecessor].append(job_id)
+        order = [job_id for job_id in range(self.nr_of_jobs) if in_degree[job_id] == 0]
+        for job_id in order:
+            for successor in successors[job_id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    order.append(successor)
+        if len(order) < self.nr_of_jobs:
+            raise ValueError("The precedence relations between jobs contain a cycle")
+        return order
+
+    def repair_sequences(self, operation_sequences):
+        """Return the repaired (P x L) matrix of operation sequences."""
+        operation_sequences = np.asarray(operation_sequences)
+        nr_of_rows, length = operation_sequences.shape
+        rows = np.arange(nr_of_rows)
+        positions = np.broadcast_to(np.arange(length), operation_sequences.shape)
+
+        # position of the last gene of every job
+        last_position = np.zeros(nr_of_rows * self.nr_of_jobs, dtype=np.int64)
+        np.maximum.at(last_position, (rows[:, None] * self.nr_of_jobs + operation_sequences).ravel(), positions.ravel())
+        last_position = last_position.reshape(nr_of_rows, self.nr_of_jobs)
+
+        # release position (completion of the last predecessor job) and completion position of every job
+        release = np.zeros((nr_of_rows, self.nr_of_jobs), dtype=np.int64)
+        completion = np.empty((nr_of_rows, self.nr_of_jobs), dtype=np.int64)
+        for job_id in self.job_order:
+            predecessors = self.job_predecessors[job_id]
+            if predecessors:
+                release[:, job_id] = completion[:, predecessors].max(axis=1)
+            completion[:, job_id] = np.maximum(last_position[:, job_id], release[:, job_id])
+
+        keys = np.maximum(positions, release[rows[:, None], operation_sequences]).astype(_sort_dtype(length))
+        # stable sort by (key, job rank, position): first by rank, then by key
+        order = np.argsort(self.job_rank[operation_sequences], axis=1, kind='stable')
+        order = np.take_along_axis(order, np.argsort(np.take_along_axis(keys, order, axis=1), axis=1, kind='stable'),
+                                   axis=1)
+        return np.take_along_axis(operation_sequences, order, axis=1)
+
+    def is_feasible(self, operation_sequence) -> bool:
+        """Return whether all genes of every job come after all genes of its predecessor jobs."""
+        remaining = np.bincount(np.asarray(operation_sequence), minlength=self.nr_of_jobs).tolist()
+        for job_id in operation_sequence:
+            if any(remaining[predecessor] for predecessor in self.job_predecessors[job_id]):
+                return False
+            remaining[job_id] -= 1
+        return True
+
+    def __call__(self, offspring):
+        """Repair the operation sequences of the offspring in place, returns the offspring."""
+        if not offspring:
+            return offspring
+        operation_sequences = np.array([ind[1] for ind in offspring], dtype=np.int32)
+        repaired = self.repair_sequences(operation_sequences)
+        for index in np.nonzero((repaired != operation_sequences).any(axis=1))[0].tolist():
+            offspring[index][1] = repaired[index].tolist()
+        return offspring
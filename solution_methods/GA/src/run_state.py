@@ -0,0 +1,84 @@
+import gzip
+import os
+import pickle
+import random
+
+import numpy as np
+
+# version of the state file format
+STATE_VERSION = 2
+
+
+def _chromosome_matrix(individuals, gene):
+    return np.array([ind[gene] for ind in individuals], dtype=np.int32)
+
+
+def save_state(path, generation, population, hof, logbook, stopping_criteria, evaluation_state=None) -> None:
+    """
+    Save the state of a GA run after `generation` to a compressed binary file: the population (as integer matrices)
+    with its fitnesses, the hall of fame, the logbook, the stopping criteria state, the random and numpy RNG states and
+    the state of the evaluation (fitness cache, decoder checkpoints and the checkpoint ids of the population).
+    The file is written to a temporary file first and then renamed, so an interrupted save keeps the previous state.
+    """
+    state = {
+        "version": STATE_VERSION,
+        "generation": generation,
+        "machine_selections": _chromosome_matrix(population, 0),
+        "operation_sequences": _chromosome_matrix(population, 1),
+        "fitnesses": np.array([ind.fitness.values for ind in population], dtype=np.float64),
+        "hof_machine_selections": _chromosome_matrix(hof, 0),
+        "hof_operation_sequences": _chromosome_matrix(hof, 1),
+        "hof_fitnesses": np.array([ind.fitness.values for ind in hof], dtype=np.float64),
+        "logbook": logbook,
+        "stopping_criteria": stopping_criteria.state(),
+        "random_state": random.getstate(),
+        "numpy_random_state": np.random.get_state(),
+        "evaluation_state": evaluation_state or {},
+        "checkpoint_ids": [getattr(ind, 'checkpoint_id', None) for ind in population],
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with gzip.open(temporary_path, "wb", compresslevel=6) as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+
+
+def load_state(path) -> dict:
+    """Load a state file written by save_state."""
+    with gzip.open(path, "rb") as file:
+        state = pickle.load(file)
+    if state.get("version") != STATE_VERSION:
+        raise ValueError(f"Unsupported GA state file version: {state.get('version')}")
+    return state
+
+
+def _individuals(ind_class, machine_selections, operation_sequences, fitnesses):
+    individuals = []
+    for machine_selection, operation_sequence, fitness in zip(machine_selections, operation_sequences, fitnesses):
+        ind = ind_class([machine_selection.tolist(), operation_sequence.tolist()])
+        ind.fitness.values = tuple(fitness.tolist())
+        individuals.append(ind)
+    return individuals
+
+
+def restore_state(state, ind_class, hof, stopping_criteria):
+    """
+    Restore a loaded state: refill the hall of fame, restore the stopping criteria and the RNG states. The evaluation
+    state (state["evaluation_state"]) is restored by the caller.
+
+    Returns:
+        tuple: (generation, population, logbook)
+    """
+    population = _individuals(ind_class, state["machine_selections"], state["operation_sequences"],
+                              state["fitnesses"])
+    for ind, checkpoint_id in zip(population, state["checkpoint_ids"]):
+        if checkpoint_id is not None:
+            ind.checkpoint_id = checkpoint_id
+    hof.clear()
+    hof.update(_individuals(ind_class, state["hof_machine_selections"], state["hof_operation_sequences"],
+                            state["hof_fitnesses"]))
+    stopping_criteria.restore(state["stopping_criteria"])
+    random.setstate(state["random_state"])
+    np.random.set_state(state["numpy_random_state"])
+    return state["generation"], population, state["logbook"]
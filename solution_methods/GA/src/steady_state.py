@@ -0,0 +1,119 @@
+import logging
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from deap import tools
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.GA.src.operators import variation
+from solution_methods.GA.src.stopping import StoppingCriteria
+from solution_methods.GA.src.worker_pool import _evaluate_chunk, _load_instance
+
+
+def replace_worst(population, offspring, tournsize=None) -> bool:
+    """Replace the worst individual of the population by the offspring if it is not worse, returns whether it did."""
+    index = min(range(len(population)), key=lambda i: population[i].fitness)
+    if offspring.fitness >= population[index].fitness:
+        population[index] = offspring
+        return True
+    return False
+
+
+def replace_tournament(population, offspring, tournsize=3) -> bool:
+    """Replace the loser of a tournament of tournsize random individuals by the offspring if it is not worse."""
+    index = min(random.sample(range(len(population)), min(tournsize, len(population))),
+                key=lambda i: population[i].fitness)
+    if offspring.fitness >= population[index].fitness:
+        population[index] = offspring
+        return True
+    return False
+
+
+REPLACEMENTS = {"worst": replace_worst, "tournament": replace_tournament}
+
+
+def evolve_steady_state(jobShopEnv, population, toolbox, stats, hof, stopping_criteria=None, **kwargs):
+    """
+    Asynchronous steady-state GA: offspring are created one at a time from tournament-selected parents and submitted
+    to a process pool (concurrent.futures) as soon as a worker is free, every evaluated offspring is inserted into the
+    population (replace-worst or tournament replacement) as soon as its result arrives. No worker waits for the
+    slowest evaluation of a generation, which keeps all cores busy when decode times vary between chromosomes.
+
+    Every population_size evaluations count as one generation for the statistics, the logbook and the stopping
+    criteria. The order in which results arrive depends on the worker timings, so runs are not reproducible.
+
+    Returns:
+        The logbook of the run.
+    """
+    algorithm = kwargs['algorithm']
+    verbose = kwargs['output']['logbook']
+    if stopping_criteria is None:
+        stopping_criteria = StoppingCriteria()
+    processes = algorithm.get('processes') or os.cpu_count()
+    # evaluations in flight per worker, so that a worker never waits for its next chromosome
+    in_flight = processes * algorithm.get('steady_state_queue', 2)
+    replace = REPLACEMENTS[algorithm.get('replacement', 'worst')]
+    population_size = len(population)
+
+    logbook = tools.Logbook()
+    logbook.header = ["gen", "evaluations"] + (stats.fields if stats else [])
+    hof.update(population)
+    logbook.record(gen=0, evaluations=0, **(stats.compile(population) if stats else {}))
+    if verbose:
+        logging.info(logbook.stream)
+    if stopping_criteria.update(0, hof[0].fitness.values[0]):
+        return logbook
+
+    compiled = CompiledJobShop.from_job_shop(jobShopEnv)
+    backend = algorithm.get('backend', 'array')
+    decoder = algorithm.get('decoder', 'sequence')
+    directory = tempfile.mkdtemp(prefix="GA_steady_state_")
+    instance_path = os.path.join(directory, "instance.npz")
+    instance_key = f"{os.getpid()}_steady_state"
+    compiled.save(instance_path)
+
+    def submit(executor):
+        parents = tools.selTournament(population, 2, tournsize=3)
+        offspring = variation(parents, toolbox, 1, algorithm['cr'], algorithm['indpb'])
+        if hasattr(toolbox, "repair"):
+            offspring = toolbox.repair(offspring)
+        chromosome = [offspring[0][0], offspring[0][1]]
+        pending[executor.submit(_evaluate_chunk, (instance_key, instance_path, backend, decoder, [chromosome]))] = offspring[0]
+
+    pending = {}
+    evaluations = gen = 0
+    stop = algorithm['ngen'] == 0
+    try:
+        with ProcessPoolExecutor(processes, initializer=_load_instance,
+                                 initargs=(instance_key, instance_path, backend, decoder)) as executor:
+            for _ in range(in_flight):
+                submit(executor)
+            while not stop:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    offspring = pending.pop(future)
+                    offspring.fitness.values = (future.result()[0],)
+                    if replace(population, offspring, algorithm.get('replacement_tournsize', 3)):
+                        hof.update([offspring])
+                    evaluations += 1
+
+                    if evaluations % population_size == 0:
+                        gen += 1
+                        logbook.record(gen=gen, evaluations=evaluations,
+                                       **(stats.compile(population) if stats else {}))
+                        if verbose:
+                            logging.info(logbook.stream)
+                        if stopping_criteria.update(gen, hof[0].fitness.values[0]) or gen == algorithm['ngen']:
+                            stop = True
+                            break
+                if not stop:
+                    # refill the pool with as many new offspring as results arrived
+                    for _ in done:
+                        submit(executor)
+            executor.shutdown(cancel_futures=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return logbook
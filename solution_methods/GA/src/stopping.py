@@ -0,0 +1,107 @@
+import time
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+
+# stopping reasons
+MAX_GENERATIONS = "max_generations"
+TIME_LIMIT = "time_limit"
+TARGET_MAKESPAN = "target_makespan"
+LOWER_BOUND = "lower_bound"
+STAGNATION = "stagnation"
+# order in which the stopping reasons of islands determine the stopping reason of an island model run
+REASON_PRIORITY = [LOWER_BOUND, TARGET_MAKESPAN, TIME_LIMIT, STAGNATION, MAX_GENERATIONS]
+
+
+class StoppingCriteria:
+    """
+    Stopping criteria of a GA run besides the number of generations: a wall-clock time limit, a target makespan, a
+    match with the lower bound of the instance and a number of generations without improvement of the best makespan.
+
+    update() is called with the best makespan after every generation; it keeps track of the time and generation at
+    which the best makespan was found and returns True (and sets stopping_reason) as soon as a criterion is met.
+    """
+
+    def __init__(self, time_limit=0, target_makespan=0, lower_bound=None, stagnation_generations=0, start_time=None):
+        self.time_limit = time_limit
+        self.target_makespan = target_makespan
+        self.lower_bound = lower_bound
+        self.stagnation_generations = stagnation_generations
+        self.start_time = time.time() if start_time is None else start_time
+        self.stopping_reason = MAX_GENERATIONS
+        self.best_makespan = None
+        self.time_to_best = None
+        self.generation_of_best = None
+        self.generations = 0
+
+    @classmethod
+    def from_parameters(cls, jobShopEnv, start_time=None, **kwargs) -> "StoppingCriteria":
+        """Create the stopping criteria for the job shop environment from the [algorithm] parameters."""
+        algorithm = kwargs['algorithm']
+        lower_bound = None
+        if algorithm.get('stop_at_lower_bound', False):
+            lower_bound = CompiledJobShop.from_job_shop(jobShopEnv).makespan_lower_bound()
+        return cls(time_limit=algorithm.get('time_limit', 0),
+                   target_makespan=algorithm.get('target_makespan', 0),
+                   lower_bound=lower_bound,
+                   stagnation_generations=algorithm.get('stagnation_generations', 0),
+                   start_time=start_time)
+
+    def elapsed_time(self) -> float:
+        return time.time() - self.start_time
+
+    def update(self, gen, best_makespan) -> bool:
+        """Record the best makespan after generation gen, returns whether the run should stop."""
+        self.generations = gen
+        if self.best_makespan is None or best_makespan < self.best_makespan:
+            self.best_makespan = best_makespan
+            self.time_to_best = self.elapsed_time()
+            self.generation_of_best = gen
+
+        if self.lower_bound is not None and best_makespan <= self.lower_bound:
+            self.stopping_reason = LOWER_BOUND
+        elif self.target_makespan and best_makespan <= self.target_makespan:
+            self.stopping_reason = TARGET_MAKESPAN
+        elif self.time_limit and self.elapsed_time() >= self.time_limit:
+            self.stopping_reason = TIME_LIMIT
+        elif self.stagnation_generations and gen - self.generation_of_best >= self.stagnation_generations:
+            self.stopping_reason = STAGNATION
+        else:
+            return False
+        return True
+
+    def state(self) -> dict:
+        """Return the progress of the run, to be saved with the GA state (see run_state)."""
+        return {"best_makespan": self.best_makespan, "time_to_best": self.time_to_best,
+                "generation_of_best": self.generation_of_best, "generations": self.generations,
+                "elapsed_time": self.elapsed_time()}
+
+    def restore(self, state) -> None:
+        """Continue from a saved state, the time limit includes the time before the state was saved."""
+        self.best_makespan = state["best_makespan"]
+        self.time_to_best = state["time_to_best"]
+        self.generation_of_best = state["generation_of_best"]
+        self.generations = state["generations"]
+        self.start_time = time.time() - state["elapsed_time"]
+
+    def results(self) -> dict:
+        """Return the stopping reason, time to best and related information (for results_saving)."""
+        return {
+            "stopping_reason": self.stopping_reason,
+            "best_makespan": self.best_makespan,
+            "generations": self.generations,
+            "time_to_best": self.time_to_best,
+            "generation_of_best": self.generation_of_best,
+            "computation_time": self.elapsed_time(),
+            "lower_bound": self.lower_bound,
+        }
+
+    def merge(self, island_results) -> None:
+        """Combine the results() of the islands of an island model run (started at the same start_time)."""
+        best = min((result for result in island_results if result["best_makespan"] is not None),
+                   key=lambda result: (result["best_makespan"], result["time_to_best"]))
+        self.best_makespan = best["best_makespan"]
+        self.time_to_best = best["time_to_best"]
+        self.generation_of_best = best["generation_of_best"]
+        self.generations = max(result["generations"] for result in island_results)
+        reasons = [result["stopping_reason"] for result in island_results]
+        self.stopping_reason = next(reason for reason in REASON_PRIORITY if reason in reasons)
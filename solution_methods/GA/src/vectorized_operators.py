@@ -0,0 +1,145 @@
+import random
+
+import numpy as np
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+
+
+def population_matrices(population):
+    """Return the machine selections and operation sequences of the population as two (P x L) integer matrices."""
+    machine_selections = np.array([ind[0] for ind in population], dtype=np.int32)
+    operation_sequences = np.array([ind[1] for ind in population], dtype=np.int32)
+    return machine_selections, operation_sequences
+
+
+def two_point_crossover(parents1, parents2, rng):
+    """Two-point crossover of every row pair (as tools.cxTwoPoint), returns the two offspring matrices."""
+    nr_of_rows, length = parents1.shape
+    first = rng.integers(1, length + 1, size=nr_of_rows)
+    second = rng.integers(1, length, size=nr_of_rows)
+    second = np.where(second >= first, second + 1, second)
+    first, second = np.minimum(first, second), np.maximum(first, second)
+    columns = np.arange(length)
+    swap = (columns >= first[:, None]) & (columns < second[:, None])
+    return np.where(swap, parents2, parents1), np.where(swap, parents1, parents2)
+
+
+def uniform_crossover(parents1, parents2, rng, indpb=0.5):
+    """Uniform crossover of every row pair (as tools.cxUniform), returns the two offspring matrices."""
+    swap = rng.random(parents1.shape) < indpb
+    return np.where(swap, parents2, parents1), np.where(swap, parents1, parents2)
+
+
+def pox_crossover(parents1, parents2, nr_of_jobs, rng, nr_preserving_jobs=1):
+    """
+    Precedence preserving order-based crossover of every row pair of operation sequences: the genes of
+    nr_preserving_jobs randomly chosen jobs keep their positions of the first parent, the other positions are filled
+    with the remaining genes in the order of the second parent (and vice versa for the second offspring).
+    """
+    nr_of_rows = parents1.shape[0]
+    if nr_preserving_jobs >= nr_of_jobs:
+        return parents1.copy(), parents2.copy()
+    # the first nr_preserving_jobs jobs of a random permutation per row
+    preserving_jobs = np.argsort(rng.random((nr_of_rows, nr_of_jobs)), axis=1)[:, :nr_preserving_jobs]
+    preserved = np.zeros((nr_of_rows, nr_of_jobs), dtype=bool)
+    preserved[np.arange(nr_of_rows)[:, None], preserving_jobs] = True
+
+    rows = np.arange(nr_of_rows)[:, None]
+    preserved1 = preserved[rows, parents1]
+    preserved2 = preserved[rows, parents2]
+    # every row has the same number of non-preserved genes in both parents, so the row-major boolean selections align
+    offspring1 = parents1.copy()
+    offspring1[~preserved1] = parents2[~preserved2]
+    offspring2 = parents2.copy()
+    offspring2[~preserved2] = parents1[~preserved1]
+    return offspring1, offspring2
+
+
+def mutate_shortest_proc_time(machine_selections, indpb, shortest_options, rng):
+    """Set every gene with probability indpb to the option with the shortest processing time (in place)."""
+    mutate = rng.random(machine_selections.shape) < indpb
+    machine_selections[mutate] = np.broadcast_to(shortest_options, machine_selections.shape)[mutate]
+    return machine_selections
+
+
+def mutate_sequence_exchange(operation_sequences, indpb, rng):
+    """
+    Exchange every gene with probability indpb with a gene at another random position (in place). The exchanges of a
+    row are applied in the order of the genes, one vectorized step over all rows per exchange.
+    """
+    nr_of_rows, length = operation_sequences.shape
+    if length < 2:
+        return operation_sequences
+    mutate = rng.random(operation_sequences.shape) < indpb
+    rows, positions = np.nonzero(mutate)
+    # a random other position: draw from length - 1 positions and skip the gene itself
+    others = rng.integers(0, length - 1, size=len(positions))
+    others += others >= positions
+
+    counts = np.bincount(rows, minlength=nr_of_rows)
+    order_in_row = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    for step in range(counts.max(initial=0)):
+        selected = order_in_row == step
+        step_rows, step_positions, step_others = rows[selected], positions[selected], others[selected]
+        genes = operation_sequences[step_rows, step_positions]
+        operation_sequences[step_rows, step_positions] = operation_sequences[step_rows, step_others]
+        operation_sequences[step_rows, step_others] = genes
+    return operation_sequences
+
+
+class MatrixVariation:
+    """
+    Vectorized variation of a population: the offspring are created on (P x L) integer matrices of the machine
+    selections and operation sequences with NumPy crossover and mutation operators, instead of cloning individuals
+    and varying the chromosome lists one at a time.
+
+    The operators are drawn as in variation(): with probability cr two distinct random parents are mated (two-point or
+    uniform crossover of the machine selections with equal probability, POX of the operation sequences) and the first
+    offspring is kept, otherwise a random parent is copied; then both mutations are applied with probability indpb per
+    gene. The NumPy generator is seeded from the random module, so runs stay reproducible with the GA seed.
+    """
+
+    def __init__(self, compiled: CompiledJobShop, nr_preserving_jobs=1):
+        self.nr_of_jobs = compiled.nr_of_jobs
+        self.nr_preserving_jobs = nr_preserving_jobs
+        option_ptr = compiled.option_ptr.tolist()
+        option_duration = compiled.option_duration.tolist()
+        self.shortest_options = np.array(
+            [int(np.argmin(option_duration[option_ptr[operation_id]:option_ptr[operation_id + 1]]))
+             for operation_id in range(compiled.nr_of_operations)], dtype=np.int32)
+
+    def __call__(self, population, ind_class, pop_size, cr, indpb):
+        """Return pop_size offspring of the population (individuals of ind_class without fitness values)."""
+        rng = np.random.default_rng(random.getrandbits(64))
+        machine_selections, operation_sequences = population_matrices(population)
+        pop_size = int(pop_size)
+
+        # parents: two distinct random individuals for crossover, the first one for reproduction
+        first_parents = rng.integers(0, len(population), size=pop_size)
+        second_parents = (first_parents + rng.integers(1, len(population), size=pop_size)) % len(population)
+        offspring_selections = machine_selections[first_parents]
+        offspring_sequences = operation_sequences[first_parents]
+
+        crossover = np.nonzero(rng.random(pop_size) < cr)[0]
+        if len(crossover) and len(population) > 1:
+            parents1 = machine_selections[first_parents[crossover]]
+            parents2 = machine_selections[second_parents[crossover]]
+            two_point, _ = two_point_crossover(parents1, parents2, rng)
+            uniform, _ = uniform_crossover(parents1, parents2, rng)
+            offspring_selections[crossover] = np.where((rng.random(len(crossover)) < 0.5)[:, None], two_point, uniform)
+            offspring_sequences[crossover], _ = pox_crossover(operation_sequences[first_parents[crossover]],
+                                                              operation_sequences[second_parents[crossover]],
+                                                              self.nr_of_jobs, rng, self.nr_preserving_jobs)
+
+        mutate_shortest_proc_time(offspring_selections, indpb, self.shortest_options, rng)
+        mutate_sequence_exchange(offspring_sequences, indpb, rng)
+
+        offspring = []
+        for parent, machine_selection, operation_sequence in zip(first_parents.tolist(), offspring_selections.tolist(),
+                                                                 offspring_sequences.tolist()):
+            ind = ind_class([machine_selection, operation_sequence])
+            if hasattr(population[parent], 'checkpoint_id'):
+                # incremental evaluation resumes from the checkpoints of the first parent (see CheckpointStore)
+                ind.checkpoint_id = population[parent].checkpoint_id
+            offspring.append(ind)
+        return offspring
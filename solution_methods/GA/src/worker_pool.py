@@ -0,0 +1,112 @@
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from functools import partial
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.GA.src.decoder import DECODERS
+from solution_methods.GA.src.heuristics import init_chromosome
+from solution_methods.GA.src.operators import evaluate_individual, evaluate_individual_compiled
+
+# state of a worker process: the instance it has loaded and the evaluation function for that instance
+_worker_state = {'instance_key': None, 'compiled': None, 'evaluate': None}
+
+
+def _load_instance(instance_key, instance_path, backend, decoder='sequence'):
+    """Load a packed instance in the worker process and build its evaluation function."""
+    compiled = CompiledJobShop.load(instance_path)
+    if backend == 'array':
+        evaluate = partial(evaluate_individual_compiled, decoder=DECODERS[decoder](compiled))
+    else:
+        evaluate = partial(evaluate_individual, jobShopEnv=compiled.to_job_shop())
+    _worker_state['instance_key'] = instance_key
+    _worker_state['compiled'] = compiled
+    _worker_state['evaluate'] = evaluate
+
+
+def _evaluate_chunk(task):
+    """Evaluate a chunk of chromosomes, (re)loading the instance only if the worker does not have it yet."""
+    instance_key, instance_path, backend, decoder, chromosomes = task
+    if _worker_state['instance_key'] != instance_key:
+        _load_instance(instance_key, instance_path, backend, decoder)
+    evaluate = _worker_state['evaluate']
+    return [evaluate(chromosome)[0] for chromosome in chromosomes]
+
+
+def _init_chunk(task):
+    """Construct the chromosomes for a chunk of seeds with the array-based heuristics."""
+    instance_key, instance_path, backend, decoder, seeds = task
+    if _worker_state['instance_key'] != instance_key:
+        _load_instance(instance_key, instance_path, backend, decoder)
+    return [init_chromosome(_worker_state['compiled'], seed) for seed in seeds]
+
+
+class WorkerPool:
+    """
+    Persistent pool of worker processes for GA fitness evaluation.
+
+    The instance is sent to the workers only once: it is written to a packed file that the workers load through the
+    pool initializer (first instance) or lazily on their first task for a new instance. Per task only the chromosomes
+    are sent, in chunks of `chunksize` individuals. The pool can be reused for multiple instances (batch runs) and
+    should be closed with close() (or used as a context manager).
+    """
+
+    def __init__(self, processes=None, chunksize=None):
+        self.processes = processes or os.cpu_count()
+        self.chunksize = chunksize
+        self._pool = None
+        self._directory = tempfile.mkdtemp(prefix="GA_worker_pool_")
+        self._instance_key = None
+        self._instance_path = None
+        self._backend = None
+        self._decoder = None
+        self._nr_of_instances = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def set_instance(self, compiled: CompiledJobShop, backend='array', decoder='sequence') -> None:
+        """Make the workers evaluate chromosomes of the given instance with the given backend and decoder."""
+        self._nr_of_instances += 1
+        self._instance_key = f"{os.getpid()}_{self._nr_of_instances}"
+        self._instance_path = os.path.join(self._directory, f"instance_{self._nr_of_instances}.npz")
+        self._backend = backend
+        self._decoder = decoder
+        compiled.save(self._instance_path)
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.processes, initializer=_load_instance,
+                initargs=(self._instance_key, self._instance_path, self._backend, self._decoder))
+
+    def evaluate(self, chromosomes):
+        """Evaluate a list of chromosomes, returns a list of fitness tuples (makespan,)."""
+        if self._pool is None:
+            raise RuntimeError("No instance set, call set_instance() first")
+        chunksize = self.chunksize or max(1, math.ceil(len(chromosomes) / (4 * self.processes)))
+        tasks = [(self._instance_key, self._instance_path, self._backend, self._decoder,
+                  chromosomes[i:i + chunksize])
+                 for i in range(0, len(chromosomes), chunksize)]
+        return [(makespan,) for chunk in self._pool.map(_evaluate_chunk, tasks, chunksize=1) for makespan in chunk]
+
+    def init_chromosomes(self, seeds):
+        """Construct one chromosome per seed with the array-based heuristics (see heuristics.init_chromosome)."""
+        if self._pool is None:
+            raise RuntimeError("No instance set, call set_instance() first")
+        chunksize = max(1, math.ceil(len(seeds) / (4 * self.processes)))
+        tasks = [(self._instance_key, self._instance_path, self._backend, self._decoder, seeds[i:i + chunksize])
+                 for i in range(0, len(seeds), chunksize)]
+        return [chromosome for chunk in self._pool.map(_init_chunk, tasks, chunksize=1) for chromosome in chunk]
+
+    def close(self) -> None:
+        """Shut down the worker processes and remove the packed instance files."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        shutil.rmtree(self._directory, ignore_errors=True)
@@ -27,10 +27,11 @@ def create_stats_list(population, gen):
     return stats_list
 
 
-def record_stats(gen, population, logbook, stats, verbose, df_list, logging):
+def record_stats(gen, population, logbook, stats, verbose, df_list, logging, extra_record=None):
     stats_list = create_stats_list(population, gen)
     df_list.append(pd.DataFrame(stats_list))
     record = stats.compile(population) if stats is not None else {}
+    record.update(extra_record or {})
     logbook.record(gen=gen, **record)
     if verbose:
         logging.info(logbook.stream)
@@ -54,9 +55,11 @@ def output_dir_exp_name(parameters):
     return output_dir, exp_name
 
 
-def results_saving(makespan, path, parameters):
+def results_saving(makespan, path, parameters, run_info=None):
     """
     Save the GA optimization results to a JSON file.
+
+    run_info (filled by run_GA) adds the stopping reason, the time to best and the number of generations.
     """
     results = {
         "instance": parameters["instance"]["problem_instance"],
@@ -66,6 +69,7 @@ def results_saving(makespan, path, parameters):
         "crossover_rate": parameters["algorithm"]["cr"],
         "mutation_rate": parameters["algorithm"]["indpb"]
     }
+    results.update(run_info or {})
 
     # Generate a default experiment name based on instance and solve time if not provided
     os.makedirs(path, exist_ok=True)
@@ -0,0 +1,223 @@
+import argparse  # 解析命令行参数
+import copy  # 复制参数字典
+import json  # 保存结果
+import logging  # 记录日志信息
+import math  # 数学函数
+import os  # 文件和目录操作
+import random  # 每次重复实验独立的随机数流
+import statistics  # 均值、标准差与正态分布分位数
+from concurrent.futures import ProcessPoolExecutor  # 进程池
+
+import numpy as np  # 由基础种子派生互相独立的种子
+
+from scheduling_environment.jobShop import JobShop  # 作业车间环境
+from solution_methods.dispatching_rules.src.scheduling_functions import scheduler  # 调度器
+from solution_methods.dispatching_rules.utils import configure_simulation_env, output_dir_exp_name  # 配置模拟环境与输出目录
+from solution_methods.helper_functions import load_parameters  # 加载参数文件
+
+# 配置日志级别为INFO，确保所有INFO级别的日志都会被记录
+logging.basicConfig(level=logging.INFO)
+
+# 定义默认参数文件路径
+PARAM_FILE = "../../configs/dispatching_rules.toml"
+
+# 每次重复实验报告的指标
+KPIS = ('throughput', 'flowtime', 'utilization')
+
+
+def _t3_cdf(t: float) -> float:
+    """自由度为3的Student t分布的分布函数（闭式解）"""
+    return 0.5 + (t / (math.sqrt(3) * (1 + t * t / 3)) + math.atan(t / math.sqrt(3))) / math.pi
+
+
+def t_quantile(probability: float, degrees_of_freedom: int) -> float:
+    """
+    Student t分布的分位数。自由度为1至3时精确计算（1和2有闭式解，3由闭式分布函数二分求解），
+    更大的自由度由正态分位数经Cornish-Fisher展开近似（自由度不小于4时误差小于0.1%）
+    """
+    v = degrees_of_freedom
+    if v == 1:
+        return math.tan(math.pi * (probability - 0.5))
+    if v == 2:
+        return (2 * probability - 1) / math.sqrt(2 * probability * (1 - probability))
+    if v == 3:
+        if probability < 0.5:
+            return -t_quantile(1 - probability, 3)
+        low, high = 0.0, 1.0
+        while _t3_cdf(high) < probability:
+            low, high = high, 2 * high
+        for _ in range(100):
+            middle = (low + high) / 2
+            if _t3_cdf(middle) < probability:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+    z = statistics.NormalDist().inv_cdf(probability)
+    return (z + (z ** 3 + z) / (4 * v) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * v ** 4))
+
+
+def replication_seeds(seed: int, nr_of_replications: int):
+    """由基础种子派生每次重复实验独立的随机数流种子（第r次重复实验的种子与并行方式无关）"""
+    return [int.from_bytes(child.generate_state(4).tobytes(), 'little')
+            for child in np.random.SeedSequence(seed).spawn(nr_of_replications)]
+
+
+class ReplicationStatistics:
+    """
+    流式模式下的归档接收器：收集预热期之后（[warmup_time, end_time]内）的指标，只保留累加量。
+    吞吐量为单位时间完成的作业数，流程时间为完成作业的平均（完成时间 - 到达时间），
+    利用率为机器忙碌时间（含准备时间）占总可用时间的比例。
+    """
+
+    def __init__(self, warmup_time, end_time, nr_of_machines):
+        self.warmup_time = warmup_time
+        self.end_time = end_time
+        self.nr_of_machines = nr_of_machines
+        self.completed_jobs = 0
+        self.total_flowtime = 0.0
+        self.busy_time = 0.0
+
+    def add_busy_time(self, start_time, end_time) -> None:
+        """累加机器忙碌区间在统计时间窗内的部分"""
+        self.busy_time += max(0.0, min(end_time, self.end_time) - max(start_time, self.warmup_time))
+
+    def __call__(self, record) -> None:
+        """接收一个已完成作业的归档记录"""
+        for operation in record['operations']:
+            self.add_busy_time(operation['start_time'] - operation['setup_time'], operation['end_time'])
+        if self.warmup_time <= record['completion_time'] <= self.end_time:
+            self.completed_jobs += 1
+            self.total_flowtime += record['completion_time'] - record['arrival_time']
+
+    def kpis(self) -> dict:
+        """返回本次重复实验的指标"""
+        window = self.end_time - self.warmup_time
+        return {'throughput': self.completed_jobs / window,
+                'flowtime': self.total_flowtime / self.completed_jobs if self.completed_jobs else float('nan'),
+                'utilization': self.busy_time / (self.nr_of_machines * window)}
+
+
+def run_replication(task) -> dict:
+    """工作进程：以自己的随机数流运行一次在线到达模拟（流式模式），返回预热期之后的指标"""
+    parameters, seed, warmup_time = task
+    simulation_time = parameters['online_arrival_details']['simulation_time']
+    simulationEnv = configure_simulation_env(JobShop(), **parameters)
+    simulationEnv.rng = random.Random(seed)
+    collector = ReplicationStatistics(warmup_time, simulation_time,
+                                      parameters['online_arrival_details']['number_total_machines'])
+    simulationEnv.enable_streaming(collector)
+
+    simulationEnv.simulator.process(scheduler(simulationEnv, **parameters))
+    simulationEnv.simulator.run(until=simulation_time)
+    simulationEnv.close_archive()
+
+    # 尚未完成的作业中已开始的操作也计入机器忙碌时间
+    for operation in simulationEnv.jobShopEnv.operations:
+        if operation.scheduling_information:
+            collector.add_busy_time(operation.scheduling_information['start_setup'], operation.scheduled_end_time)
+    return collector.kpis()
+
+
+def summarize(results, confidence=0.95) -> dict:
+    """返回各指标在重复实验间的均值、标准差与置信区间"""
+    summary = {}
+    for kpi in KPIS:
+        values = [result[kpi] for result in results if not math.isnan(result[kpi])]
+        mean = statistics.fmean(values) if values else float('nan')
+        if len(values) > 1:
+            std = statistics.stdev(values)
+            half_width = t_quantile(0.5 + confidence / 2, len(values) - 1) * std / math.sqrt(len(values))
+        else:
+            std = half_width = float('inf')
+        summary[kpi] = {'mean': mean, 'std': std, 'half_width': half_width,
+                        'ci': (mean - half_width, mean + half_width), 'replications': len(values)}
+    return summary
+
+
+def precision_reached(summary, relative_half_width) -> bool:
+    """所有指标的置信区间半宽都不超过均值的relative_half_width倍时返回True"""
+    return all(kpi['half_width'] <= relative_half_width * abs(kpi['mean']) for kpi in summary.values())
+
+
+def run_replications(parameters, seed=1, processes=None, min_replications=5, max_replications=100, warmup_time=0,
+                     confidence=0.95, relative_half_width=0.05):
+    """
+    在进程池中运行在线到达模拟的独立重复实验，每次重复实验使用由seed派生的独立随机数流，删除预热期的数据。
+    重复实验按进程数成批运行，达到min_replications次后，一旦所有指标的置信区间半宽达到精度要求
+    （不超过均值的relative_half_width倍）就停止，最多运行max_replications次。
+
+    返回:
+    summary (dict): 各指标的均值、标准差、置信区间与重复次数
+    results (list): 每次重复实验的指标
+    """
+    parameters = copy.deepcopy(parameters)
+    parameters['instance']['online_arrivals'] = True
+    parameters['online_arrival_details']['streaming'] = False  # 由run_replication开启流式模式并接收归档记录
+    if warmup_time >= parameters['online_arrival_details']['simulation_time']:
+        raise ValueError("The warm-up time must be shorter than the simulation time.")
+
+    processes = processes or os.cpu_count()
+    seeds = replication_seeds(seed, max_replications)
+    results = []
+    summary = summarize(results, confidence)
+    with ProcessPoolExecutor(processes) as executor:
+        while len(results) < max_replications:
+            batch_size = min(max(processes, min_replications - len(results)), max_replications - len(results))
+            batch = seeds[len(results):len(results) + batch_size]
+            results += executor.map(run_replication, [(parameters, seed, warmup_time) for seed in batch])
+            summary = summarize(results, confidence)
+            logging.info(f"{len(results)} replications: " + ", ".join(
+                f"{kpi} {summary[kpi]['mean']:.4f} ± {summary[kpi]['half_width']:.4f}" for kpi in KPIS))
+            if len(results) >= min_replications and precision_reached(summary, relative_half_width):
+                break
+    return summary, results
+
+
+def main(param_file: str = PARAM_FILE):
+    """加载参数文件，按[replications]的配置运行重复实验并报告各指标的置信区间"""
+    try:
+        parameters = load_parameters(param_file)
+    except FileNotFoundError:
+        logging.error(f"未找到参数文件 {param_file}。")
+        return
+
+    settings = parameters.get('replications', {})
+    summary, results = run_replications(
+        parameters, seed=settings.get('seed', 1), processes=settings.get('processes') or None,
+        min_replications=settings.get('min_replications', 5), max_replications=settings.get('max_replications', 100),
+        warmup_time=settings.get('warmup_time', 0), confidence=settings.get('confidence', 0.95),
+        relative_half_width=settings.get('relative_half_width', 0.05))
+
+    confidence = settings.get('confidence', 0.95)
+    for kpi in KPIS:
+        low, high = summary[kpi]['ci']
+        logging.info(f"{kpi}: 均值 {summary[kpi]['mean']:.4f}, {confidence:.0%}置信区间 [{low:.4f}, {high:.4f}] "
+                     f"（{summary[kpi]['replications']}次重复实验）")
+
+    # 如果启用了保存结果，则保存汇总结果与每次重复实验的指标
+    if parameters['output'].get('save_results'):
+        parameters['instance']['online_arrivals'] = True
+        output_dir, exp_name = output_dir_exp_name(parameters)
+        output_dir = os.path.join(output_dir, f"{exp_name}")
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "replications.json"), "w") as outfile:
+            json.dump({'summary': summary, 'replications': results, 'settings': settings}, outfile, indent=4)
+        logging.info(f"结果已保存到 {output_dir}")
+
+
+if __name__ == "__main__":
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description="运行在线到达调度规则模拟的独立重复实验。")
+    parser.add_argument(
+        "-f",
+        "--config_file",
+        type=str,
+        default=PARAM_FILE,
+        help="配置文件路径",
+    )
+
+    args = parser.parse_args()
+    main(param_file=args.config_file)
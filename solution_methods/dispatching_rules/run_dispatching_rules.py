@@ -4,9 +4,10 @@ import os  # 导入os模块，用于文件和目录操作
 
 from scheduling_environment.jobShop import JobShop  # 从scheduling_environment.jobShop模块导入JobShop类
 from visualization import gantt_chart, precedence_chart  # 从visualization模块导入gantt_chart和precedence_chart模块，用于绘制甘特图和优先关系图
-from solution_methods.dispatching_rules.utils import configure_simulation_env, output_dir_exp_name, results_saving  # 从utils模块导入配置模拟环境、生成输出目录名称和保存结果的函数
+from solution_methods.dispatching_rules.utils import configure_simulation_env, output_dir_exp_name, results_saving, kpis_saving  # 从utils模块导入配置模拟环境、生成输出目录名称和保存结果的函数
 from solution_methods.helper_functions import load_parameters, load_job_shop_env  # 从helper_functions模块导入加载参数和加载作业车间环境的函数
-from solution_methods.dispatching_rules.src.scheduling_functions import scheduler  # 从scheduling_functions模块导入调度器函数
+from solution_methods.dispatching_rules.src.scheduling_functions import scheduler, static_scheduler  # 从scheduling_functions模块导入调度器函数
+from scheduling_environment.staticSimulationEnv import StaticSimulationEnv  # 静态实例的原生事件循环模拟环境
 
 # 配置日志级别为INFO，确保所有INFO级别的日志都会被记录
 logging.basicConfig(level=logging.INFO)
@@ -39,15 +40,25 @@ def run_dispatching_rules(jobShopEnv, **kwargs):
     # 配置模拟环境
     simulationEnv = configure_simulation_env(jobShopEnv, **kwargs)
 
-    # 将调度器添加到模拟环境中
-    simulationEnv.simulator.process(scheduler(simulationEnv, **kwargs))
-
-    # 对于在线到达的情况，运行模拟直到配置的结束时间
-    if kwargs['instance']['online_arrivals']:
-        simulationEnv.simulator.run(until=kwargs['online_arrival_details']['simulation_time'])
-    # 对于静态实例，运行模拟直到所有操作都被调度
+    # 静态实例在原生事件循环上直接运行调度器
+    if isinstance(simulationEnv, StaticSimulationEnv):
+        static_scheduler(simulationEnv, **kwargs)
     else:
-        simulationEnv.simulator.run()
+        # 将调度器添加到simpy模拟环境中
+        simulationEnv.simulator.process(scheduler(simulationEnv, **kwargs))
+
+        # 对于在线到达的情况，运行模拟直到配置的结束时间
+        if kwargs['instance']['online_arrivals']:
+            simulationEnv.simulator.run(until=kwargs['online_arrival_details']['simulation_time'])
+            # 流式模式下归档剩余的已完成作业并关闭归档文件
+            simulationEnv.close_archive()
+            # 报告流式KPI（如已开启）
+            if simulationEnv.kpis is not None:
+                kpis_saving(simulationEnv.kpis, simulationEnv.simulator.now,
+                            kwargs['online_arrival_details'].get('kpi_file'))
+        # 对于静态实例，运行模拟直到所有操作都被调度
+        else:
+            simulationEnv.simulator.run()
 
     # 获取最大完成时间（makespan）
     makespan = simulationEnv.jobShopEnv.makespan
@@ -0,0 +1,147 @@
+import heapq
+
+from solution_methods.dispatching_rules.src.rules import *
+
+# dispatching rule: (priority function, whether the highest priority is selected, priority depends on the progress)
+PRIORITY_RULES = {
+    'FIFO': (lambda simulationEnv, operation: fifo_priority(operation), False, False),
+    'SPT': (lambda simulationEnv, operation: spt_priority(operation), False, False),
+    'MOR': (mor_priority, True, True),
+    'MWR': (mwr_priority, True, True),
+    'LOR': (lor_priority, False, True),
+    'LWR': (lwr_priority, False, True),
+}
+
+
+class OperationQueues:
+    """
+    Per-machine priority queues of the ready operations (all predecessors processed, not yet scheduled), keyed by the
+    dispatching rule. The queues are updated incrementally: an operation is pushed onto the queues of its eligible
+    machines when its last predecessor completes, and removed lazily when it is scheduled on any machine. Selecting the
+    operation for a machine pops the top of its heap in O(log n) instead of scanning all operations.
+
+    The heap entries are (priority, rank, version, operation), where the rank is the position of the operation in the
+    jobs/operations order, so ties are broken as in select_operation() (first operation in that order). Priorities of
+    the dynamic rules (MOR/MWR/LOR/LWR) change when another operation of the same job completes; the queued operations
+    of such jobs are re-pushed with a new version before the next selection, and the outdated entries are discarded
+    when they reach the top.
+
+    With the SPT machine assignment rule an operation is only queued at its shortest processing time machines. The EET
+    rule depends on the current machine states, it is checked for the top entries at selection time.
+
+    The bookkeeping of an operation is dropped when it completes, so the size of the queues depends on the work in
+    progress only (jobs evicted by a streaming simulation are accounted for when detecting arrivals).
+    """
+
+    def __init__(self, simulationEnv, dispatching_rule, machine_assignment_rule):
+        self.simulationEnv = simulationEnv
+        self.machine_assignment_rule = machine_assignment_rule
+        self._priority, self._maximize, self._dynamic = PRIORITY_RULES[dispatching_rule]
+        self._queues = {}
+        self._rank = {}
+        self._version = {}
+        self._remaining_predecessors = {}
+        self._successors = {}
+        self._queued_operations = {}
+        self._in_progress = []
+        self._stale_jobs = set()
+        self._nr_of_jobs = 0
+        self._nr_of_operations = 0
+        self.update()
+
+    def _add_job(self, job):
+        processed_operations = self.simulationEnv.processed_operations
+        self._queued_operations[job.job_id] = set()
+        for operation in job.operations:
+            self._rank[operation] = self._nr_of_operations
+            self._nr_of_operations += 1
+            self._remaining_predecessors[operation] = sum(
+                preceding_operation not in processed_operations for preceding_operation in operation.predecessors)
+            for preceding_operation in operation.predecessors:
+                self._successors.setdefault(preceding_operation, []).append(operation)
+        for operation in job.operations:
+            if self._remaining_predecessors[operation] == 0 and operation not in processed_operations:
+                self._push(operation)
+
+    def _push(self, operation):
+        """Push (a new version of) the ready operation onto the queues of its eligible machines."""
+        version = self._version[operation] = self._version.get(operation, -1) + 1
+        priority = self._priority(self.simulationEnv, operation)
+        entry = (-priority if self._maximize else priority, self._rank[operation], version, operation)
+        if self.machine_assignment_rule == 'SPT':
+            machine_ids = [machine_id for machine_id in operation.processing_times
+                           if spt_rule(operation, machine_id)]
+        else:
+            machine_ids = operation.processing_times
+        for machine_id in machine_ids:
+            heapq.heappush(self._queues.setdefault(machine_id, []), entry)
+        self._queued_operations[operation.job_id].add(operation)
+
+    def _complete(self, operation):
+        for successor in self._successors.pop(operation, ()):
+            self._remaining_predecessors[successor] -= 1
+            if self._remaining_predecessors[successor] == 0:
+                self._push(successor)
+        del self._rank[operation], self._remaining_predecessors[operation]
+        self._version.pop(operation, None)
+        if self.simulationEnv.job_progress.operations_remaining(operation.job) == 0:
+            self._queued_operations.pop(operation.job_id, None)
+        elif self._dynamic:
+            self._stale_jobs.add(operation.job_id)
+
+    def update(self) -> None:
+        """Register the jobs that arrived and the operations that completed since the last update."""
+        jobShopEnv = self.simulationEnv.jobShopEnv
+        jobs = jobShopEnv.jobs
+        while self._nr_of_jobs < len(jobs) + jobShopEnv.nr_of_removed_jobs:
+            self._add_job(jobs[self._nr_of_jobs - jobShopEnv.nr_of_removed_jobs])
+            self._nr_of_jobs += 1
+
+        processed_operations = self.simulationEnv.processed_operations
+        completed = [operation for operation in self._in_progress if operation in processed_operations]
+        if completed:
+            self._in_progress = [operation for operation in self._in_progress
+                                 if operation not in processed_operations]
+            for operation in completed:
+                self._complete(operation)
+
+        # lazily re-prioritize the queued operations of the jobs with a changed remaining work
+        for job_id in self._stale_jobs:
+            for operation in list(self._queued_operations.get(job_id, ())):
+                self._push(operation)
+        self._stale_jobs.clear()
+
+        # drop the outdated entries of heaps that have grown much larger than the number of ready operations
+        for heap in self._queues.values():
+            if len(heap) > 2 * len(self._version) + 64:
+                heap[:] = [entry for entry in heap if self._version.get(entry[3]) == entry[2]]
+                heapq.heapify(heap)
+
+    def pop_operation(self, machine):
+        """Remove and return the operation with the highest priority that can be scheduled on the machine, or None."""
+        heap = self._queues.get(machine.machine_id)
+        if not heap:
+            return None
+        version = self._version
+        skipped = []
+        selected = None
+        while heap:
+            _, _, entry_version, operation = heap[0]
+            if version.get(operation) != entry_version:
+                # outdated entry, or the operation is already scheduled
+                heapq.heappop(heap)
+            elif self.machine_assignment_rule == 'EET' and not eet_rule(self.simulationEnv, operation,
+                                                                        machine.machine_id):
+                skipped.append(heapq.heappop(heap))
+            else:
+                heapq.heappop(heap)
+                selected = operation
+                break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+        if selected is not None:
+            version[selected] = None
+            self._queued_operations[selected.job_id].discard(selected)
+            self._in_progress.append(selected)
+        return selected
@@ -0,0 +1,149 @@
+import numpy as np
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.dispatching_rules.src.operation_queues import OperationQueues
+from solution_methods.dispatching_rules.src.rules import eet_rule, spt_rule
+
+# features of an operation, evaluated for all candidates at once
+FEATURES = ('job_id', 'processing_time', 'operations_remaining', 'work_remaining')
+
+# the candidate with the lowest weighted sum of features is selected, ties are broken by the jobs/operations order
+RULE_WEIGHTS = {
+    'FIFO': {'job_id': 1.0},
+    'SPT': {'processing_time': 1.0},
+    'MOR': {'operations_remaining': -1.0},
+    'LOR': {'operations_remaining': 1.0},
+    'MWR': {'work_remaining': -1.0},
+    'LWR': {'work_remaining': 1.0},
+}
+
+
+def rule_weights(dispatching_rule) -> np.ndarray:
+    """
+    Return the feature weight vector of a dispatching rule: the name of a built-in rule, or a weighted composite given
+    as a dict that maps feature names and/or built-in rule names to weights, e.g. {'SPT': 1.0, 'MWR': 0.1} for the
+    processing time minus a tenth of the remaining work of the job.
+    """
+    if isinstance(dispatching_rule, str):
+        dispatching_rule = {dispatching_rule: 1.0}
+    weights = np.zeros(len(FEATURES))
+    for name, weight in dispatching_rule.items():
+        if name in RULE_WEIGHTS:
+            for feature, feature_weight in RULE_WEIGHTS[name].items():
+                weights[FEATURES.index(feature)] += weight * feature_weight
+        elif name in FEATURES:
+            weights[FEATURES.index(name)] += weight
+        else:
+            raise ValueError(f"Unknown dispatching rule or feature '{name}', expected one of "
+                             f"{list(RULE_WEIGHTS) + list(FEATURES)}")
+    return weights
+
+
+def rule_name(dispatching_rule) -> str:
+    """Return a short name of a (composite) dispatching rule, e.g. for experiment names."""
+    if isinstance(dispatching_rule, str):
+        return dispatching_rule
+    return "".join(f"{weight:+g}{name}" for name, weight in dispatching_rule.items()).lstrip("+")
+
+
+class RuleEngine:
+    """
+    Vectorized evaluation of dispatching rules: the priorities of all candidate operations are computed at once as a
+    weighted sum of feature arrays, from the static arrays of the compiled instance (job ids, shortest processing
+    times) and live per-job state arrays (remaining operations and work), which are updated when operations complete.
+
+    priorities() also accepts a (K x F) matrix of weights, evaluating K rule variants in a single matrix product.
+    """
+
+    def __init__(self, compiled: CompiledJobShop):
+        nr_of_options = np.diff(compiled.option_ptr)
+        duration_sums = np.add.reduceat(compiled.option_duration.astype(np.int64), compiled.option_ptr[:-1])
+        self.operation_job = compiled.operation_job.astype(np.int64)
+        self.job_id = self.operation_job.astype(np.float64)
+        self.processing_time = np.minimum.reduceat(compiled.option_duration, compiled.option_ptr[:-1]).astype(np.float64)
+
+        # the remaining work of a job is recomputed as a left-to-right float sum over its remaining operations when one
+        # of them completes, so it is bit-identical to the remaining work of the priority queues (JobProgress)
+        self.average_work = (duration_sums / nr_of_options).tolist()
+        self.job_operations = [compiled.job_operations[start:end].tolist()
+                               for start, end in zip(compiled.job_operations_ptr[:-1], compiled.job_operations_ptr[1:])]
+        self._remaining = [True] * len(self.operation_job)
+        self.job_operations_remaining = np.bincount(self.operation_job, minlength=compiled.nr_of_jobs)
+        self.job_work_remaining = np.array([sum([self.average_work[operation_id] for operation_id in operation_ids])
+                                            for operation_ids in self.job_operations], dtype=np.float64)
+
+    def operation_completed(self, operation_id) -> None:
+        """Update the remaining operations and work of the job of a completed operation."""
+        job = self.operation_job[operation_id]
+        self._remaining[operation_id] = False
+        self.job_operations_remaining[job] -= 1
+        self.job_work_remaining[job] = sum([self.average_work[operation_id] for operation_id in self.job_operations[job]
+                                            if self._remaining[operation_id]])
+
+    def features(self, operation_ids) -> np.ndarray:
+        """Return the (F x n) matrix of the features of the operations."""
+        jobs = self.operation_job[operation_ids]
+        return np.stack([self.job_id[operation_ids],
+                         self.processing_time[operation_ids],
+                         self.job_operations_remaining[jobs].astype(np.float64),
+                         self.job_work_remaining[jobs]])
+
+    def priorities(self, weights, operation_ids) -> np.ndarray:
+        """Return the priorities of the operations, (n,) for a weight vector or (K x n) for a (K x F) weight matrix."""
+        return np.asarray(weights) @ self.features(operation_ids)
+
+
+class VectorizedOperationQueues(OperationQueues):
+    """
+    Candidate selection with the RuleEngine, for built-in and composite dispatching rules (static instances). The
+    ready operations are tracked as in OperationQueues, but kept per machine as a mask in the jobs/operations order;
+    selecting an operation evaluates the rule for all candidates of the machine at once. Built-in rules select the
+    same operations as the priority queues.
+    """
+
+    def __init__(self, simulationEnv, dispatching_rule, machine_assignment_rule):
+        jobShopEnv = simulationEnv.jobShopEnv
+        self.engine = RuleEngine(CompiledJobShop.from_job_shop(jobShopEnv))
+        self.weights = rule_weights(dispatching_rule)
+        # candidate masks over the operations in the jobs/operations order (the order used for tie-breaking)
+        self._ordered_operations = [operation for job in jobShopEnv.jobs for operation in job.operations]
+        self._ordered_ids = np.array([operation.operation_id for operation in self._ordered_operations], dtype=np.int64)
+        self._ready = np.zeros((jobShopEnv.nr_of_machines, len(self._ordered_operations)), dtype=bool)
+        super().__init__(simulationEnv, 'FIFO', machine_assignment_rule)
+        # the priorities are always computed from the live state, queued operations never become stale
+        self._dynamic = False
+
+    def _push(self, operation):
+        if self.machine_assignment_rule == 'SPT':
+            machine_ids = [machine_id for machine_id in operation.processing_times if spt_rule(operation, machine_id)]
+        else:
+            machine_ids = list(operation.processing_times)
+        self._ready[machine_ids, self._rank[operation]] = True
+
+    def _complete(self, operation):
+        self.engine.operation_completed(operation.operation_id)
+        super()._complete(operation)
+
+    def pop_operation(self, machine):
+        """Remove and return the candidate with the lowest weighted priority on the machine, or None."""
+        ranks = np.flatnonzero(self._ready[machine.machine_id])
+        if len(ranks) == 0:
+            return None
+        priorities = self.engine.priorities(self.weights, self._ordered_ids[ranks])
+        if self.machine_assignment_rule == 'EET':
+            # the EET machines depend on the machine states, check the candidates in priority order
+            selected = None
+            for index in np.argsort(priorities, kind='stable').tolist():
+                operation = self._ordered_operations[ranks[index]]
+                if eet_rule(self.simulationEnv, operation, machine.machine_id):
+                    selected = ranks[index]
+                    break
+            if selected is None:
+                return None
+        else:
+            selected = ranks[int(np.argmin(priorities))]
+
+        self._ready[:, selected] = False
+        operation = self._ordered_operations[selected]
+        self._in_progress.append(operation)
+        return operation
@@ -1,10 +1,13 @@
 from solution_methods.dispatching_rules.src.rules import *
 from solution_methods.dispatching_rules.src.helper_functions import *
+from solution_methods.dispatching_rules.src.operation_queues import OperationQueues
+from solution_methods.dispatching_rules.src.rule_engine import VectorizedOperationQueues
 
 
 def select_operation(simulationEnv, machine, dispatching_rule, machine_assignment_rule):
     """
-    Use dispatching rules to select the next operation to schedule.
+    Use dispatching rules to select the next operation to schedule. This is the reference implementation that scans
+    all operations, the schedulers use OperationQueues, which selects the same operations incrementally.
 
     Parameters:
     - simulationEnv: The simulation environment containing information on jobs, machines, and operations.
@@ -67,23 +70,74 @@ def select_operation(simulationEnv, machine, dispatching_rule, machine_assignmen
             return max(operation_priorities, key=operation_priorities.get)
 
 
-def schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule):
-    """Schedule operations on the machines based on the priority values."""
+def schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule, operation_queues=None):
+    """
+    Schedule operations on the machines based on the priority values, returns the number of scheduled operations.
+    The operations are taken from the operation_queues if given, otherwise they are selected with select_operation().
+    """
     machines_available = [
         machine for machine in simulationEnv.jobShopEnv.machines
-        if simulationEnv.machine_resources[machine.machine_id].count == 0
+        if simulationEnv.machine_available(machine.machine_id)
     ]
     machines_available.sort(key=lambda m: m.machine_id)
 
+    if operation_queues is not None:
+        operation_queues.update()
+
+    nr_scheduled = 0
     for machine in machines_available:
-        operation_to_schedule = select_operation(simulationEnv, machine, dispatching_rule, machine_assignment_rule)
+        if operation_queues is not None:
+            operation_to_schedule = operation_queues.pop_operation(machine)
+        else:
+            operation_to_schedule = select_operation(simulationEnv, machine, dispatching_rule, machine_assignment_rule)
         if operation_to_schedule is not None:
             simulationEnv.jobShopEnv._scheduled_operations.append(operation_to_schedule)
-            simulationEnv.simulator.process(simulationEnv.perform_operation(operation_to_schedule, machine))
+            simulationEnv.dispatch(operation_to_schedule, machine)
+            nr_scheduled += 1
+    return nr_scheduled
+
+
+def create_operation_queues(simulationEnv, **kwargs):
+    """
+    Return the candidate queues for the configured rules: per-machine priority queues (rule_engine = "queues") or the
+    vectorized rule engine (rule_engine = "vectorized"), which also supports composite dispatching rules, given as a
+    table of weights of features and built-in rules (static instances only).
+    """
+    dispatching_rule = kwargs['instance']['dispatching_rule']
+    machine_assignment_rule = kwargs['instance']['machine_assignment_rule']
+    rule_engine = kwargs['instance'].get('rule_engine', 'queues')
+    if not isinstance(dispatching_rule, str) and rule_engine != 'vectorized':
+        raise ValueError("Composite dispatching rules require the vectorized rule engine.")
+    if rule_engine == 'vectorized':
+        if simulationEnv.online_arrivals:
+            raise ValueError("The vectorized rule engine does not support online job arrivals.")
+        return VectorizedOperationQueues(simulationEnv, dispatching_rule, machine_assignment_rule)
+    if rule_engine != 'queues':
+        raise ValueError(f"Unknown rule engine '{rule_engine}', expected 'queues' or 'vectorized'.")
+    return OperationQueues(simulationEnv, dispatching_rule, machine_assignment_rule)
+
+
+def wait_for_next_decision(simulationEnv, nr_scheduled):
+    """
+    Wait until the next moment the dispatching decisions can change: an operation completion or a job arrival.
+    After operations have been scheduled, the earliest end times of the machines (EET) have changed as well, the
+    decisions are then also re-evaluated one time unit later (as the former unit-time polling did).
+    """
+    wake_up = simulationEnv.wait_for_state_change()
+    if nr_scheduled:
+        wake_up = wake_up | simulationEnv.simulator.timeout(1)
+    yield wake_up
+    # let all other events at this time (e.g. simultaneous completions) be processed before dispatching
+    yield simulationEnv.simulator.timeout(0)
 
 
 def scheduler(simulationEnv, **kwargs):
-    """Scheduler for batch mode or online arrivals."""
+    """
+    Scheduler for batch mode or online arrivals. The scheduler only wakes up when the state changes (an operation
+    completes and releases its machine, or a job arrives), so the number of wake-ups is proportional to the number of
+    operations instead of the length of the horizon. Operations completing at the same time are all processed before
+    the scheduler resumes.
+    """
     dispatching_rule = kwargs['instance']['dispatching_rule']
     machine_assignment_rule = kwargs['instance']['machine_assignment_rule']
 
@@ -96,15 +150,54 @@ def scheduler(simulationEnv, **kwargs):
             simulationEnv.add_machine_resources()
 
         # Run the scheduling environment until all operations are processed
-        while len(simulationEnv.processed_operations) < sum(len(job.operations) for job in simulationEnv.jobShopEnv.jobs):
-            schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule)
-            yield simulationEnv.simulator.timeout(1)
+        operation_queues = create_operation_queues(simulationEnv, **kwargs)
+        nr_of_operations = sum(len(job.operations) for job in simulationEnv.jobShopEnv.jobs)
+        while len(simulationEnv.processed_operations) < nr_of_operations:
+            nr_scheduled = schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule,
+                                               operation_queues)
+            yield from wait_for_next_decision(simulationEnv, nr_scheduled)
 
     else:
         # Start the online job generation process
         simulationEnv.simulator.process(simulationEnv.generate_online_job_arrivals())
 
-        # Run the scheduling environment continuously
+        # Run the scheduling environment continuously, arriving jobs are added to the queues at every update
+        operation_queues = create_operation_queues(simulationEnv, **kwargs)
         while True:
-            schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule)
-            yield simulationEnv.simulator.timeout(1)
\ No newline at end of file
+            nr_scheduled = schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule,
+                                               operation_queues)
+            if simulationEnv.streaming:
+                # the completions have been registered by the queues, the completed jobs can be evicted
+                simulationEnv.evict_completed_jobs()
+            yield from wait_for_next_decision(simulationEnv, nr_scheduled)
+
+
+def static_scheduler(simulationEnv, **kwargs):
+    """
+    Scheduler for static instances on the native event loop of a StaticSimulationEnv (no simpy). It takes the same
+    decisions at the same moments as scheduler(): after every dispatching round the simulation advances to the next
+    operation completion, or one time unit if operations were scheduled.
+    """
+    dispatching_rule = kwargs['instance']['dispatching_rule']
+    machine_assignment_rule = kwargs['instance']['machine_assignment_rule']
+
+    if dispatching_rule == 'SPT' and machine_assignment_rule != 'SPT':
+        raise ValueError("SPT dispatching rule requires SPT machine assignment rule.")
+
+    for _ in simulationEnv.jobShopEnv.machines:
+        simulationEnv.add_machine_resources()
+
+    simulator = simulationEnv.simulator
+    operation_queues = create_operation_queues(simulationEnv, **kwargs)
+    nr_of_operations = sum(len(job.operations) for job in simulationEnv.jobShopEnv.jobs)
+    while len(simulationEnv.processed_operations) < nr_of_operations:
+        nr_scheduled = schedule_operations(simulationEnv, dispatching_rule, machine_assignment_rule, operation_queues)
+        # start the dispatched operations
+        simulator.run(until=simulator.now)
+        next_time = simulator.peek()
+        if nr_scheduled:
+            next_time = simulator.now + 1 if next_time is None else min(next_time, simulator.now + 1)
+        if next_time is None:
+            # no operation is running and none can be scheduled
+            break
+        simulator.run(until=next_time)
@@ -0,0 +1,151 @@
+import copy  # 复制参数字典
+import os  # 文件和目录操作
+import pickle  # 序列化已解析的实例，供工作进程加载
+import shutil  # 删除临时目录
+import tempfile  # 创建临时目录
+import time  # 计时
+from concurrent.futures import ProcessPoolExecutor, as_completed  # 进程池
+
+from solution_methods.dispatching_rules.run_dispatching_rules import run_dispatching_rules  # 运行调度规则
+from solution_methods.dispatching_rules.src.rule_engine import rule_name  # 调度规则（含组合规则）的名称
+from solution_methods.helper_functions import load_job_shop_env  # 加载作业车间环境
+
+# 内置调度规则与机器分配规则
+DISPATCHING_RULES = ['FIFO', 'SPT', 'MOR', 'LOR', 'MWR', 'LWR']
+MACHINE_ASSIGNMENT_RULES = ['SPT', 'EET']
+
+# 结果表的列
+RESULT_FIELDS = ['Instance', 'Dispatching Rule', 'Machine Assignment Rule', 'Makespan', 'Computation Time', 'Jobs',
+                 'Machines', 'Operations']
+
+# 工作进程中已加载的实例（每个进程每个实例只加载一次，运行之间通过reset()重置）
+_instances = {}
+
+
+def rule_configurations(dispatching_rules=DISPATCHING_RULES, machine_assignment_rules=MACHINE_ASSIGNMENT_RULES):
+    """返回所有(调度规则, 机器分配规则)组合，SPT调度规则只能与SPT机器分配规则组合"""
+    return [(dispatching_rule, machine_assignment_rule)
+            for machine_assignment_rule in machine_assignment_rules
+            for dispatching_rule in dispatching_rules
+            if not (dispatching_rule == 'SPT' and machine_assignment_rule != 'SPT')]
+
+
+def instance_title(instance_path: str) -> str:
+    """返回实例名称（不含目录和扩展名）"""
+    return os.path.splitext(os.path.basename(instance_path))[0]
+
+
+def configuration_parameters(parameters, dispatching_rule, machine_assignment_rule):
+    """返回一次规则运行的参数（静态实例）"""
+    parameters = copy.deepcopy(parameters)
+    parameters['instance'].update(online_arrivals=False, dispatching_rule=dispatching_rule,
+                                  machine_assignment_rule=machine_assignment_rule)
+    return parameters
+
+
+def error_result(instance_path, dispatching_rule, machine_assignment_rule):
+    """返回加载实例或运行失败时的结果行（makespan等均记为-1）"""
+    return {'Instance': instance_title(instance_path), 'Dispatching Rule': rule_name(dispatching_rule),
+            'Machine Assignment Rule': machine_assignment_rule, 'Makespan': -1, 'Computation Time': -1, 'Jobs': -1,
+            'Machines': -1, 'Operations': -1}
+
+
+def run_configuration(task):
+    """
+    工作进程：在已解析的实例上运行一种规则组合，返回结果表中的一行。
+    task为(实例路径, 序列化实例文件, 调度规则, 机器分配规则, 参数)。
+    """
+    instance_path, pickle_path, dispatching_rule, machine_assignment_rule, parameters = task
+    jobShopEnv = _instances.get(instance_path)
+    if jobShopEnv is None:
+        with open(pickle_path, 'rb') as f:
+            jobShopEnv = _instances[instance_path] = pickle.load(f)
+    jobShopEnv.reset()
+
+    start_time = time.perf_counter()
+    makespan, jobShopEnv = run_dispatching_rules(
+        jobShopEnv, **configuration_parameters(parameters, dispatching_rule, machine_assignment_rule))
+    computation_time = time.perf_counter() - start_time
+    return {'Instance': instance_title(instance_path), 'Dispatching Rule': rule_name(dispatching_rule),
+            'Machine Assignment Rule': machine_assignment_rule, 'Makespan': makespan,
+            'Computation Time': computation_time, 'Jobs': jobShopEnv.nr_of_jobs,
+            'Machines': jobShopEnv.nr_of_machines, 'Operations': jobShopEnv.nr_of_operations}
+
+
+def sweep(instances, configurations, parameters, processes=None, on_result=None):
+    """
+    在进程池中运行所有实例与规则组合。每个实例只在主进程中解析一次，序列化后由工作进程按需加载。
+    每得到一个结果就调用on_result(结果行)（例如写入结果表），结果按完成顺序到达。
+    无法加载的实例与运行失败的组合记录为makespan为-1的结果行，其余运行照常完成。
+
+    返回:
+    results (list): 所有结果行，按实例和规则组合的顺序排列
+    jobShopEnvs (dict): 实例路径 -> 已解析的作业车间环境
+    """
+    directory = tempfile.mkdtemp(prefix="dispatching_rules_sweep_")
+    jobShopEnvs = {}
+    tasks = []
+    results = []
+    try:
+        for index, instance_path in enumerate(instances):
+            try:
+                jobShopEnv = load_job_shop_env(instance_path)
+                pickle_path = os.path.join(directory, f"instance_{index}.pkl")
+                with open(pickle_path, 'wb') as f:
+                    pickle.dump(jobShopEnv, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                # 跳过无法加载的实例，其所有规则组合记为失败
+                print(f"加载实例 {instance_path} 时发生错误: {str(e)}")
+                for dispatching_rule, machine_assignment_rule in configurations:
+                    results.append(error_result(instance_path, dispatching_rule, machine_assignment_rule))
+                    if on_result is not None:
+                        on_result(results[-1])
+                continue
+            jobShopEnvs[instance_path] = jobShopEnv
+            for dispatching_rule, machine_assignment_rule in configurations:
+                tasks.append((len(results), (instance_path, pickle_path, dispatching_rule, machine_assignment_rule,
+                                             parameters)))
+                results.append(None)
+
+        with ProcessPoolExecutor(processes) as executor:
+            futures = {executor.submit(run_configuration, task): (index, task) for index, task in tasks}
+            for future in as_completed(futures):
+                index, (instance_path, _, dispatching_rule, machine_assignment_rule, _) = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 单次运行失败不影响其他运行
+                    print(f"运行实例 {instance_path} 的规则组合 {rule_name(dispatching_rule)}/"
+                          f"{machine_assignment_rule} 时发生错误: {str(e)}")
+                    result = error_result(instance_path, dispatching_rule, machine_assignment_rule)
+                results[index] = result
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results, jobShopEnvs
+
+
+def best_configurations(instances, configurations, results):
+    """
+    返回每个实例makespan最小的规则组合（相同时取组合顺序中的第一个）：实例路径 -> (调度规则, 机器分配规则, makespan)。
+    失败的运行（makespan为-1）不参与比较，没有成功运行的实例不包含在结果中。
+    """
+    best = {}
+    for index, instance_path in enumerate(instances):
+        instance_results = results[index * len(configurations):(index + 1) * len(configurations)]
+        positions = [position for position in range(len(configurations))
+                     if instance_results[position]['Makespan'] >= 0]
+        if not positions:
+            continue
+        position = min(positions, key=lambda position: instance_results[position]['Makespan'])
+        best[instance_path] = configurations[position] + (instance_results[position]['Makespan'],)
+    return best
+
+
+def rerun_configuration(jobShopEnv, dispatching_rule, machine_assignment_rule, parameters):
+    """在主进程中重新运行一种规则组合（例如为最优组合绘制甘特图），返回调度后的作业车间环境"""
+    jobShopEnv.reset()
+    _, jobShopEnv = run_dispatching_rules(
+        jobShopEnv, **configuration_parameters(parameters, dispatching_rule, machine_assignment_rule))
+    return jobShopEnv
@@ -1,9 +1,13 @@
 import os  # 导入os模块，用于文件和目录操作
 import json  # 导入json模块，用于处理JSON数据
 import datetime  # 导入datetime模块，用于处理日期和时间
+import logging  # 记录日志信息
 
 from scheduling_environment.simulationEnv import SimulationEnv  # 从scheduling_environment.simulationEnv模块导入SimulationEnv类
+from scheduling_environment.staticSimulationEnv import StaticSimulationEnv  # 静态实例使用的原生事件循环模拟环境
+from scheduling_environment.jobArchive import JsonLinesArchive  # 流式模式下已完成作业的归档文件
 from solution_methods.helper_functions import load_job_shop_env  # 从helper_functions模块导入加载作业车间环境的函数
+from solution_methods.dispatching_rules.src.rule_engine import rule_name  # 调度规则（含组合规则）的名称
 
 # 定义默认结果保存根目录
 DEFAULT_RESULTS_ROOT = os.getcwd() + "/results/dispatching_rules/"
@@ -20,8 +24,13 @@ def configure_simulation_env(jobShopEnv, **parameters):
     返回:
     simulationEnv (SimulationEnv): 配置好的模拟环境实例
     """
-    # 创建SimulationEnv实例，根据参数设置是否为在线到达
-    simulationEnv = SimulationEnv(online_arrivals=parameters['instance']['online_arrivals'])
+    # 静态实例默认使用基于堆的原生事件循环（调度结果与simpy相同，开销更小），在线到达始终使用simpy
+    if not parameters['instance']['online_arrivals'] and \
+            parameters['instance'].get('simulation_kernel', 'native') == 'native':
+        simulationEnv = StaticSimulationEnv()
+    else:
+        # 创建SimulationEnv实例，根据参数设置是否为在线到达
+        simulationEnv = SimulationEnv(online_arrivals=parameters['instance']['online_arrivals'])
     # 将作业车间环境实例赋值给模拟环境
     simulationEnv.jobShopEnv = jobShopEnv
 
@@ -30,6 +39,13 @@ def configure_simulation_env(jobShopEnv, **parameters):
         simulationEnv.set_online_arrival_details(parameters['online_arrival_details'])
         # 设置作业车间环境中的机器数量
         simulationEnv.jobShopEnv.set_nr_of_machines(parameters['online_arrival_details']['number_total_machines'])
+        # 流式模式：已完成的作业被移出模拟环境并写入归档文件（未配置文件时丢弃），内存与每个事件的开销只取决于在制品
+        if parameters['online_arrival_details'].get('streaming', False):
+            archive_file = parameters['online_arrival_details'].get('archive_file')
+            simulationEnv.enable_streaming(JsonLinesArchive(archive_file) if archive_file else None)
+        # 流式KPI：每个事件O(1)更新在制品、队列长度、利用率、流程时间分位数与吞吐量，按采样间隔记录时间序列
+        if parameters['online_arrival_details'].get('kpis', False):
+            simulationEnv.enable_kpis(parameters['online_arrival_details'].get('kpi_sample_interval') or None)
 
     return simulationEnv
 
@@ -55,8 +71,8 @@ def output_dir_exp_name(parameters):
         else:
             instance_name = parameters['instance']['problem_instance'].replace('/', '_')[1:]
             instance_name = instance_name.split('.')[0] if '.' in instance_name else instance_name
-        # 获取调度规则和机器分配规则
-        dispatching_rule = parameters['instance']['dispatching_rule']
+        # 获取调度规则（组合规则使用其权重生成名称）和机器分配规则
+        dispatching_rule = rule_name(parameters['instance']['dispatching_rule'])
         machine_assignment_rule = parameters['instance']['machine_assignment_rule']
         # 获取当前时间戳
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -111,3 +127,28 @@ def results_saving(makespan, path, parameters):
     # 将结果保存到JSON文件
     with open(file_path, "w") as outfile:
         json.dump(results, outfile, indent=4)
+
+
+def kpis_saving(kpis, now, file_path=None):
+    """
+    记录在线模拟的流式KPI汇总，并在配置了文件路径时将汇总与采样的时间序列保存到JSON文件。
+
+    参数:
+    kpis (SimulationKPIs): 模拟环境中累积的KPI
+    now (float): 模拟结束时间
+    file_path (str): 保存KPI的JSON文件路径（为空时只记录日志）
+    """
+    summary = kpis.summary(now)
+    quantiles = ", ".join(f"P{probability * 100:g} {value:.2f}"
+                          for probability, value in summary['flowtime_quantiles'].items())
+    logging.info(f"WIP: {summary['wip']} (平均 {summary['average_wip']:.2f}), "
+                 f"吞吐量: {summary['throughput']:.4f}, 利用率: {summary['utilization']:.2%}, "
+                 f"流程时间: 均值 {summary['flowtime_mean']:.2f}, {quantiles}")
+    logging.info("平均队列长度: " + ", ".join(f"{length:.2f}" for length in summary['average_queue_lengths']))
+
+    if file_path:
+        summary['flowtime_quantiles'] = {str(probability): value
+                                         for probability, value in summary['flowtime_quantiles'].items()}
+        time_series = {name: values.tolist() for name, values in kpis.time_series().items()}
+        with open(file_path, "w") as outfile:
+            json.dump({'summary': summary, 'time_series': time_series}, outfile, indent=4)
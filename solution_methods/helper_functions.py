@@ -1,10 +1,13 @@
 import random
+from pathlib import Path
+
 import numpy as np
 
 import tomli
 import torch
 
 from data.data_parsers import parser_fjsp, parser_fajsp, parser_fjsp_sdst, parser_jsp_fsp
+from scheduling_environment.compiledJobShop import CompiledJobShop
 from scheduling_environment.jobShop import JobShop
 
 
@@ -17,7 +20,12 @@ def load_parameters(config_toml):
 
 def load_job_shop_env(problem_instance: str, from_absolute_path=False) -> JobShop:
     jobShopEnv = JobShop()
-    if '/fsp/' in problem_instance or '/jsp/' in problem_instance:
+    if problem_instance.endswith('.npz'):
+        # packed compiled instance (e.g. generated with data/instance_generator.py)
+        data_path = problem_instance if from_absolute_path else \
+            Path(__file__).resolve().parents[1].joinpath('data' + problem_instance)
+        jobShopEnv = CompiledJobShop.load(data_path).to_job_shop()
+    elif '/fsp/' in problem_instance or '/jsp/' in problem_instance:
         jobShopEnv = parser_jsp_fsp.parse_jsp_fsp(jobShopEnv, problem_instance, from_absolute_path)
     elif '/fjsp/' in problem_instance:
         jobShopEnv = parser_fjsp.parse_fjsp(jobShopEnv, problem_instance, from_absolute_path)
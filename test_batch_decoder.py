@@ -0,0 +1,34 @@
+import random
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.GA.src.decoder import BatchScheduleDecoder
+from solution_methods.GA.src.heuristics import init_chromosome, random_chromosome
+from solution_methods.GA.src.operators import evaluate_individual
+from solution_methods.helper_functions import load_job_shop_env
+
+# 柔性作业车间、带序列相关准备时间的柔性作业车间与装配作业车间实例
+PROBLEM_INSTANCES = ["/fjsp/brandimarte/Mk01.fjs", "/fjsp/brandimarte/Mk06.fjs", "/fjsp/brandimarte/Mk10.fjs",
+                     "/fjsp/fattahi/MFJS10.fjs", "/fjsp_sdst/fattahi/Fattahi_setup_01.fjs",
+                     "/fjsp_sdst/fattahi/Fattahi_setup_20.fjs", "/fajsp/dafjs/DAFJS01", "/fajsp/dafjs/DAFJS20",
+                     "/fajsp/yfjs/YFJS01"]
+
+# 每个实例的染色体数（种群大小）
+NR_OF_CHROMOSOMES = 40
+
+if __name__ == '__main__':
+    # 交叉验证：向量化批量解码器对整个种群计算的makespan与逐个染色体调度的evaluate_individual完全相同
+    rng = random.Random(1)
+    for problem_instance in PROBLEM_INSTANCES:
+        jobShopEnv = load_job_shop_env(problem_instance)
+        compiled = CompiledJobShop.from_job_shop(jobShopEnv)
+
+        # 初始化启发式与随机调度生成的染色体各占一半
+        chromosomes = [init_chromosome(compiled, rng.getrandbits(64)) for _ in range(NR_OF_CHROMOSOMES // 2)]
+        chromosomes += [random_chromosome(compiled, rng) for _ in range(NR_OF_CHROMOSOMES - len(chromosomes))]
+
+        makespans = BatchScheduleDecoder(compiled).decode([chromosome[0] for chromosome in chromosomes],
+                                                          [chromosome[1] for chromosome in chromosomes]).tolist()
+        expected = [evaluate_individual(chromosome, jobShopEnv)[0] for chromosome in chromosomes]
+        assert makespans == expected, (problem_instance, makespans, expected)
+
+        print(f"{problem_instance}：{NR_OF_CHROMOSOMES}个染色体的批量解码结果与evaluate_individual相同")
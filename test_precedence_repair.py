@@ -0,0 +1,47 @@
+import random
+from collections import Counter
+
+import numpy as np
+
+from scheduling_environment.compiledJobShop import CompiledJobShop
+from solution_methods.GA.src.heuristics import init_chromosome
+from solution_methods.GA.src.repair import PrecedenceRepair
+from solution_methods.helper_functions import load_job_shop_env
+
+# 装配作业车间（FAJSP）实例：全部DAFJS实例与YFJS01
+PROBLEM_INSTANCES = [f"/fajsp/dafjs/DAFJS{index:02d}" for index in range(1, 31)] + ["/fajsp/yfjs/YFJS01"]
+
+# 每个实例随机打乱的工序序列数
+NR_OF_SEQUENCES = 200
+
+if __name__ == '__main__':
+    # 性质测试：任意打乱的工序序列修复后都满足作业间的优先关系，且基因的多重集合不变
+    rng = random.Random(1)
+    for problem_instance in PROBLEM_INSTANCES:
+        compiled = CompiledJobShop.from_job_shop(load_job_shop_env(problem_instance))
+        repair = PrecedenceRepair(compiled)
+
+        # 由初始化启发式生成的序列本身是可行的，打乱后一般不可行
+        sequences = []
+        for _ in range(NR_OF_SEQUENCES):
+            sequence = init_chromosome(compiled, rng.getrandbits(64))[1]
+            rng.shuffle(sequence)
+            sequences.append(sequence)
+
+        nr_of_infeasible = sum(not repair.is_feasible(sequence) for sequence in sequences)
+
+        # 批量修复整个种群
+        repaired = repair.repair_sequences(np.array(sequences, dtype=np.int32)).tolist()
+        for sequence, repaired_sequence in zip(sequences, repaired):
+            assert repair.is_feasible(repaired_sequence), (problem_instance, sequence)
+            assert Counter(repaired_sequence) == Counter(sequence), (problem_instance, sequence)
+
+        # 对后代原地修复（与遗传算法中的调用方式相同）得到相同的序列
+        offspring = [[None, sequence[:]] for sequence in sequences]
+        repair(offspring)
+        assert [individual[1] for individual in offspring] == repaired, problem_instance
+
+        # 已可行的序列保持不变
+        assert repair.repair_sequences(np.array(repaired, dtype=np.int32)).tolist() == repaired, problem_instance
+
+        print(f"{problem_instance}：{NR_OF_SEQUENCES}个随机序列（其中{nr_of_infeasible}个不可行）修复后均可行")